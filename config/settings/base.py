@@ -301,6 +301,21 @@ CELERY_TASK_TIME_LIMIT = 5 * 60
 CELERY_TASK_SOFT_TIME_LIMIT = 60
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#beat-scheduler
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+# Installed into the database scheduler on beat start
+CELERY_BEAT_SCHEDULE = {
+    "dispatch-shipment-outbox": {
+        "task": "zs.apps.courier_integrations.tasks.shipment_tasks.dispatch_shipment_outbox",
+        "schedule": 60.0,
+    },
+    "apply-tracking-webhooks": {
+        "task": "zs.apps.courier_integrations.tasks.shipment_tasks.apply_tracking_webhooks",
+        "schedule": 10.0,
+    },
+    "maintain-tracking-partitions": {
+        "task": "zs.apps.courier_integrations.tasks.shipment_tasks.maintain_tracking_partitions",
+        "schedule": 24 * 60 * 60.0,
+    },
+}
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#worker-send-task-events
 CELERY_WORKER_SEND_TASK_EVENTS = True
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std-setting-task_send_sent_event
@@ -378,5 +393,77 @@ COURIER_CONFIG = {
         'shipper_country_code': env('ARAMEX_SHIPPER_COUNTRY_CODE', default="JO"),
         'shipper_phone': env('ARAMEX_SHIPPER_PHONE', default="+962777777777"),
         'shipper_email': env('ARAMEX_SHIPPER_EMAIL', default="test@example.com"),
+        # HTTP transport profile; Courier.config["transport"] overrides these per deployment
+        'transport': {
+            'pool_maxsize': env.int('ARAMEX_HTTP_POOL_MAXSIZE', default=10),
+            'connect_timeout': env.float('ARAMEX_HTTP_CONNECT_TIMEOUT', default=5.0),
+            'read_timeout': env.float('ARAMEX_HTTP_READ_TIMEOUT', default=30.0),
+            'timeouts': {'label': {'read': 60.0}},
+        },
+        # Requests per second shared by all processes, per operation or "default"
+        'rate_limits': {
+            'default': {
+                'rate': env.float('ARAMEX_RATE_LIMIT_RPS', default=10.0),
+                'burst': env.float('ARAMEX_RATE_LIMIT_BURST', default=20.0),
+            },
+        },
     },
 }
+
+# Tracking results cache; TTLs in seconds by unified status override the
+# defaults in zs.apps.courier_integrations.services.tracking_cache
+COURIER_TRACKING_CACHE = {
+    'ttls': {},
+    'default_ttl': 5 * 60,
+    # Expired results kept this long to serve while the courier is failing
+    'stale_ttl': 24 * 60 * 60,
+    # XFetch early refresh aggressiveness; 0 disables early refresh
+    'beta': 1.0,
+}
+
+# Tracking poll intervals in seconds by unified status override the defaults
+# in zs.apps.courier_integrations.services.poll_schedule. Intervals double
+# for every poll without a status change, up to max_interval.
+COURIER_POLL_SCHEDULE = {
+    'intervals': {},
+    'default_interval': 6 * 60 * 60,
+    'max_interval': 24 * 60 * 60,
+    # Fraction by which each interval is randomly stretched or shrunk
+    'jitter': 0.2,
+    # Safety net poll of shipments whose courier pushes tracking by webhook
+    'webhook_interval': 24 * 60 * 60,
+}
+
+# Paging of the periodic tracking update dispatch (update_all_active_shipments):
+# shipment IDs read per page, shipments per Celery chunk task, shipments
+# queued per second (0 sends pages back to back), and seconds a queued
+# shipment is held back from later runs until its poll schedules it
+COURIER_TRACKING_DISPATCH = {
+    'page_size': env.int('COURIER_TRACKING_DISPATCH_PAGE_SIZE', default=1000),
+    'chunk_size': env.int('COURIER_TRACKING_DISPATCH_CHUNK_SIZE', default=50),
+    'rate': env.float('COURIER_TRACKING_DISPATCH_RATE', default=200.0),
+    'lease': env.int('COURIER_TRACKING_DISPATCH_LEASE', default=15 * 60),
+}
+
+# Create waybills through the outbox and return 202 instead of calling the
+# courier inside the request; clients can also opt in with "Prefer: respond-async"
+COURIER_ASYNC_WAYBILL_CREATION = env.bool("COURIER_ASYNC_WAYBILL_CREATION", default=False)
+# Courier calls made for an outbox entry before it is marked failed
+COURIER_OUTBOX_MAX_ATTEMPTS = env.int("COURIER_OUTBOX_MAX_ATTEMPTS", default=5)
+# Largest list accepted by POST /shipments/bulk/
+COURIER_BULK_CREATE_MAX_ITEMS = env.int("COURIER_BULK_CREATE_MAX_ITEMS", default=5000)
+# Buffered webhook events applied per transaction by apply_tracking_webhooks
+COURIER_WEBHOOK_BATCH_SIZE = env.int("COURIER_WEBHOOK_BATCH_SIZE", default=500)
+# Rows read from the server-side cursor and written per chunk by shipment exports
+COURIER_EXPORT_CHUNK_SIZE = env.int("COURIER_EXPORT_CHUNK_SIZE", default=2000)
+# Monthly partitions of the tracking history table, once it is converted with
+# `manage.py tracking_partitions --convert`. maintain_tracking_partitions keeps
+# months_ahead months of partitions ready and detaches partitions older than
+# retention_months (None keeps every partition). Detached partitions move to
+# archive_schema, or are dropped when expired is "drop".
+COURIER_TRACKING_PARTITIONS = {
+    'months_ahead': env.int('COURIER_TRACKING_PARTITIONS_MONTHS_AHEAD', default=3),
+    'retention_months': env.int('COURIER_TRACKING_RETENTION_MONTHS', default=None),
+    'expired': env('COURIER_TRACKING_EXPIRED_PARTITIONS', default='detach'),
+    'archive_schema': env('COURIER_TRACKING_ARCHIVE_SCHEMA', default='archive'),
+}
@@ -6,4 +6,4 @@ class CoreConfig(AppConfig):
     name = "zs.apps.core"
 
     def ready(self):
-        pass
\ No newline at end of file
+        import zs.apps.core.signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,100 @@
+import re
+from typing import Callable, Iterator, Optional
+
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+# For content that never changes once stored, e.g. a courier label
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def stream_file(file, start: int, length: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield `length` bytes of a file from `start`, closing it when done"""
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def parse_range(header: Optional[str], size: int):
+    """
+    Parse a single byte range header
+
+    Returns:
+        (start, end) inclusive, None to serve the whole file, or False when
+        the range cannot be satisfied
+    """
+    match = RANGE_RE.match(header or "")
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(0, size - int(last))
+        end = size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def ranged_file_response(
+    request,
+    open_file: Callable,
+    size: int,
+    etag: str,
+    content_type: str,
+    filename: Optional[str] = None,
+    cache_control: str = IMMUTABLE_CACHE_CONTROL,
+):
+    """
+    Stream a stored file with ETag, conditional GET and single Range support
+
+    Args:
+        request: Incoming request
+        open_file: Returns the file opened for binary reading; only called
+            when the body is sent
+        size: File size in bytes
+        etag: Entity tag of the content, without quotes
+        content_type: Content-Type of the file
+        filename: Download name for Content-Disposition
+        cache_control: Cache-Control header value
+    """
+    quoted_etag = f'"{etag}"'
+    headers = {"ETag": quoted_etag, "Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    if quoted_etag in [tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")]:
+        not_modified = HttpResponseNotModified()
+        for key in ("ETag", "Cache-Control"):
+            not_modified[key] = headers[key]
+        return not_modified
+
+    byte_range = None
+    if request.headers.get("If-Range", quoted_etag) == quoted_etag:
+        byte_range = parse_range(request.headers.get("Range"), size)
+    if byte_range is False:
+        return HttpResponse(status=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        stream_file(open_file(), start, length),
+        status=206 if byte_range else 200,
+        content_type=content_type,
+        headers=headers,
+    )
+    response["Content-Length"] = str(length)
+    if byte_range:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.8 on 2026-10-17 00:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppSetting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('value', models.CharField(max_length=1000)),
+            ],
+            options={
+                'verbose_name': 'App Settings',
+            },
+        ),
+    ]
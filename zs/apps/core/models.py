@@ -1,6 +1,7 @@
-import ast
 from django.db import models
 
+from zs.apps.core.settings_registry import SettingsRegistry
+
 
 class TimeStampedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -20,44 +21,32 @@ class AppSetting(TimeStampedModel):
     def __str__(self):
         return f"{self.key}"
 
+    # Reads go through the in-process SettingsRegistry snapshot
+
     @classmethod
     def get_value(cls, key: str) -> str:
-        config = cls.objects.filter(key=key)
-        if config.exists():
-            return config.first().value
-        return ""
+        return SettingsRegistry.get(key)
+
+    @classmethod
+    def get_many(cls, keys) -> dict:
+        return SettingsRegistry.get_many(keys)
 
     @classmethod
     def get_float_value(cls, key: str) -> float:
-        config = cls.objects.filter(key=key)
-        if config.exists():
-            return float(config.first().value)
-        return 0.0
+        return SettingsRegistry.get_float(key, 0.0)
 
     @classmethod
     def get_email_list(cls, key: str) -> list:
-        data = cls.get_value(key=key)
-        if data:
-            return ast.literal_eval(data)
-        return []
+        return list(SettingsRegistry.get_literal(key, []))
 
     @classmethod
     def get_value_as_list(cls, key: str) -> list:
-        data = cls.get_value(key=key)
-        if data:
-            return ast.literal_eval(data)
-        return []
+        return list(SettingsRegistry.get_literal(key, []))
 
     @classmethod
     def get_bool_value(cls, key: str) -> bool:
-        config = cls.objects.filter(key=key)
-        if config.exists():
-            return ast.literal_eval(config.first().value)
-        return False
+        return SettingsRegistry.get_literal(key, False)
 
     @classmethod
     def get_url_value(cls, key: str) -> str:
-        config = cls.objects.filter(key=key)
-        if config.exists():
-            return config.first().value
-        return ""
\ No newline at end of file
+        return SettingsRegistry.get(key)
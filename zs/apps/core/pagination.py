@@ -0,0 +1,133 @@
+import base64
+import json
+from typing import Any, List, Optional, Sequence
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a unique ordering
+
+    Each page is read with a WHERE on the last row of the previous page
+    instead of an OFFSET, so every page costs the same and rows inserted
+    meanwhile neither repeat nor go missing. The ordering fields must not
+    be nullable, must end with a unique field and should be backed by an
+    index.
+
+    The cursor is opaque to clients: the ordering values of the last row,
+    base64 encoded. Paging is forward only; responses look like
+    {"next": <url or null>, "results": [...]}.
+
+    Subclass and set `ordering` (and the page size attributes) per endpoint.
+    """
+
+    ordering: Sequence[str] = ("-created_at", "-id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> Optional[List[Any]]:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.fields = [queryset.model._meta.get_field(name.lstrip("-")) for name in self.ordering]
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.seek_filter(position))
+            except DjangoValidationError:
+                raise NotFound(self.invalid_cursor_message)
+
+        # One extra row tells whether there is a next page
+        page = list(queryset[: self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.page = page[: self.page_size]
+        return self.page
+
+    def seek_filter(self, position: List[str]) -> Q:
+        """
+        Rows after `position` in the ordering
+
+        For (-created_at, -id) this is
+        created_at < a OR (created_at = a AND id < b).
+        """
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, position):
+            field = name.lstrip("-")
+            lookup = "lt" if name.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request) -> Optional[List[str]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+        except (TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None or not isinstance(value, str) for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, obj) -> str:
+        # value_to_string keeps full precision, e.g. microseconds of datetimes
+        position = [field.value_to_string(obj) for field in self.fields]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode("ascii")
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor from the `next` link of the previous page",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Results per page, at most {self.max_page_size}",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -1,52 +1,103 @@
 import json
+from decimal import Decimal
 from uuid import UUID
 
+import orjson
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
 from rest_framework.exceptions import ValidationError
 from rest_framework.renderers import BaseRenderer
 
 from zs.apps.core.response import APPResponse, AppStatus, errors_messages
 
 
+def _envelope(data, renderer_context):
+    """Wrap response data in the APPResponse envelope"""
+    if renderer_context.get("response").status_code in (200, 201, 202, 204):
+        return APPResponse.get_response(
+            success=True,
+            message="Success",
+            status=AppStatus.Success.value,
+            response=data,
+        )
+    return APPResponse.get_response(
+        success=False,
+        message="Something went wrong.",
+        status=AppStatus.Error.value,
+        response=data.pop("response", {}),
+        error=errors_messages(ValidationError(data)),
+    )
+
+
+def coerce_string_booleans(data):
+    """
+    Recursively convert "true", "false", "null" and "None" strings to
+    native values.
+    """
+    if isinstance(data, dict):
+        return {key: coerce_string_booleans(value) for key, value in data.items()}
+    elif isinstance(data, list):
+        return [coerce_string_booleans(item) for item in data]
+    elif isinstance(data, str):
+        lowered = data.lower()
+        if lowered == "true":
+            return True
+        if lowered == "false":
+            return False
+        if lowered == "null" or data == "None":
+            return None
+    return data
+
+
+def _default(obj):
+    """Types orjson does not encode itself"""
+    if isinstance(obj, Decimal):
+        # As DRF's COERCE_DECIMAL_TO_STRING does
+        return str(obj)
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONRenderer(BaseRenderer):
+    """
+    APPResponse envelope renderer encoding with orjson
+
+    UUID, datetime, date and time are encoded natively, Decimal as a
+    string. Views that still return "true"/"false" strings and rely on
+    them becoming booleans set `coerce_string_booleans = True`.
+    """
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        response_data = _envelope(data, renderer_context)
+        if self.coerce_booleans(renderer_context):
+            response_data = coerce_string_booleans(response_data)
+        return orjson.dumps(response_data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+    def coerce_booleans(self, renderer_context) -> bool:
+        return getattr(renderer_context.get("view"), "coerce_string_booleans", False)
+
+
 class CustomJSONRenderer(BaseRenderer):
+    """
+    Previous envelope renderer, kept for compatibility
+
+    Coerces boolean strings in every response and encodes with the
+    stdlib json module. Prefer FastJSONRenderer.
+    """
     media_type = "application/json"
     format = "json"
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
-        if renderer_context.get("response").status_code in (200, 201, 204):
-            response_data = APPResponse.get_response(
-                success=True,
-                message="Success",
-                status=AppStatus.Success.value,
-                response=data,
-            )
-        else:
-            response_data = APPResponse.get_response(
-                success=False,
-                message="Something went wrong.",
-                status=AppStatus.Error.value,
-                response=data.pop("response", {}),
-                error=errors_messages(ValidationError(data)),
-            )
-        response_data = self._fix_boolean_values(response_data)
+        response_data = coerce_string_booleans(_envelope(data, renderer_context))
         return json.dumps(response_data, cls=UUIDEncoder)
 
-    def _fix_boolean_values(self, data):
-        """
-        Recursively convert string representations of booleans to native booleans.
-        """
-        if isinstance(data, dict):
-            return {key: self._fix_boolean_values(value) for key, value in data.items()}
-        elif isinstance(data, list):
-            return [self._fix_boolean_values(item) for item in data]
-        elif isinstance(data, str):
-            if data.lower() == "true":
-                return True
-            if data.lower() == "false":
-                return False
-            if data.lower() == "null" or data == "None":
-                return None
-        return data
-
 
 class UUIDEncoder(json.JSONEncoder):
     def default(self, obj):
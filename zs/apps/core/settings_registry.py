@@ -0,0 +1,124 @@
+import ast
+import copy
+import logging
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Version stamp of the AppSetting table, shared by all processes
+VERSION_CACHE_KEY = "core:app_settings:version"
+
+_MISSING = object()
+
+# (version, values, parsed values)
+SnapshotState = Tuple[Optional[str], Dict[str, str], Dict[tuple, Any]]
+
+# Within a request or task: whether the version stamp was checked yet;
+# None outside of one. A context variable, so concurrent requests served
+# by one ASGI event loop thread do not share it.
+_checked: ContextVar[Optional[bool]] = ContextVar("app_settings_checked", default=None)
+
+
+class SettingsRegistry:
+    """
+    In-process snapshot of all AppSetting rows.
+
+    Rows are loaded with one query and typed values are parsed once per
+    snapshot. Saving or deleting an AppSetting stamps a new version in the
+    cache after commit; a process reloads its snapshot when the stamp no
+    longer matches. The stamp is checked at most once per request or
+    Celery task (begin() is called from request_started and task_prerun);
+    outside of those, e.g. in management commands, on every read. Parsed
+    values are shared by the process, so callers get copies of them.
+    """
+
+    # (version, values, parsed values), replaced as a whole on reload
+    _snapshot_state: Optional[SnapshotState] = None
+
+    @classmethod
+    def begin(cls, **kwargs):
+        """Start of a request or task: check the version on the next read"""
+        _checked.set(False)
+
+    @classmethod
+    def end(cls, **kwargs):
+        _checked.set(None)
+
+    @classmethod
+    def bump_version(cls, **kwargs):
+        """Stamp a new version so every process reloads"""
+        cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        # The change is visible to the rest of this request or task too
+        if _checked.get() is not None:
+            _checked.set(False)
+
+    @classmethod
+    def _current_version(cls) -> str:
+        version = cache.get(VERSION_CACHE_KEY)
+        if version is None:
+            # First process up or the stamp was evicted
+            cache.add(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+            version = cache.get(VERSION_CACHE_KEY)
+        return version
+
+    @classmethod
+    def _snapshot(cls) -> SnapshotState:
+        state = cls._snapshot_state
+        if state is not None and _checked.get():
+            return state
+        # The stamp is read before the rows; a change in between stamps again
+        version = cls._current_version()
+        if _checked.get() is not None:
+            _checked.set(True)
+        if state is None or version is None or version != state[0]:
+            state = cls._reload(version)
+        return state
+
+    @classmethod
+    def _reload(cls, version: Optional[str]) -> SnapshotState:
+        from zs.apps.core.models import AppSetting
+
+        values = dict(AppSetting.objects.values_list("key", "value"))
+        state: SnapshotState = (version, values, {})
+        cls._snapshot_state = state
+        logger.debug(f"Loaded {len(values)} app settings, version {version}")
+        return state
+
+    @classmethod
+    def clear(cls):
+        """Drop the snapshot of this process"""
+        cls._snapshot_state = None
+
+    @classmethod
+    def get(cls, key: str, default: str = "") -> str:
+        return cls._snapshot()[1].get(key, default)
+
+    @classmethod
+    def get_many(cls, keys: Iterable[str]) -> Dict[str, str]:
+        """Values of the given keys that exist, from one snapshot"""
+        values = cls._snapshot()[1]
+        return {key: values[key] for key in keys if key in values}
+
+    @classmethod
+    def _get_parsed(cls, key: str, parser: Callable[[str], Any], default: Any) -> Any:
+        _, values, parsed_values = cls._snapshot()
+        if not values.get(key):
+            return default
+        parsed = parsed_values.get((parser, key), _MISSING)
+        if parsed is _MISSING:
+            parsed = parsed_values[(parser, key)] = parser(values[key])
+        # Lists and dicts must not be changed in the snapshot by a caller
+        return copy.deepcopy(parsed)
+
+    @classmethod
+    def get_float(cls, key: str, default: float = 0.0) -> float:
+        return cls._get_parsed(key, float, default)
+
+    @classmethod
+    def get_literal(cls, key: str, default: Any = None) -> Any:
+        """Value parsed as a Python literal, e.g. a list or a bool"""
+        return cls._get_parsed(key, ast.literal_eval, default)
@@ -0,0 +1,20 @@
+from celery.signals import task_postrun, task_prerun
+from django.core.signals import request_finished, request_started
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from zs.apps.core.models import AppSetting
+from zs.apps.core.settings_registry import SettingsRegistry
+
+
+@receiver([post_save, post_delete], sender=AppSetting)
+def app_setting_changed(sender, **kwargs):
+    # Other processes must not reload before the change is visible to them
+    transaction.on_commit(SettingsRegistry.bump_version)
+
+
+request_started.connect(SettingsRegistry.begin, dispatch_uid="settings_registry_begin")
+request_finished.connect(SettingsRegistry.end, dispatch_uid="settings_registry_end")
+task_prerun.connect(SettingsRegistry.begin, dispatch_uid="settings_registry_begin", weak=False)
+task_postrun.connect(SettingsRegistry.end, dispatch_uid="settings_registry_end", weak=False)
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark for the APPResponse renderers.
+
+Renders a 10k-row shipment list, as ShipmentSerializer produces it, with the
+previous CustomJSONRenderer (boolean coercion of every string, stdlib json)
+and FastJSONRenderer, with and without opt-in coercion:
+
+    DJANGO_SETTINGS_MODULE=config.settings.test python -m zs.apps.core.tests.bench_renderers
+"""
+import timeit
+from types import SimpleNamespace
+from uuid import uuid4
+
+import django
+
+django.setup()
+
+from zs.apps.core.renderers import CustomJSONRenderer, FastJSONRenderer  # noqa: E402
+
+
+def build_rows(count):
+    return [
+        {
+            'id': n,
+            'uuid': uuid4(),
+            'reference_number': f'REF{n:08d}',
+            'courier': {
+                'id': 1, 'code': 'aramex', 'name': 'ARAMEX',
+                'supports_cancellation': True, 'circuit_state': 'closed',
+            },
+            'waybill_id': f'{44000000000 + n}',
+            'status': 'in_transit',
+            'created_at': '2025-04-06T10:00:00.123456Z',
+            'updated_at': '2025-04-06T12:00:00.123456Z',
+            'last_tracking_update': None,
+        }
+        for n in range(count)
+    ]
+
+
+def main():
+    rows = build_rows(10000)
+    context = {'response': SimpleNamespace(status_code=200), 'view': None}
+    coercing = {**context, 'view': SimpleNamespace(coerce_string_booleans=True)}
+    cases = (
+        ('CustomJSONRenderer', CustomJSONRenderer(), context),
+        ('FastJSONRenderer', FastJSONRenderer(), context),
+        ('FastJSONRenderer, coercion', FastJSONRenderer(), coercing),
+    )
+    number = 10
+    baseline = None
+    for name, renderer, renderer_context in cases:
+        seconds = timeit.timeit(
+            lambda: renderer.render({'next': None, 'results': rows}, renderer_context=renderer_context),
+            number=number,
+        ) / number
+        baseline = baseline or seconds
+        print(f'{name:<28} 10000 rows: {seconds * 1000:8.2f} ms  ({baseline / seconds:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import UUID
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+
+from zs.apps.core.renderers import CustomJSONRenderer, FastJSONRenderer
+
+
+def context(status_code=200, view=None):
+    return {'response': SimpleNamespace(status_code=status_code), 'view': view}
+
+
+class TestFastJSONRenderer(SimpleTestCase):
+    """Test the orjson envelope renderer"""
+
+    def render(self, data, **kwargs):
+        return json.loads(FastJSONRenderer().render(data, renderer_context=context(**kwargs)))
+
+    def test_success_envelope_and_native_types(self):
+        data = {
+            'id': UUID('12345678-1234-5678-1234-567812345678'),
+            'at': datetime(2025, 4, 6, 10, 0, tzinfo=timezone.utc),
+            'weight': Decimal('2.50'),
+            'label': gettext_lazy('Shipment'),
+            'flag': 'true',
+        }
+
+        self.assertEqual(self.render(data), {
+            'success': True,
+            'status': 'success',
+            'message': 'Success',
+            'response': {
+                'id': '12345678-1234-5678-1234-567812345678',
+                'at': '2025-04-06T10:00:00+00:00',
+                'weight': '2.50',
+                'label': 'Shipment',
+                'flag': 'true',
+            },
+            'error': {},
+        })
+
+    def test_boolean_coercion_is_opt_in_per_view(self):
+        view = SimpleNamespace(coerce_string_booleans=True)
+
+        rendered = self.render({'flags': ['true', 'False', 'None', 'text']}, view=view)
+
+        self.assertEqual(rendered['response'], {'flags': [True, False, None, 'text']})
+
+    def test_error_envelope_matches_the_previous_renderer(self):
+        errors = {'status': ['Unknown status: lost']}
+        previous = CustomJSONRenderer().render(dict(errors), renderer_context=context(400))
+
+        self.assertEqual(self.render(dict(errors), status_code=400), json.loads(previous))
@@ -0,0 +1,104 @@
+import ast
+import asyncio
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase
+from unittest.mock import patch
+
+from zs.apps.core.models import AppSetting
+from zs.apps.core.settings_registry import VERSION_CACHE_KEY, SettingsRegistry
+
+
+class TestSettingsRegistry(TestCase):
+    """Test the cached AppSetting snapshot"""
+
+    def setUp(self):
+        cache.clear()
+        SettingsRegistry.clear()
+        SettingsRegistry.end()
+        AppSetting.objects.bulk_create([
+            AppSetting(key='rate', value='1.5'),
+            AppSetting(key='emails', value="['ops@example.com']"),
+            AppSetting(key='enabled', value='True'),
+        ])
+
+    def tearDown(self):
+        SettingsRegistry.end()
+        SettingsRegistry.clear()
+        cache.clear()
+
+    def test_snapshot_is_loaded_once(self):
+        SettingsRegistry.begin()
+        with self.assertNumQueries(1):
+            self.assertEqual(AppSetting.get_float_value('rate'), 1.5)
+            self.assertEqual(AppSetting.get_email_list('emails'), ['ops@example.com'])
+            self.assertIs(AppSetting.get_bool_value('enabled'), True)
+            self.assertEqual(AppSetting.get_value('missing'), '')
+            self.assertEqual(AppSetting.get_many(['rate', 'missing']), {'rate': '1.5'})
+
+        SettingsRegistry.begin()
+        with self.assertNumQueries(0):
+            self.assertEqual(AppSetting.get_float_value('rate'), 1.5)
+
+    def test_typed_values_are_parsed_once(self):
+        with patch('zs.apps.core.settings_registry.ast.literal_eval', wraps=ast.literal_eval) as parse:
+            emails = SettingsRegistry.get_literal('emails')
+            # Callers get their own copy
+            emails.append('other@example.com')
+            self.assertEqual(SettingsRegistry.get_literal('emails'), ['ops@example.com'])
+
+        parse.assert_called_once()
+        AppSetting.get_email_list('emails').append('other@example.com')
+        self.assertEqual(AppSetting.get_email_list('emails'), ['ops@example.com'])
+
+    def test_saves_reload_after_commit(self):
+        SettingsRegistry.begin()
+        self.assertEqual(AppSetting.get_value('rate'), '1.5')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            setting = AppSetting.objects.get(key='rate')
+            setting.value = '2.0'
+            setting.save()
+            # Not committed yet
+            self.assertEqual(AppSetting.get_value('rate'), '1.5')
+
+        self.assertEqual(AppSetting.get_float_value('rate'), 2.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AppSetting.objects.get(key='rate').delete()
+        self.assertEqual(AppSetting.get_float_value('rate'), 0.0)
+
+    def test_version_is_checked_once_per_request(self):
+        SettingsRegistry.begin()
+        self.assertEqual(AppSetting.get_value('rate'), '1.5')
+        # Another process changed the row and stamped a new version
+        AppSetting.objects.filter(key='rate').update(value='3.0')
+        cache.set(VERSION_CACHE_KEY, 'other')
+
+        self.assertEqual(AppSetting.get_value('rate'), '1.5')
+        SettingsRegistry.begin()
+        self.assertEqual(AppSetting.get_value('rate'), '3.0')
+
+    async def test_requests_on_one_loop_keep_their_own_check(self):
+        """Under ASGI, requests share the loop thread but not the checked flag"""
+        checked = asyncio.Event()
+        finished = asyncio.Event()
+
+        async def long_request():
+            SettingsRegistry.begin()
+            self.assertEqual(await sync_to_async(AppSetting.get_value)('rate'), '1.5')
+            checked.set()
+            await finished.wait()
+            # Still checked for this request, so the new stamp is not read yet
+            self.assertEqual(await sync_to_async(AppSetting.get_value)('rate'), '1.5')
+
+        async def short_request():
+            await checked.wait()
+            # Another process changed the row and stamped a new version
+            await sync_to_async(AppSetting.objects.filter(key='rate').update)(value='3.0')
+            cache.set(VERSION_CACHE_KEY, 'other')
+            SettingsRegistry.begin()
+            SettingsRegistry.end()
+            finished.set()
+
+        await asyncio.gather(long_request(), short_request())
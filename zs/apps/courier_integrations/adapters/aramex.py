@@ -1,9 +1,10 @@
 import json
-import datetime
-import xml.etree.ElementTree as ET
-from typing import Dict, Any, Optional
+from itertools import batched
+from typing import Dict, Any, List, Optional
 
 from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from .aramex_envelope import ARAMEXEnvelopeBuilder
+from .aramex_response import ARAMEXResponse, parse_aramex_response
 from .base import BaseCourierAdapter
 from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
 
@@ -15,332 +16,252 @@ class ARAMEXCourierAdapter(BaseCourierAdapter):
     endpoint, while tracking uses a dedicated tracking endpoint.
     """
 
+    # TrackShipments takes an array of waybill numbers
+    supports_batch_tracking = True
+    max_tracking_batch_size = 50
+
+    # CreateShipments takes an array of Shipment elements
+    supports_batch_creation = True
+    max_creation_batch_size = 50
+
+    def __init__(self, courier_code: Optional[str] = None, courier_config: Optional[Dict[str, Any]] = None):
+        super().__init__(courier_code, courier_config)
+        self.envelopes = ARAMEXEnvelopeBuilder(self.config)
+        self._shipping_endpoint = f"{self.config.get('api_url')}/ShippingAPI.V2/Shipping/Service_1_0.svc"
+        self._tracking_endpoint = f"{self.config.get('api_url')}/ShippingAPI.V2/Tracking/Service_1_0.svc"
+
     def create_waybill(self, shipment_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create ARAMEX waybill"""
-        # Full endpoint URL as specified in the WSDL
-        endpoint = f"{self.config['api_url']}/ShippingAPI.V2/Shipping/Service_1_0.svc"
-
-        # Format shipping date as per ARAMEX requirements
-        shipping_date = datetime.datetime.strptime(
-            shipment_data.get("shipping_date"), "%Y-%m-%d"
-        )
-        formatted_date = shipping_date.strftime("%Y-%m-%dT%H:%M:%S")
-
-        # Create XML SOAP request payload with ClientInfo section for authentication
-        # Using correct namespaces from the WSDL
-        xml_payload = f"""<?xml version="1.0" encoding="utf-8"?>
-        <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" 
-                    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" 
-                    xmlns:xsd="http://www.w3.org/2001/XMLSchema">
-        <soap:Body>
-            <v1:CreateShipments xmlns:v1="http://ws.aramex.net/ShippingAPI/v1/">
-            <v1:ClientInfo>
-                <v1:UserName>{self.config.get("username")}</v1:UserName>
-                <v1:Password>{self.config.get("password")}</v1:Password>
-                <v1:Version>{self.config.get("version", "v1.0")}</v1:Version>
-                <v1:AccountNumber>{self.config.get("account_number")}</v1:AccountNumber>
-                <v1:AccountPin>{self.config.get("account_pin")}</v1:AccountPin>
-                <v1:AccountEntity>{self.config.get("account_entity")}</v1:AccountEntity>
-                <v1:AccountCountryCode>{self.config.get("account_country_code")}</v1:AccountCountryCode>
-            </v1:ClientInfo>
-            <v1:Shipments>
-                <v1:Shipment>
-                <v1:Shipper>
-                    <v1:Reference1>Shipper Reference</v1:Reference1>
-                    <v1:AccountNumber>{self.config.get("account_number")}</v1:AccountNumber>
-                    <v1:PartyAddress>
-                    <v1:Line1>{self.config.get("shipper_address_line1")}</v1:Line1>
-                    <v1:City>{self.config.get("shipper_city")}</v1:City>
-                    <v1:CountryCode>{self.config.get("shipper_country_code")}</v1:CountryCode>
-                    </v1:PartyAddress>
-                    <v1:Contact>
-                    <v1:PersonName>{self.config.get("shipper_name")}</v1:PersonName>
-                    <v1:CompanyName>{self.config.get("shipper_company")}</v1:CompanyName>
-                    <v1:PhoneNumber1>{self.config.get("shipper_phone")}</v1:PhoneNumber1>
-                    <v1:EmailAddress>{self.config.get("shipper_email")}</v1:EmailAddress>
-                    </v1:Contact>
-                </v1:Shipper>
-                <v1:Consignee>
-                    <v1:Reference1>{shipment_data.get("reference_number")}</v1:Reference1>
-                    <v1:PartyAddress>
-                    <v1:Line1>{shipment_data.get("address_line1")}</v1:Line1>
-                    <v1:City>{shipment_data.get("destination_city")}</v1:City>
-                    <v1:CountryCode>{shipment_data.get("destination_country")}</v1:CountryCode>
-                    </v1:PartyAddress>
-                    <v1:Contact>
-                    <v1:PersonName>{shipment_data.get("customer_name")}</v1:PersonName>
-                    <v1:CompanyName>{shipment_data.get("customer_name")}</v1:CompanyName>
-                    <v1:PhoneNumber1>{shipment_data.get("phone_number")}</v1:PhoneNumber1>
-                    <v1:EmailAddress>{shipment_data.get("email", "")}</v1:EmailAddress>
-                    </v1:Contact>
-                </v1:Consignee>
-                <v1:ShippingDateTime>{formatted_date}</v1:ShippingDateTime>
-                <v1:DueDate>{shipping_date.strftime('%Y-%m-%d')}</v1:DueDate>
-                <v1:Details>
-                    <v1:ProductGroup>EXP</v1:ProductGroup>
-                    <v1:ProductType>PD</v1:ProductType>
-                    <v1:PaymentType>P</v1:PaymentType>
-                    <v1:PaymentOptions>CC</v1:PaymentOptions>
-                    <v1:Services>
-                    <v1:Service>
-                        <v1:Code>COD</v1:Code>
-                        <v1:Description>Cash on Delivery</v1:Description>
-                        <v1:Value>{shipment_data.get("cod_amount", 0)}</v1:Value>
-                        <v1:CurrencyCode>{shipment_data.get("currency", "USD")}</v1:CurrencyCode>
-                    </v1:Service>
-                    </v1:Services>
-                    <v1:Items>
-                    <v1:ShipmentItem>
-                        <v1:PackageType>Box</v1:PackageType>
-                        <v1:Quantity>{shipment_data.get("package_count", 1)}</v1:Quantity>
-                        <v1:Weight>
-                        <v1:Unit>KG</v1:Unit>
-                        <v1:Value>{shipment_data.get("weight")}</v1:Value>
-                        </v1:Weight>
-                    </v1:ShipmentItem>
-                    </v1:Items>
-                </v1:Details>
-                </v1:Shipment>
-            </v1:Shipments>
-            </v1:CreateShipments>
-        </soap:Body>
-        </soap:Envelope>"""
-
-        # Make API request with proper error handling
+        endpoint, xml_payload = self._build_create_waybill_request(shipment_data)
         response = self._make_api_request(
-            "POST",
-            endpoint,
-            data=xml_payload,
-            headers={
-                "Content-Type": "text/xml; charset=utf-8",
-                "SOAPAction": "http://ws.aramex.net/ShippingAPI/v1/Service_1_0/CreateShipments",
-            },
+            "POST", endpoint, data=xml_payload, headers=self._soap_headers("CreateShipments"),
+            operation="create",
         )
-
-        # Parse XML response
-        root = ET.fromstring(response.content)
-
-        # Check for API errors using XML parsing
-        has_errors = self._extract_xml_value(root, ".//HasErrors")
-        if has_errors and has_errors.lower() == "true":
-            notifications = self._extract_xml_value(root, ".//Notifications")
-            raise CourierAPIError(f"ARAMEX API error: {notifications}")
-
-        # Extract waybill information from ProcessedShipment
-        waybill_id = self._extract_xml_value(root, ".//ProcessedShipment/ID")
-        label_url = self._extract_xml_value(
-            root, ".//ProcessedShipment/ShipmentLabel/LabelURL"
+        return self._parse_create_waybill_response(response)
+
+    async def acreate_waybill(self, shipment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create ARAMEX waybill without blocking the event loop"""
+        endpoint, xml_payload = self._build_create_waybill_request(shipment_data)
+        response = await self._amake_api_request(
+            "POST", endpoint, data=xml_payload, headers=self._soap_headers("CreateShipments"),
+            operation="create",
         )
+        return self._parse_create_waybill_response(response)
+
+    def create_waybills(self, shipments_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create ARAMEX waybills in batches of up to get_creation_batch_size() shipments"""
+        results = []
+        for batch in batched(shipments_data, self.get_creation_batch_size()):
+            endpoint, xml_payload = self._build_create_waybill_request(batch)
+            response = self._make_api_request(
+                "POST", endpoint, data=xml_payload, headers=self._soap_headers("CreateShipments"),
+                operation="create",
+            )
+            results.extend(self._parse_create_waybills_response(response, len(batch)))
+        return results
+
+    def _build_create_waybill_request(self, shipment_data):
+        """Build CreateShipments endpoint and SOAP payload for one or more shipments"""
+        if isinstance(shipment_data, dict):
+            shipment_data = [shipment_data]
+        return self._shipping_endpoint, self.envelopes.create_shipments(shipment_data)
+
+    def _parse_create_waybill_response(self, response) -> Dict[str, Any]:
+        """Parse CreateShipments response into the unified waybill format"""
+        parsed = self._parse_response(response)
 
-        # Transform ARAMEX response to unified format
+        # Extract waybill information from ProcessedShipment
+        shipment = parsed.processed_shipments[0] if parsed.processed_shipments else {}
+        return self._build_waybill_data(shipment, response.text)
+
+    def _parse_create_waybills_response(self, response, count: int) -> List[Dict[str, Any]]:
+        """
+        Parse a multi-shipment CreateShipments response
+
+        ProcessedShipments come back in request order. The top level
+        HasErrors is set when any shipment failed, so errors are reported
+        per shipment from its own HasErrors and Notifications.
+        """
+        parsed = parse_aramex_response(response.content)
+        if len(parsed.processed_shipments) != count:
+            raise CourierAPIError(f"ARAMEX API error: {parsed.error_message or 'unexpected response'}")
+        return [
+            {"error": "; ".join(shipment["notifications"]) or "Shipment rejected"}
+            if shipment["has_errors"]
+            else self._build_waybill_data(shipment)
+            for shipment in parsed.processed_shipments
+        ]
+
+    def _build_waybill_data(self, shipment: Dict[str, Any], raw_response=None) -> Dict[str, Any]:
+        """Transform an ARAMEX ProcessedShipment to the unified waybill format"""
+        waybill_id = shipment.get("id")
         return {
             "waybill_id": waybill_id,
             "tracking_url": f"{self.config['tracking_url']}/{waybill_id}",
             "status": "created",
             "courier_reference": waybill_id,
-            "label_url": label_url,
-            "raw_response": response.text,
+            "label_url": shipment.get("label_url"),
+            "raw_response": raw_response,
         }
 
     def print_waybill_label(self, waybill_id: str) -> Dict[str, Any]:
         """Generate ARAMEX waybill label"""
-        endpoint = f"{self.config['api_url']}/ShippingAPI.V2/Shipping/Service_1_0.svc"
-
-        xml_payload = f"""<?xml version="1.0" encoding="utf-8"?>
-    <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" 
-                xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" 
-                xmlns:xsd="http://www.w3.org/2001/XMLSchema">
-    <soap:Body>
-        <v1:PrintLabel xmlns:v1="http://ws.aramex.net/ShippingAPI/v1/">
-        <v1:ClientInfo>
-            <v1:UserName>{self.config.get("username")}</v1:UserName>
-            <v1:Password>{self.config.get("password")}</v1:Password>
-            <v1:Version>{self.config.get("version", "v1.0")}</v1:Version>
-            <v1:AccountNumber>{self.config.get("account_number")}</v1:AccountNumber>
-            <v1:AccountPin>{self.config.get("account_pin")}</v1:AccountPin>
-            <v1:AccountEntity>{self.config.get("account_entity")}</v1:AccountEntity>
-            <v1:AccountCountryCode>{self.config.get("account_country_code")}</v1:AccountCountryCode>
-        </v1:ClientInfo>
-        <v1:ShipmentNumber>{waybill_id}</v1:ShipmentNumber>
-        <v1:LabelInfo>
-            <v1:ReportID>9201</v1:ReportID>
-            <v1:ReportType>URL</v1:ReportType>
-        </v1:LabelInfo>
-        </v1:PrintLabel>
-    </soap:Body>
-    </soap:Envelope>"""
-
+        endpoint, xml_payload = self._build_print_label_request(waybill_id)
         response = self._make_api_request(
-            "POST",
-            endpoint,
-            data=xml_payload,
-            headers={
-                "Content-Type": "text/xml; charset=utf-8",
-                "SOAPAction": "http://ws.aramex.net/ShippingAPI/v1/Service_1_0/PrintLabel",
-            },
+            "POST", endpoint, data=xml_payload, headers=self._soap_headers("PrintLabel"),
+            operation="label",
         )
+        return self._parse_print_label_response(response)
+
+    async def aprint_waybill_label(self, waybill_id: str) -> Dict[str, Any]:
+        """Generate ARAMEX waybill label without blocking the event loop"""
+        endpoint, xml_payload = self._build_print_label_request(waybill_id)
+        response = await self._amake_api_request(
+            "POST", endpoint, data=xml_payload, headers=self._soap_headers("PrintLabel"),
+            operation="label",
+        )
+        return self._parse_print_label_response(response)
 
-        root = ET.fromstring(response.content)
-
-        has_errors = self._extract_xml_value(root, ".//HasErrors")
-        if has_errors and has_errors.lower() == "true":
-            notifications = self._extract_xml_value(root, ".//Notifications")
-            raise CourierAPIError(f"ARAMEX API error: {notifications}")
-
-        label_url = self._extract_xml_value(root, ".//ShipmentLabel/LabelURL")
+    def _build_print_label_request(self, waybill_id: str):
+        """Build PrintLabel endpoint and SOAP payload"""
+        return self._shipping_endpoint, self.envelopes.print_label(waybill_id)
 
-        return {"label_url": label_url, "raw_response": response.text}
+    def _parse_print_label_response(self, response) -> Dict[str, Any]:
+        """Parse PrintLabel response"""
+        parsed = self._parse_response(response)
+        return {"label_url": parsed.label_url, "raw_response": response.text}
 
     def track_shipment(self, waybill_id: str) -> Dict[str, Any]:
         """Track ARAMEX shipment using the tracking API"""
-        endpoint = f"{self.config['api_url']}/ShippingAPI.V2/Tracking/Service_1_0.svc"
-
-        xml_payload = f"""<?xml version="1.0" encoding="utf-8"?>
-    <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"
-                xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" 
-                xmlns:xsd="http://www.w3.org/2001/XMLSchema">
-    <soap:Body>
-        <v1:TrackShipments xmlns:v1="http://ws.aramex.net/ShippingAPI/v1/">
-        <v1:ClientInfo>
-            <v1:UserName>{self.config.get('username')}</v1:UserName>
-            <v1:Password>{self.config.get('password')}</v1:Password>
-            <v1:Version>{self.config.get('version', 'v1.0')}</v1:Version>
-            <v1:AccountNumber>{self.config.get('account_number')}</v1:AccountNumber>
-            <v1:AccountPin>{self.config.get('account_pin')}</v1:AccountPin>
-            <v1:AccountEntity>{self.config.get('account_entity')}</v1:AccountEntity>
-            <v1:AccountCountryCode>{self.config.get('account_country_code')}</v1:AccountCountryCode>
-        </v1:ClientInfo>
-        <v1:Shipments>
-            <v1:string>{waybill_id}</v1:string>
-        </v1:Shipments>
-        </v1:TrackShipments>
-    </soap:Body>
-    </soap:Envelope>"""
-
+        endpoint, xml_payload = self._build_track_request([waybill_id])
         response = self._make_api_request(
-            "POST",
-            endpoint,
-            data=xml_payload,
-            headers={
-                "Content-Type": "text/xml; charset=utf-8",
-                "SOAPAction": "http://ws.aramex.net/ShippingAPI/v1/Service_1_0/TrackShipments",
-            },
+            "POST", endpoint, data=xml_payload, headers=self._soap_headers("TrackShipments"),
+            operation="track",
         )
+        results = self._parse_track_response(response)
+        return results.get(waybill_id) or self._build_tracking_data(waybill_id, [], response.text)
+
+    async def atrack_shipment(self, waybill_id: str) -> Dict[str, Any]:
+        """Track ARAMEX shipment without blocking the event loop"""
+        endpoint, xml_payload = self._build_track_request([waybill_id])
+        response = await self._amake_api_request(
+            "POST", endpoint, data=xml_payload, headers=self._soap_headers("TrackShipments"),
+            operation="track",
+        )
+        results = self._parse_track_response(response)
+        return results.get(waybill_id) or self._build_tracking_data(waybill_id, [], response.text)
+
+    def track_shipments(self, waybill_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Track ARAMEX shipments in batches of up to get_tracking_batch_size() waybills"""
+        results = {}
+        for batch in batched(waybill_ids, self.get_tracking_batch_size()):
+            endpoint, xml_payload = self._build_track_request(batch)
+            response = self._make_api_request(
+                "POST", endpoint, data=xml_payload, headers=self._soap_headers("TrackShipments"),
+                operation="track",
+            )
+            results.update(self._parse_track_response(response))
+        return results
+
+    async def atrack_shipments(self, waybill_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Track ARAMEX shipments in batches without blocking the event loop"""
+        results = {}
+        for batch in batched(waybill_ids, self.get_tracking_batch_size()):
+            endpoint, xml_payload = self._build_track_request(batch)
+            response = await self._amake_api_request(
+                "POST", endpoint, data=xml_payload, headers=self._soap_headers("TrackShipments"),
+                operation="track",
+            )
+            results.update(self._parse_track_response(response))
+        return results
+
+    def _build_track_request(self, waybill_ids):
+        """Build TrackShipments endpoint and SOAP payload for one or more waybills"""
+        return self._tracking_endpoint, self.envelopes.track_shipments(waybill_ids)
+
+    def _parse_track_response(self, response) -> Dict[str, Dict[str, Any]]:
+        """
+        Parse TrackShipments response into unified tracking data per waybill
+
+        TrackingResults holds one KeyValueOfstringArrayOfTrackingResult entry
+        per waybill: Key is the waybill number and Value the list of its
+        TrackingResult events.
+        """
+        parsed = self._parse_response(response)
+        return {
+            waybill_id: self._build_tracking_data(waybill_id, events, response.text)
+            for waybill_id, events in parsed.tracking_results.items()
+            if waybill_id
+        }
 
-        root = ET.fromstring(response.content)
-
-        has_errors = self._extract_xml_value(root, ".//HasErrors")
-        if has_errors and has_errors.lower() == "true":
-            notifications = self._extract_xml_value(root, ".//Notifications")
-            raise CourierAPIError(f"ARAMEX API error: {notifications}")
-
-        # Assume the response contains a TrackingResult node
-        current_status = self._extract_xml_value(root, ".//TrackingResult/Value")
-        current_location = self._extract_xml_value(root, ".//TrackingResult/UpdateLocation")
-        timestamp = self._extract_xml_value(root, ".//TrackingResult/UpdateDateTime")
+    def _build_tracking_data(self, waybill_id: str, events: List[Dict[str, str]], raw_response) -> Dict[str, Any]:
+        """Transform ARAMEX TrackingResult events to unified format"""
+        # UpdateDateTime is ISO 8601, so the latest event sorts last
+        latest = max(events, key=lambda event: event.get("UpdateDateTime", ""), default={})
 
-        tracking_data = {
+        return {
             "waybill_id": waybill_id,
-            "current_status": self.map_status(current_status or ""),
-            "current_location": current_location or "",
-            "timestamp": timestamp or "",
-            "raw_response": response.text,
+            "current_status": self.map_status(latest.get("UpdateDescription", "")),
+            "current_location": latest.get("UpdateLocation", ""),
+            "timestamp": latest.get("UpdateDateTime", ""),
+            "history": [
+                {
+                    "status": self.map_status(event.get("UpdateDescription", "")),
+                    "description": event.get("UpdateDescription", ""),
+                    "location": event.get("UpdateLocation", ""),
+                    "timestamp": event.get("UpdateDateTime", ""),
+                }
+                for event in events
+            ],
+            "raw_response": raw_response,
         }
 
-        return tracking_data
-
     def cancel_shipment(self, waybill_id: str) -> Dict[str, Any]:
         """Cancel ARAMEX shipment"""
-        endpoint = f"{self.config['api_url']}/ShippingAPI.V2/Shipping/Service_1_0.svc"
-
-        xml_payload = f"""<?xml version="1.0" encoding="utf-8"?>
-    <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" 
-                xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" 
-                xmlns:xsd="http://www.w3.org/2001/XMLSchema">
-    <soap:Body>
-        <v1:CancelShipments xmlns:v1="http://ws.aramex.net/ShippingAPI/v1/">
-        <v1:ClientInfo>
-            <v1:UserName>{self.config.get("username")}</v1:UserName>
-            <v1:Password>{self.config.get("password")}</v1:Password>
-            <v1:Version>{self.config.get("version", "v1.0")}</v1:Version>
-            <v1:AccountNumber>{self.config.get("account_number")}</v1:AccountNumber>
-            <v1:AccountPin>{self.config.get("account_pin")}</v1:AccountPin>
-            <v1:AccountEntity>{self.config.get("account_entity")}</v1:AccountEntity>
-            <v1:AccountCountryCode>{self.config.get("account_country_code")}</v1:AccountCountryCode>
-        </v1:ClientInfo>
-        <v1:ShipmentNumbers>
-            <v1:string>{waybill_id}</v1:string>
-        </v1:ShipmentNumbers>
-        <v1:Comments>Cancellation requested by user</v1:Comments>
-        </v1:CancelShipments>
-    </soap:Body>
-    </soap:Envelope>"""
-
+        endpoint, xml_payload = self._build_cancel_request(waybill_id)
         response = self._make_api_request(
-            "POST",
-            endpoint,
-            data=xml_payload,
-            headers={
-                "Content-Type": "text/xml; charset=utf-8",
-                "SOAPAction": "http://ws.aramex.net/ShippingAPI/v1/Service_1_0/CancelShipments",
-            },
+            "POST", endpoint, data=xml_payload, headers=self._soap_headers("CancelShipments"),
+            operation="cancel",
+        )
+        return self._parse_cancel_response(response, waybill_id)
+
+    async def acancel_shipment(self, waybill_id: str) -> Dict[str, Any]:
+        """Cancel ARAMEX shipment without blocking the event loop"""
+        endpoint, xml_payload = self._build_cancel_request(waybill_id)
+        response = await self._amake_api_request(
+            "POST", endpoint, data=xml_payload, headers=self._soap_headers("CancelShipments"),
+            operation="cancel",
         )
+        return self._parse_cancel_response(response, waybill_id)
+
+    def _build_cancel_request(self, waybill_id: str):
+        """Build CancelShipments endpoint and SOAP payload"""
+        return self._shipping_endpoint, self.envelopes.cancel_shipments([waybill_id])
 
-        root = ET.fromstring(response.content)
+    def _parse_cancel_response(self, response, waybill_id: str) -> Dict[str, Any]:
+        """Parse CancelShipments response"""
+        parsed = parse_aramex_response(response.content)
 
-        has_errors = self._extract_xml_value(root, ".//HasErrors")
         # if HasErrors is not "true", then consider it a success
-        is_success = has_errors != "true"
-        message = self._extract_xml_value(root, ".//Message") or ""
+        is_success = not parsed.has_errors
 
         return {
             "waybill_id": waybill_id,
             "status": "cancelled" if is_success else "cancellation_failed",
-            "message": message,
+            "message": parsed.message or "",
             "raw_response": response.text,
         }
 
-    def _extract_xml_value(self, root, xpath):
-        """Helper method to extract values from XML using XPath."""
-        try:
-            # Register all namespaces in the document
-            namespaces = {
-                'soap': 'http://schemas.xmlsoap.org/soap/envelope/',
-                'v1': 'http://ws.aramex.net/ShippingAPI/v1/',
-                's': 'http://ws.aramex.net/ShippingAPI/v2/',
-            }
-            
-            # Clean xpath if it begins with //
-            clean_xpath = xpath.lstrip('/.')
-            
-            # Try different namespace combinations
-            for ns, uri in namespaces.items():
-                # Try with namespace prefix
-                try:
-                    elements = root.findall(f'.//{{{uri}}}{clean_xpath}')
-                    if elements and elements[0].text:
-                        return elements[0].text
-                except Exception:
-                    pass
-                    
-            # If still not found, try without namespaces
-            for elem in root.iter():
-                if '}' in elem.tag:
-                    # Remove namespace
-                    elem.tag = elem.tag.split('}', 1)[1]
-                    
-            # Try direct search for the last part of xpath
-            if '/' in clean_xpath:
-                tag_name = clean_xpath.split('/')[-1]
-                for elem in root.iter():
-                    if elem.tag == tag_name and elem.text:
-                        return elem.text
-                        
-        except Exception as e:
-            import logging
-            logging.error(f"Error extracting XML value: {e}")
-            
-        return None
+    def _soap_headers(self, action: str) -> Dict[str, str]:
+        """HTTP headers for an ARAMEX SOAP action"""
+        return SOAP_HEADERS[action]
+
+    def _parse_response(self, response) -> ARAMEXResponse:
+        """Extract the response fields and raise on ARAMEX API errors"""
+        parsed = parse_aramex_response(response.content)
+        if parsed.has_errors:
+            raise CourierAPIError(f"ARAMEX API error: {parsed.error_message}")
+        return parsed
 
     def _get_status_mappings(self) -> Dict[str, str]:
         """ARAMEX-specific status mappings"""
@@ -352,7 +273,7 @@ class ARAMEXCourierAdapter(BaseCourierAdapter):
             "information received": ShipmentStatus.PENDING.value,
             "out for delivery": ShipmentStatus.OUT_FOR_DELIVERY.value,
             "returned": ShipmentStatus.RETURNED.value,
-            "exception": ShipmentStatus.EXCEPTION.value,
+            "exception": ShipmentStatus.FAILED.value,
             "cancelled": ShipmentStatus.CANCELLED.value,
         }
 
@@ -365,7 +286,7 @@ class ARAMEXCourierAdapter(BaseCourierAdapter):
         logger.debug(f"Headers: {headers}")
         logger.debug(f"Payload: {data}")
 
-    def _make_api_request(self, method, url, **kwargs):
+    def _make_api_request(self, method, url, operation=None, **kwargs):
         """Override make_api_request to add detailed logging"""
         import logging
         logger = logging.getLogger(__name__)
@@ -377,11 +298,34 @@ class ARAMEXCourierAdapter(BaseCourierAdapter):
         if 'SOAPAction' in kwargs.get('headers', {}):
             logger.debug(f"SOAP Action: {kwargs['headers']['SOAPAction']}")
         
-        response = super()._make_api_request(method, url, **kwargs)
+        response = super()._make_api_request(method, url, operation=operation, **kwargs)
         
         # Add response logging for troubleshooting
         logger.debug(f"Response status: {response.status_code}")
         if response.status_code != 200:
             logger.error(f"Error response: {response.text[:500]}")  # Log first 500 chars
             
-        return response
\ No newline at end of file
+        return response
+
+    async def _amake_api_request(self, method, url, operation=None, **kwargs):
+        """Override async make_api_request to add the same logging"""
+        import logging
+        logger = logging.getLogger(__name__)
+
+        logger.debug(f"Async API Request: {method} {url}")
+        if 'SOAPAction' in kwargs.get('headers', {}):
+            logger.debug(f"SOAP Action: {kwargs['headers']['SOAPAction']}")
+
+        response = await super()._amake_api_request(method, url, operation=operation, **kwargs)
+
+        logger.debug(f"Response status: {response.status_code}")
+        return response
+
+
+SOAP_HEADERS = {
+    action: {
+        "Content-Type": "text/xml; charset=utf-8",
+        "SOAPAction": f"http://ws.aramex.net/ShippingAPI/v1/Service_1_0/{action}",
+    }
+    for action in ("CreateShipments", "PrintLabel", "TrackShipments", "CancelShipments")
+}
@@ -0,0 +1,242 @@
+import datetime
+from string import Formatter
+from typing import Dict, Any, Iterable, List, Optional, Union
+from xml.sax.saxutils import escape
+
+
+SOAP_ENVELOPE_HEAD = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xmlns:xsd="http://www.w3.org/2001/XMLSchema">'
+    '<soap:Body>'
+)
+SOAP_ENVELOPE_TAIL = '</soap:Body></soap:Envelope>'
+
+CLIENT_INFO = (
+    '<v1:ClientInfo>'
+    '<v1:UserName>{username}</v1:UserName>'
+    '<v1:Password>{password}</v1:Password>'
+    '<v1:Version>{version}</v1:Version>'
+    '<v1:AccountNumber>{account_number}</v1:AccountNumber>'
+    '<v1:AccountPin>{account_pin}</v1:AccountPin>'
+    '<v1:AccountEntity>{account_entity}</v1:AccountEntity>'
+    '<v1:AccountCountryCode>{account_country_code}</v1:AccountCountryCode>'
+    '</v1:ClientInfo>'
+)
+
+CREATE_SHIPMENTS_HEAD = (
+    SOAP_ENVELOPE_HEAD
+    + '<v1:CreateShipments xmlns:v1="http://ws.aramex.net/ShippingAPI/v1/">'
+    + CLIENT_INFO
+    + '<v1:Shipments>'
+)
+CREATE_SHIPMENTS_ITEM = (
+    '<v1:Shipment>'
+    '<v1:Shipper>'
+    '<v1:Reference1>Shipper Reference</v1:Reference1>'
+    '<v1:AccountNumber>{account_number}</v1:AccountNumber>'
+    '<v1:PartyAddress>'
+    '<v1:Line1>{shipper_address_line1}</v1:Line1>'
+    '<v1:City>{shipper_city}</v1:City>'
+    '<v1:CountryCode>{shipper_country_code}</v1:CountryCode>'
+    '</v1:PartyAddress>'
+    '<v1:Contact>'
+    '<v1:PersonName>{shipper_name}</v1:PersonName>'
+    '<v1:CompanyName>{shipper_company}</v1:CompanyName>'
+    '<v1:PhoneNumber1>{shipper_phone}</v1:PhoneNumber1>'
+    '<v1:EmailAddress>{shipper_email}</v1:EmailAddress>'
+    '</v1:Contact>'
+    '</v1:Shipper>'
+    '<v1:Consignee>'
+    '<v1:Reference1>{reference_number}</v1:Reference1>'
+    '<v1:PartyAddress>'
+    '<v1:Line1>{address_line1}</v1:Line1>'
+    '<v1:City>{destination_city}</v1:City>'
+    '<v1:CountryCode>{destination_country}</v1:CountryCode>'
+    '</v1:PartyAddress>'
+    '<v1:Contact>'
+    '<v1:PersonName>{customer_name}</v1:PersonName>'
+    '<v1:CompanyName>{customer_name}</v1:CompanyName>'
+    '<v1:PhoneNumber1>{phone_number}</v1:PhoneNumber1>'
+    '<v1:EmailAddress>{email}</v1:EmailAddress>'
+    '</v1:Contact>'
+    '</v1:Consignee>'
+    '<v1:ShippingDateTime>{shipping_date_time}</v1:ShippingDateTime>'
+    '<v1:DueDate>{due_date}</v1:DueDate>'
+    '<v1:Details>'
+    '<v1:ProductGroup>EXP</v1:ProductGroup>'
+    '<v1:ProductType>PD</v1:ProductType>'
+    '<v1:PaymentType>P</v1:PaymentType>'
+    '<v1:PaymentOptions>CC</v1:PaymentOptions>'
+    '<v1:Services>'
+    '<v1:Service>'
+    '<v1:Code>COD</v1:Code>'
+    '<v1:Description>Cash on Delivery</v1:Description>'
+    '<v1:Value>{cod_amount}</v1:Value>'
+    '<v1:CurrencyCode>{currency}</v1:CurrencyCode>'
+    '</v1:Service>'
+    '</v1:Services>'
+    '<v1:Items>'
+    '<v1:ShipmentItem>'
+    '<v1:PackageType>Box</v1:PackageType>'
+    '<v1:Quantity>{package_count}</v1:Quantity>'
+    '<v1:Weight>'
+    '<v1:Unit>KG</v1:Unit>'
+    '<v1:Value>{weight}</v1:Value>'
+    '</v1:Weight>'
+    '</v1:ShipmentItem>'
+    '</v1:Items>'
+    '</v1:Details>'
+    '</v1:Shipment>'
+)
+CREATE_SHIPMENTS_TAIL = '</v1:Shipments></v1:CreateShipments>' + SOAP_ENVELOPE_TAIL
+
+PRINT_LABEL = (
+    SOAP_ENVELOPE_HEAD
+    + '<v1:PrintLabel xmlns:v1="http://ws.aramex.net/ShippingAPI/v1/">'
+    + CLIENT_INFO
+    + '<v1:ShipmentNumber>{waybill_id}</v1:ShipmentNumber>'
+    '<v1:LabelInfo>'
+    '<v1:ReportID>9201</v1:ReportID>'
+    '<v1:ReportType>URL</v1:ReportType>'
+    '</v1:LabelInfo>'
+    '</v1:PrintLabel>'
+    + SOAP_ENVELOPE_TAIL
+)
+
+TRACK_SHIPMENTS_HEAD = (
+    SOAP_ENVELOPE_HEAD
+    + '<v1:TrackShipments xmlns:v1="http://ws.aramex.net/ShippingAPI/v1/">'
+    + CLIENT_INFO
+    + '<v1:Shipments>'
+)
+TRACK_SHIPMENTS_TAIL = '</v1:Shipments></v1:TrackShipments>' + SOAP_ENVELOPE_TAIL
+
+CANCEL_SHIPMENTS_HEAD = (
+    SOAP_ENVELOPE_HEAD
+    + '<v1:CancelShipments xmlns:v1="http://ws.aramex.net/ShippingAPI/v1/">'
+    + CLIENT_INFO
+    + '<v1:ShipmentNumbers>'
+)
+CANCEL_SHIPMENTS_TAIL = (
+    '</v1:ShipmentNumbers>'
+    '<v1:Comments>Cancellation requested by user</v1:Comments>'
+    '</v1:CancelShipments>'
+    + SOAP_ENVELOPE_TAIL
+)
+
+WAYBILL_ITEM = '<v1:string>{waybill_id}</v1:string>'
+
+# Courier config keys rendered into the templates once per adapter
+CONFIG_FIELDS = (
+    "username", "password", "version", "account_number", "account_pin",
+    "account_entity", "account_country_code", "shipper_address_line1",
+    "shipper_city", "shipper_country_code", "shipper_name", "shipper_company",
+    "shipper_phone", "shipper_email",
+)
+
+
+def xml_text(value: Any) -> str:
+    """Escape a value for use as XML element text; None renders empty"""
+    if value is None:
+        return ""
+    return escape(str(value))
+
+
+class CompiledTemplate:
+    """
+    XML template compiled into pre-encoded byte chunks.
+
+    Fields found in ``static`` are escaped and inlined at compile time, so
+    rendering only escapes and encodes the remaining dynamic fields.
+    """
+
+    def __init__(self, template: str, static: Dict[str, Any]):
+        self.chunks: List[Union[bytes, str]] = []
+        literal = ""
+        for text, field, _, _ in Formatter().parse(template):
+            literal += text
+            if field is None:
+                continue
+            if field in static:
+                literal += xml_text(static[field])
+                continue
+            self.chunks.append(literal.encode("utf-8"))
+            self.chunks.append(field)
+            literal = ""
+        self.chunks.append(literal.encode("utf-8"))
+
+    def render_parts(self, values: Dict[str, Any]):
+        """Yield the byte chunks of the rendered template"""
+        for chunk in self.chunks:
+            if isinstance(chunk, bytes):
+                yield chunk
+            else:
+                yield xml_text(values.get(chunk)).encode("utf-8")
+
+    def render(self, values: Optional[Dict[str, Any]] = None) -> bytes:
+        return b"".join(self.render_parts(values or {}))
+
+
+class ARAMEXEnvelopeBuilder:
+    """
+    Builds ARAMEX SOAP request bodies.
+
+    The ClientInfo credentials and the shipper block come from the courier
+    config and are rendered once per adapter instance; every request only
+    renders the shipment specific values.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        static = {field: config.get(field) for field in CONFIG_FIELDS}
+        static["version"] = config.get("version", "v1.0")
+
+        self._create_head = CompiledTemplate(CREATE_SHIPMENTS_HEAD, static).render()
+        self._create_item = CompiledTemplate(CREATE_SHIPMENTS_ITEM, static)
+        self._create_tail = CREATE_SHIPMENTS_TAIL.encode("utf-8")
+        self._print_label = CompiledTemplate(PRINT_LABEL, static)
+        self._track_head = CompiledTemplate(TRACK_SHIPMENTS_HEAD, static).render()
+        self._track_tail = TRACK_SHIPMENTS_TAIL.encode("utf-8")
+        self._cancel_head = CompiledTemplate(CANCEL_SHIPMENTS_HEAD, static).render()
+        self._cancel_tail = CANCEL_SHIPMENTS_TAIL.encode("utf-8")
+        self._waybill_item = CompiledTemplate(WAYBILL_ITEM, {})
+
+    def create_shipments(self, shipments: Iterable[Dict[str, Any]]) -> bytes:
+        """CreateShipments body with one <v1:Shipment> per shipment"""
+        parts = [self._create_head]
+        for shipment_data in shipments:
+            parts.extend(self._create_item.render_parts(self._shipment_values(shipment_data)))
+        parts.append(self._create_tail)
+        return b"".join(parts)
+
+    def print_label(self, waybill_id: str) -> bytes:
+        return self._print_label.render({"waybill_id": waybill_id})
+
+    def track_shipments(self, waybill_ids: Iterable[str]) -> bytes:
+        return self._waybill_list(self._track_head, waybill_ids, self._track_tail)
+
+    def cancel_shipments(self, waybill_ids: Iterable[str]) -> bytes:
+        return self._waybill_list(self._cancel_head, waybill_ids, self._cancel_tail)
+
+    def _waybill_list(self, head: bytes, waybill_ids: Iterable[str], tail: bytes) -> bytes:
+        parts = [head]
+        for waybill_id in waybill_ids:
+            parts.extend(self._waybill_item.render_parts({"waybill_id": waybill_id}))
+        parts.append(tail)
+        return b"".join(parts)
+
+    @staticmethod
+    def _shipment_values(shipment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Shipment values with ARAMEX formatted dates and defaults"""
+        # Format shipping date as per ARAMEX requirements
+        shipping_date = datetime.datetime.strptime(
+            shipment_data["shipping_date"], "%Y-%m-%d"
+        )
+        values = dict(shipment_data)
+        values["shipping_date_time"] = shipping_date.strftime("%Y-%m-%dT%H:%M:%S")
+        values["due_date"] = shipping_date.strftime("%Y-%m-%d")
+        values.setdefault("cod_amount", 0)
+        values.setdefault("currency", "USD")
+        values.setdefault("package_count", 1)
+        return values
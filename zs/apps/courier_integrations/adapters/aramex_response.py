@@ -0,0 +1,129 @@
+import io
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional
+
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
+
+
+def local_name(tag: str) -> str:
+    """Strip the namespace from an ElementTree tag"""
+    return tag.rsplit("}", 1)[-1]
+
+
+class ARAMEXResponse:
+    """
+    Fields extracted from an ARAMEX SOAP response.
+
+    Attributes:
+        has_errors: Top level HasErrors flag
+        notifications: "Code: Message" strings of the top level Notifications
+        message: First Message element found anywhere in the response
+        label_url: ShipmentLabel/LabelURL outside of a ProcessedShipment (PrintLabel)
+        processed_shipments: One dict per ProcessedShipment with id, label_url,
+            has_errors and notifications (CreateShipments)
+        tracking_results: TrackingResult events keyed by waybill (TrackShipments)
+    """
+
+    def __init__(self):
+        self.has_errors = False
+        self.notifications: List[str] = []
+        self.message: Optional[str] = None
+        self.label_url: Optional[str] = None
+        self.processed_shipments: List[Dict] = []
+        self.tracking_results: Dict[str, List[Dict[str, str]]] = {}
+
+    @property
+    def error_message(self) -> str:
+        return "; ".join(self.notifications)
+
+
+def parse_aramex_response(content: bytes) -> ARAMEXResponse:
+    """
+    Extract every field the ARAMEX adapter needs in one pass over the response.
+
+    Only element end events are handled: repeated containers (TrackingResult,
+    ProcessedShipment, the tracking key/value pairs) are read from their
+    children as soon as they close and then cleared, so memory stays flat
+    for large multi-waybill tracking responses. Top level fields are read
+    from the response element once parsing finishes.
+    """
+    result = ARAMEXResponse()
+    names: Dict[str, str] = {}
+    events = []
+    waybill_id = ""
+    response = None
+
+    try:
+        for _, elem in ET.iterparse(io.BytesIO(content)):
+            tag = elem.tag
+            name = names.get(tag)
+            if name is None:
+                name = names[tag] = local_name(tag)
+
+            if name == "TrackingResult":
+                events.append({
+                    names.get(child.tag) or local_name(child.tag): (child.text or "").strip()
+                    for child in elem
+                })
+                elem.clear()
+            elif name == "Key":
+                waybill_id = (elem.text or "").strip()
+            elif name.startswith("KeyValueOfstringArrayOfTrackingResult"):
+                result.tracking_results[waybill_id] = events
+                events = []
+                elem.clear()
+            elif name == "ProcessedShipment":
+                result.processed_shipments.append(_processed_shipment(elem))
+                elem.clear()
+            elif name == "Message" and result.message is None:
+                result.message = (elem.text or "").strip()
+            elif name == "Body" and len(elem):
+                response = elem[0]
+    except ET.ParseError as err:
+        raise CourierAPIError(f"ARAMEX API error: invalid XML response ({err})")
+
+    if response is not None:
+        fields = _children(response)
+        result.has_errors = _is_true(fields.get("HasErrors"))
+        result.notifications = _notifications(fields.get("Notifications"))
+        label = fields.get("ShipmentLabel")
+        if label is not None:
+            result.label_url = _text(_children(label).get("LabelURL"))
+
+    return result
+
+
+def _children(elem) -> Dict[str, ET.Element]:
+    return {local_name(child.tag): child for child in elem}
+
+
+def _text(elem) -> Optional[str]:
+    if elem is None:
+        return None
+    return (elem.text or "").strip()
+
+
+def _is_true(elem) -> bool:
+    return (_text(elem) or "").lower() == "true"
+
+
+def _notifications(elem) -> List[str]:
+    """"Code: Message" for every Notification under a Notifications element"""
+    if elem is None:
+        return []
+    notifications = []
+    for notification in elem:
+        fields = _children(notification)
+        notifications.append(f"{_text(fields.get('Code')) or ''}: {_text(fields.get('Message')) or ''}")
+    return notifications
+
+
+def _processed_shipment(elem) -> Dict:
+    fields = _children(elem)
+    label = fields.get("ShipmentLabel")
+    return {
+        "id": _text(fields.get("ID")),
+        "label_url": _text(_children(label).get("LabelURL")) if label is not None else None,
+        "has_errors": _is_true(fields.get("HasErrors")),
+        "notifications": _notifications(fields.get("Notifications")),
+    }
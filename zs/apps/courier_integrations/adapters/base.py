@@ -1,12 +1,20 @@
 # courier_integration/adapters/base.py
+import asyncio
+import hashlib
+import hmac
+import weakref
+import httpx
 import requests
 import logging
-from typing import Dict, Any, Optional
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Mapping, Optional, Union
+from asgiref.sync import sync_to_async
 from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
 from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
 from zs.apps.courier_integrations.interfaces.courier_interface import CourierInterface
+from zs.apps.courier_integrations.services.status_rules import StatusRules
+from .circuit_breaker import CircuitBreaker, is_courier_failure
+from .rate_limiter import RateLimiter, parse_retry_after
+from .transport import TransportProfile
 
 
 logger = logging.getLogger(__name__)
@@ -15,68 +23,237 @@ logger = logging.getLogger(__name__)
 class BaseCourierAdapter(CourierInterface):
     """Base implementation for courier adapters"""
     
-    def __init__(self):
-        """Initialize adapter with HTTP session and config"""
-        self.session = self._create_retry_session()
+    def __init__(self, courier_code: Optional[str] = None, courier_config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize adapter with config and HTTP session
+
+        Args:
+            courier_code: Code of the Courier record whose ``config`` overrides
+                the courier settings in COURIER_CONFIG
+            courier_config: ``Courier.config`` when already loaded; read from
+                the database by courier_code otherwise
+        """
+        self.courier_code = courier_code
+        self._courier_config = courier_config
         self.config = self._load_config()
-    
-    def _create_retry_session(self, 
-                             retries=3, 
-                             backoff_factor=0.3,
-                             status_forcelist=(500, 502, 504)):
-        """Create session with retry mechanism"""
-        session = requests.Session()
-        retry = Retry(
-            total=retries,
-            read=retries,
-            connect=retries,
-            backoff_factor=backoff_factor,
-            status_forcelist=status_forcelist,
+        self.transport = TransportProfile(self._load_transport_options())
+        self.session = self._create_retry_session()
+        name = courier_code or self._courier_name().lower()
+        self.circuit_breaker = CircuitBreaker(name, self.config.get("circuit_breaker"))
+        self.rate_limiter = RateLimiter(name, self.config.get("rate_limits"))
+        self._async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+            weakref.WeakKeyDictionary()
         )
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount('http://', adapter)
-        session.mount('https://', adapter)
-        return session
+        self._status_rules: Optional[StatusRules] = None
+    
+    def _create_retry_session(self) -> requests.Session:
+        """Create session with the pool size and retry policy of the transport profile"""
+        return self.transport.build_session()
+
+    def _create_async_client(self) -> httpx.AsyncClient:
+        """Create pooled async HTTP client from the transport profile"""
+        return self.transport.build_async_client()
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Get the async client bound to the running event loop.
+
+        httpx clients cannot be shared between event loops, so a pool is kept
+        per loop and dropped together with the loop.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = self._create_async_client()
+            self._async_clients[loop] = client
+        return client
+
+    async def aclose(self):
+        """Close the async client of the running event loop"""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        """
+        Close the HTTP session and the async clients of all event loops
+
+        Async clients are closed on the loop they belong to, without
+        waiting; clients of loops that no longer run are dropped.
+        """
+        self.session.close()
+        for loop, client in list(self._async_clients.items()):
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        self._async_clients.clear()
     
     def _load_config(self) -> Dict[str, Any]:
-        """Load courier-specific configuration"""
+        """
+        Courier settings from COURIER_CONFIG, overridden key by key by the
+        Courier record; `transport` options are merged one level deeper.
+        """
         from django.conf import settings
-        courier_name = self.__class__.__name__.replace('CourierAdapter', '')
-        return settings.COURIER_CONFIG.get(courier_name, {})
+        config = dict(settings.COURIER_CONFIG.get(self._courier_name(), {}))
+        courier_config = self._load_courier_config()
+        transport = {**config.get("transport", {}), **courier_config.get("transport", {})}
+        config.update(courier_config)
+        if transport:
+            config["transport"] = transport
+        return config
+
+    def _load_courier_config(self) -> Dict[str, Any]:
+        """Config JSON of the Courier record"""
+        if self._courier_config is not None:
+            return self._courier_config
+        if not self.courier_code:
+            return {}
+        from zs.apps.courier_integrations.models.courier import Courier
+        courier_config = (
+            Courier.objects.filter(code=self.courier_code)
+            .values_list("config", flat=True)
+            .first()
+        )
+        return courier_config or {}
+
+    def _courier_name(self) -> str:
+        """Courier name derived from the adapter class, e.g. ARAMEX"""
+        return self.__class__.__name__.replace('CourierAdapter', '')
+
+    def _load_transport_options(self) -> Dict[str, Any]:
+        """Transport options from settings, overridden by the Courier record"""
+        return dict(self.config.get("transport", {}))
     
     def map_status(self, courier_status: str) -> str:
         """
         Map courier-specific status to unified system status
         """
-        status_mapping = {
-            # Common status mappings across all couriers
-            "delivered": ShipmentStatus.DELIVERED.value,
-            "in_transit": ShipmentStatus.IN_TRANSIT.value,
-            "pending": ShipmentStatus.PENDING.value,
-            "returned": ShipmentStatus.RETURNED.value,
-            "failed": ShipmentStatus.FAILED.value,
-            # Courier-specific mappings to be extended in child classes
-        }
-        
-        # Extend with courier-specific mappings
-        status_mapping.update(self._get_status_mappings())
-        
-        return status_mapping.get(courier_status.lower(), ShipmentStatus.UNKNOWN.value)
-    
+        return self.status_rules.map(courier_status)
+
+    @property
+    def status_rules(self) -> StatusRules:
+        """Status rules of this courier, compiled on first use"""
+        if self._status_rules is None:
+            self._status_rules = StatusRules.compile(self.courier_code, {
+                # Common status mappings across all couriers
+                "delivered": ShipmentStatus.DELIVERED.value,
+                "in_transit": ShipmentStatus.IN_TRANSIT.value,
+                "pending": ShipmentStatus.PENDING.value,
+                "returned": ShipmentStatus.RETURNED.value,
+                "failed": ShipmentStatus.FAILED.value,
+                **self._get_status_mappings(),
+            })
+        return self._status_rules
+
     def _get_status_mappings(self) -> Dict[str, str]:
         """Get courier-specific status mappings"""
         return {}
+
+    def get_tracking_batch_size(self) -> int:
+        """Waybills per tracking request, overridable with `tracking_batch_size` in config"""
+        if not self.supports_batch_tracking:
+            return 1
+        return max(1, int(self.config.get("tracking_batch_size", self.max_tracking_batch_size)))
+
+    def get_creation_batch_size(self) -> int:
+        """Shipments per create request, overridable with `creation_batch_size` in config"""
+        if not self.supports_batch_creation:
+            return 1
+        return max(1, int(self.config.get("creation_batch_size", self.max_creation_batch_size)))
+
+    def fetch_label_pdf(self, waybill_id: str) -> bytes:
+        """
+        Get the waybill label as PDF bytes
+
+        Couriers that return a label URL instead of the document (ARAMEX)
+        have the PDF downloaded from it.
+
+        Raises:
+            CourierAPIError: If no PDF label could be obtained
+        """
+        label = self.print_waybill_label(waybill_id)
+        if isinstance(label, dict):
+            if not label.get("label_url"):
+                raise CourierAPIError(f"No label returned for waybill {waybill_id}")
+            pdf = self._make_api_request("GET", label["label_url"], operation="label").content
+        else:
+            pdf = label
+        if not pdf.startswith(b"%PDF"):
+            raise CourierAPIError(f"Label for waybill {waybill_id} is not a PDF document")
+        return pdf
+
+    def verify_webhook(self, body: bytes, headers: Mapping[str, str]) -> bool:
+        """
+        Check the signature of a webhook request
+
+        The default expects the hex HMAC-SHA256 of the raw body, keyed with
+        `webhook_secret` from config, in the `webhook_signature_header`
+        header (X-Webhook-Signature), optionally prefixed with "sha256=".
+        Webhooks are disabled while no secret is configured.
+        """
+        secret = self.config.get("webhook_secret")
+        if not secret:
+            return False
+        signature = headers.get(self.config.get("webhook_signature_header", "X-Webhook-Signature"), "")
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(signature.removeprefix("sha256="), expected)
+
+    def parse_webhook(self, payload: Any) -> List[Dict[str, Any]]:
+        """
+        Extract tracking events from a verified webhook payload
+
+        The default reads {"events": [{"waybill_id", "status", "location",
+        "timestamp", "description"}]}; couriers with their own format
+        override this.
+
+        Returns:
+            Events with waybill_id, courier_status, location, timestamp
+            (ISO string) and description
+
+        Raises:
+            CourierAPIError: If the payload has an unexpected format
+        """
+        try:
+            return [
+                {
+                    "waybill_id": str(event["waybill_id"]),
+                    "courier_status": str(event["status"]),
+                    "location": event.get("location") or "",
+                    "timestamp": event.get("timestamp") or "",
+                    "description": event.get("description") or str(event["status"]),
+                }
+                for event in payload["events"]
+            ]
+        except (KeyError, TypeError, AttributeError) as err:
+            raise CourierAPIError(f"Invalid webhook payload: {err!r}")
+
+    # Adapters without a native async implementation run the blocking call
+    # in a worker thread so the event loop is never blocked.
+
+    async def acreate_waybill(self, shipment_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await sync_to_async(self.create_waybill, thread_sensitive=False)(shipment_data)
+
+    async def aprint_waybill_label(self, waybill_id: str) -> Union[bytes, Dict[str, Any]]:
+        return await sync_to_async(self.print_waybill_label, thread_sensitive=False)(waybill_id)
+
+    async def atrack_shipment(self, waybill_id: str) -> Dict[str, Any]:
+        return await sync_to_async(self.track_shipment, thread_sensitive=False)(waybill_id)
+
+    async def acancel_shipment(self, waybill_id: str) -> Dict[str, Any]:
+        return await sync_to_async(self.cancel_shipment, thread_sensitive=False)(waybill_id)
         
-    def _make_api_request(self, method, url, **kwargs):
+    def _make_api_request(self, method, url, operation=None, **kwargs):
         """
         Make API request with error handling
+
+        ``operation`` selects the connect/read timeout of the transport
+        profile (an explicit ``timeout`` argument takes precedence) and the
+        rate limit bucket.
         """
         logger.debug(f"Making {method} request to {url}")
+        kwargs.setdefault("timeout", self.transport.timeout(operation))
         
         try:
-            response = self.session.request(method, url, **kwargs)
-            response.raise_for_status()
-            return response
+            return self._send_request(method, url, operation, **kwargs)
         except requests.exceptions.HTTPError as err:
             logger.error(f"HTTP error: {err}")
             raise CourierAPIError(f"HTTP error: {err}")
@@ -88,4 +265,89 @@ class BaseCourierAdapter(CourierInterface):
             raise CourierAPIError(f"Timeout error: {err}")
         except requests.exceptions.RequestException as err:
             logger.error(f"Request error: {err}")
-            raise CourierAPIError(f"Request error: {err}")
\ No newline at end of file
+            raise CourierAPIError(f"Request error: {err}")
+
+    async def _amake_api_request(self, method, url, operation=None, **kwargs):
+        """
+        Make API request on the pooled async client with error handling
+
+        Accepts the same keyword arguments as _make_api_request; ``data``
+        carrying a raw body is passed to httpx as ``content``.
+        """
+        logger.debug(f"Making async {method} request to {url}")
+        kwargs.setdefault("timeout", self.transport.httpx_timeout(operation))
+        if self._status_rules is None:
+            # Responses are mapped on the loop; compiling reads the database
+            await sync_to_async(lambda: self.status_rules)()
+
+        if isinstance(kwargs.get("data"), (str, bytes)):
+            kwargs["content"] = kwargs.pop("data")
+
+        try:
+            return await self._asend_request(method, url, operation, **kwargs)
+        except httpx.HTTPStatusError as err:
+            logger.error(f"HTTP error: {err}")
+            raise CourierAPIError(f"HTTP error: {err}")
+        except httpx.TimeoutException as err:
+            logger.error(f"Timeout error: {err}")
+            raise CourierAPIError(f"Timeout error: {err}")
+        except httpx.ConnectError as err:
+            logger.error(f"Connection error: {err}")
+            raise CourierAPIError(f"Connection error: {err}")
+        except httpx.HTTPError as err:
+            logger.error(f"Request error: {err}")
+            raise CourierAPIError(f"Request error: {err}")
+
+    def _send_request(self, method, url, operation=None, **kwargs):
+        """Send request through the circuit breaker and rate limiter, raising on HTTP errors"""
+        probe = self.circuit_breaker.before_request()
+        try:
+            self.rate_limiter.acquire(operation)
+        except Exception:
+            self.circuit_breaker.release_probe(probe)
+            raise
+        try:
+            response = self.session.request(method, url, **kwargs)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as err:
+            self._record_request_error(probe, operation, err)
+            raise
+        self.circuit_breaker.record_success(probe)
+        return response
+
+    async def _asend_request(self, method, url, operation=None, **kwargs):
+        """
+        Async variant of _send_request on the pooled client
+
+        The circuit breaker state lives in the cache, so it is checked and
+        recorded in a worker thread instead of blocking the event loop.
+        """
+        probe = await sync_to_async(self.circuit_breaker.before_request, thread_sensitive=False)()
+        try:
+            await self.rate_limiter.aacquire(operation)
+        except BaseException:
+            # Covers cancellation too, which would otherwise hold the probe
+            # slot until it expires
+            await sync_to_async(self.circuit_breaker.release_probe, thread_sensitive=False)(probe)
+            raise
+        try:
+            response = await self._get_async_client().request(method, url, **kwargs)
+            response.raise_for_status()
+        except httpx.HTTPError as err:
+            await sync_to_async(self._record_request_error, thread_sensitive=False)(probe, operation, err)
+            raise
+        except BaseException:
+            await sync_to_async(self.circuit_breaker.release_probe, thread_sensitive=False)(probe)
+            raise
+        await sync_to_async(self.circuit_breaker.record_success, thread_sensitive=False)(probe)
+        return response
+
+    def _record_request_error(self, probe, operation, err):
+        response = getattr(err, "response", None)
+        if response is not None and response.status_code == 429:
+            # Stop every process from calling the courier until it allows it again
+            self.rate_limiter.drain(operation, parse_retry_after(response.headers.get("Retry-After")))
+        if is_courier_failure(response):
+            self.circuit_breaker.record_failure(probe)
+        else:
+            self.circuit_breaker.record_success(probe)
@@ -0,0 +1,142 @@
+import logging
+import time
+from typing import Dict, Any, Optional
+
+from django.core.cache import cache
+
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierCircuitOpenError
+
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Defaults for the `circuit_breaker` section of a courier config
+DEFAULT_CIRCUIT_BREAKER = {
+    # Trip when at least `minimum_requests` were sent in the current window
+    # and this share of them failed
+    "failure_rate_threshold": 0.5,
+    "minimum_requests": 20,
+    "window_seconds": 60,
+    # Fail fast for this long before letting a single probe request through
+    "open_seconds": 30,
+}
+
+
+def is_courier_failure(response) -> bool:
+    """Whether a request outcome counts against the courier
+
+    No response (connection error, timeout), 5xx and 429 mean the courier
+    is unhealthy; other 4xx are caused by the request itself.
+    """
+    if response is None:
+        return True
+    return response.status_code >= 500 or response.status_code == 429
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker for one courier.
+
+    The state lives in the default cache (Redis in production), so every web
+    and worker process trips and recovers together. Failures are counted in
+    fixed windows; once the failure rate crosses the threshold the circuit
+    opens and requests fail fast with CourierCircuitOpenError. After
+    `open_seconds` one process wins the half-open probe: its success closes
+    the circuit, its failure opens it again.
+    """
+
+    def __init__(self, name: str, options: Optional[Dict[str, Any]] = None):
+        options = {**DEFAULT_CIRCUIT_BREAKER, **(options or {})}
+        self.name = name
+        self.failure_rate_threshold = float(options["failure_rate_threshold"])
+        self.minimum_requests = int(options["minimum_requests"])
+        self.window_seconds = int(options["window_seconds"])
+        self.open_seconds = int(options["open_seconds"])
+        self.key = f"courier:circuit:{name}"
+        self.open_key = f"{self.key}:opened_until"
+        self.probe_key = f"{self.key}:probe"
+
+    @property
+    def state(self) -> str:
+        opened_until = cache.get(self.open_key)
+        if opened_until is None:
+            return CLOSED
+        return OPEN if time.time() < opened_until else HALF_OPEN
+
+    def stats(self) -> Dict[str, Any]:
+        """State and counters of the current window, for the API and admin"""
+        requests_key, failures_key = self._window_keys()
+        counts = cache.get_many([requests_key, failures_key])
+        return {
+            "state": self.state,
+            "requests": counts.get(requests_key, 0),
+            "failures": counts.get(failures_key, 0),
+            "opened_until": cache.get(self.open_key),
+        }
+
+    def before_request(self) -> bool:
+        """
+        Check the circuit before sending a request
+
+        Returns:
+            True when this request is the half-open probe
+
+        Raises:
+            CourierCircuitOpenError: the circuit is open
+        """
+        opened_until = cache.get(self.open_key)
+        if opened_until is None:
+            return False
+        if time.time() >= opened_until and cache.add(self.probe_key, 1, self.open_seconds):
+            logger.info(f"Circuit breaker for {self.name} is half-open, sending probe")
+            return True
+        raise CourierCircuitOpenError(f"Circuit breaker open for {self.name}, request not sent")
+
+    def record_success(self, probe: bool = False):
+        if probe:
+            logger.info(f"Circuit breaker for {self.name} closed")
+            self.reset()
+            return
+        self._count(failed=False)
+
+    def record_failure(self, probe: bool = False):
+        if probe:
+            self._open()
+            return
+        requests, failures = self._count(failed=True)
+        if requests >= self.minimum_requests and failures / requests >= self.failure_rate_threshold:
+            self._open()
+
+    def release_probe(self, probe: bool):
+        """Give back the half-open probe slot of a request that was not sent"""
+        if probe:
+            cache.delete(self.probe_key)
+
+    def reset(self):
+        """Close the circuit and clear the current window"""
+        cache.delete_many([self.open_key, self.probe_key, *self._window_keys()])
+
+    def _open(self):
+        logger.warning(f"Circuit breaker for {self.name} opened for {self.open_seconds}s")
+        cache.set(self.open_key, time.time() + self.open_seconds, timeout=None)
+        cache.delete(self.probe_key)
+
+    def _window_keys(self):
+        window = int(time.time() // self.window_seconds)
+        return f"{self.key}:{window}:requests", f"{self.key}:{window}:failures"
+
+    def _count(self, failed: bool):
+        """Count a request in the current window; returns (requests, failures)"""
+        requests_key, failures_key = self._window_keys()
+        ttl = self.window_seconds * 2
+        cache.add(requests_key, 0, ttl)
+        requests = cache.incr(requests_key)
+        if failed:
+            cache.add(failures_key, 0, ttl)
+            failures = cache.incr(failures_key)
+        else:
+            failures = cache.get(failures_key, 0)
+        return requests, failures
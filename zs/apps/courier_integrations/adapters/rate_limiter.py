@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import RedisError
+
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierRateLimitError
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds a caller may wait for a token before CourierRateLimitError is raised
+DEFAULT_MAX_WAIT = 10.0
+# Pause applied when a courier answers 429 without a Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+# Refills the bucket, then takes a token or returns the seconds until one is
+# available. Uses the Redis clock so every process sees the same time.
+TAKE_TOKEN_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'blocked_until')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+local blocked_until = tonumber(state[3]) or 0
+if now < blocked_until then
+    return tostring(blocked_until - now)
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+# Empties the bucket and blocks it for ARGV[1] seconds
+DRAIN_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local blocked_until = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+redis.call('HSET', KEYS[1], 'tokens', '0', 'ts', tostring(now),
+           'blocked_until', tostring(math.max(current, blocked_until)))
+redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[1])) + 60)
+return 1
+"""
+
+# Seconds left of a pause set by DRAIN_SCRIPT, for operations without a limit
+BLOCKED_SCRIPT = """
+local blocked_until = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+return tostring(math.max(0, blocked_until - now))
+"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RedisTokenBucket:
+    """
+    Token bucket state in Redis, updated atomically by Lua scripts.
+
+    The scripts run on the raw client, which bypasses the cache's
+    IGNORE_EXCEPTIONS; like the cache, the bucket fails open so a Redis
+    outage does not stop every courier call.
+    """
+
+    def __init__(self, client):
+        self.take_token = client.register_script(TAKE_TOKEN_SCRIPT)
+        self.drain_bucket = client.register_script(DRAIN_SCRIPT)
+        self.blocked_for = client.register_script(BLOCKED_SCRIPT)
+
+    def take(self, key: str, rate: float, capacity: float) -> float:
+        try:
+            return float(self.take_token(keys=[key], args=[rate, capacity]))
+        except RedisError as err:
+            logger.warning(f"Rate limit bucket {key} unavailable, not throttling: {err}")
+            return 0.0
+
+    def drain(self, key: str, seconds: float):
+        try:
+            self.drain_bucket(keys=[key], args=[seconds])
+        except RedisError as err:
+            logger.warning(f"Rate limit bucket {key} unavailable, not draining: {err}")
+
+    def blocked(self, key: str) -> float:
+        try:
+            return float(self.blocked_for(keys=[key]))
+        except RedisError as err:
+            logger.warning(f"Rate limit bucket {key} unavailable, not pausing: {err}")
+            return 0.0
+
+
+class CacheTokenBucket:
+    """
+    Token bucket state in the Django cache.
+
+    Used when the cache is not Redis (local development and tests); updates
+    are not atomic across processes.
+    """
+
+    def take(self, key: str, rate: float, capacity: float) -> float:
+        now = time.time()
+        state = cache.get(key) or {"tokens": capacity, "ts": now, "blocked_until": 0}
+        if now < state["blocked_until"]:
+            return state["blocked_until"] - now
+        tokens = min(capacity, state["tokens"] + max(0.0, now - state["ts"]) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        cache.set(key, {**state, "tokens": tokens, "ts": now}, int(capacity / rate) + 60)
+        return wait
+
+    def drain(self, key: str, seconds: float):
+        now = time.time()
+        state = cache.get(key) or {"blocked_until": 0}
+        blocked_until = max(state["blocked_until"], now + seconds)
+        cache.set(key, {"tokens": 0, "ts": now, "blocked_until": blocked_until}, int(seconds) + 60)
+
+    def blocked(self, key: str) -> float:
+        state = cache.get(key)
+        if not state:
+            return 0.0
+        return max(0.0, state["blocked_until"] - time.time())
+
+
+def get_token_bucket_backend():
+    """Redis backend when the default cache is django-redis, cache backend otherwise"""
+    if settings.CACHES.get("default", {}).get("BACKEND", "").startswith("django_redis"):
+        from django_redis import get_redis_connection
+        return RedisTokenBucket(get_redis_connection("default"))
+    return CacheTokenBucket()
+
+
+class RateLimiter:
+    """
+    Cluster-wide token-bucket rate limiter for one courier.
+
+    Configured per operation in COURIER_CONFIG[<name>]["rate_limits"], e.g.
+    ``{"track": {"rate": 5, "burst": 10}, "default": {"rate": 10}}`` where
+    ``rate`` is requests per second and ``burst`` the bucket capacity.
+    Operations without a limit (and no "default") are not throttled, but
+    like all others they are paused for the Retry-After of a 429 answer.
+    """
+
+    def __init__(self, name: str, limits: Optional[Dict[str, Any]] = None, backend=None):
+        limits = dict(limits or {})
+        self.name = name
+        self.max_wait = float(limits.pop("max_wait", DEFAULT_MAX_WAIT))
+        self.default_retry_after = float(limits.pop("default_retry_after", DEFAULT_RETRY_AFTER))
+        self.limits = limits
+        self._backend = backend
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = get_token_bucket_backend()
+        return self._backend
+
+    def _limit(self, operation: Optional[str]):
+        limit = self.limits.get(operation or "default") or self.limits.get("default")
+        if not limit:
+            return None
+        rate = float(limit["rate"])
+        return rate, float(limit.get("burst", max(1.0, rate)))
+
+    def _key(self, operation: Optional[str]) -> str:
+        operation = operation if operation in self.limits else "default"
+        return f"courier:ratelimit:{self.name}:{operation}"
+
+    def reserve(self, operation: Optional[str] = None) -> float:
+        """Take a token; returns 0 on success or the seconds until one is available"""
+        limit = self._limit(operation)
+        if limit is None:
+            return self.backend.blocked(self._key(operation))
+        return self.backend.take(self._key(operation), *limit)
+
+    def acquire(self, operation: Optional[str] = None):
+        """
+        Block until a token is available
+
+        Raises:
+            CourierRateLimitError: no token became available within max_wait
+        """
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self.reserve(operation)
+            if not wait:
+                return
+            self._check_deadline(operation, deadline, wait)
+            time.sleep(wait)
+
+    async def aacquire(self, operation: Optional[str] = None):
+        """Async variant of acquire; waits without blocking the event loop"""
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = await sync_to_async(self.reserve, thread_sensitive=False)(operation)
+            if not wait:
+                return
+            self._check_deadline(operation, deadline, wait)
+            await asyncio.sleep(wait)
+
+    def drain(self, operation: Optional[str] = None, retry_after: Optional[float] = None):
+        """
+        Empty the bucket after a 429 so no process calls the courier before retry_after
+
+        Operations without a limit share the "default" bucket, which is
+        blocked the same way.
+        """
+        seconds = self.default_retry_after if retry_after is None else retry_after
+        logger.warning(f"{self.name} {operation or 'default'} rate limited by courier, pausing {seconds:.1f}s")
+        self.backend.drain(self._key(operation), seconds)
+
+    def _check_deadline(self, operation, deadline, wait):
+        if time.monotonic() + wait > deadline:
+            raise CourierRateLimitError(
+                f"Rate limit for {self.name} {operation or 'default'} exceeded, retry in {wait:.1f}s",
+                retry_after=wait,
+            )
@@ -1,5 +1,6 @@
 import json
 from typing import Dict, Any, Optional
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
 from .base import BaseCourierAdapter
 
 class SMSACourierAdapter(BaseCourierAdapter):
@@ -9,8 +10,30 @@ class SMSACourierAdapter(BaseCourierAdapter):
         """Create SMSA waybill"""
         endpoint = f"{self.config['api_url']}/createShipment"
         
-        # Transform system data to SMSA format
-        smsa_payload = {
+        response = self._make_api_request(
+            "POST",
+            endpoint,
+            operation="create",
+            json=self._build_create_payload(shipment_data),
+            headers={"Content-Type": "application/json"}
+        )
+            
+        return self._parse_create_result(response.json())
+
+    async def acreate_waybill(self, shipment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create SMSA waybill without blocking the event loop"""
+        response = await self._amake_api_request(
+            "POST",
+            f"{self.config['api_url']}/createShipment",
+            operation="create",
+            json=self._build_create_payload(shipment_data),
+            headers={"Content-Type": "application/json"}
+        )
+        return self._parse_create_result(response.json())
+
+    def _build_create_payload(self, shipment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Transform system data to SMSA format"""
+        return {
             "passKey": self.config['pass_key'],
             "refNo": shipment_data['reference_number'],
             "sentDate": shipment_data['shipping_date'],
@@ -30,19 +53,9 @@ class SMSACourierAdapter(BaseCourierAdapter):
             "weight": shipment_data['weight'],
             "itemDesc": shipment_data.get('description', 'Package'),
         }
-        
-        response = self.session.post(
-            endpoint,
-            json=smsa_payload,
-            headers={"Content-Type": "application/json"}
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"SMSA API error: {response.text}")
-            
-        result = response.json()
-        
-        # Transform SMSA response to unified format
+
+    def _parse_create_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Transform SMSA response to unified format"""
         return {
             "waybill_id": result.get("sawb", ""),
             "tracking_url": f"{self.config['tracking_url']}/{result.get('sawb', '')}",
@@ -60,12 +73,19 @@ class SMSACourierAdapter(BaseCourierAdapter):
             "passKey": self.config['pass_key']
         }
         
-        response = self.session.get(endpoint, params=params)
-        
-        if response.status_code != 200:
-            raise Exception(f"SMSA API error: {response.text}")
+        response = self._make_api_request("GET", endpoint, operation="label", params=params)
             
         return response.content
+
+    async def aprint_waybill_label(self, waybill_id: str) -> bytes:
+        """Generate SMSA waybill label without blocking the event loop"""
+        response = await self._amake_api_request(
+            "GET",
+            f"{self.config['api_url']}/getPDF",
+            operation="label",
+            params={"awbNo": waybill_id, "passKey": self.config['pass_key']}
+        )
+        return response.content
     
     def track_shipment(self, waybill_id: str) -> Dict[str, Any]:
         """Track SMSA shipment"""
@@ -76,14 +96,22 @@ class SMSACourierAdapter(BaseCourierAdapter):
             "passkey": self.config['pass_key']
         }
         
-        response = self.session.get(endpoint, params=params)
-        
-        if response.status_code != 200:
-            raise Exception(f"SMSA API error: {response.text}")
+        response = self._make_api_request("GET", endpoint, operation="track", params=params)
             
-        result = response.json()
-        
-        # Transform SMSA tracking response to unified format
+        return self._parse_tracking_result(response.json(), waybill_id)
+
+    async def atrack_shipment(self, waybill_id: str) -> Dict[str, Any]:
+        """Track SMSA shipment without blocking the event loop"""
+        response = await self._amake_api_request(
+            "GET",
+            f"{self.config['api_url']}/getTracking",
+            operation="track",
+            params={"awbNo": waybill_id, "passkey": self.config['pass_key']}
+        )
+        return self._parse_tracking_result(response.json(), waybill_id)
+
+    def _parse_tracking_result(self, result: Dict[str, Any], waybill_id: str) -> Dict[str, Any]:
+        """Transform SMSA tracking response to unified format"""
         tracking_data = {
             "waybill_id": waybill_id,
             "current_status": self.map_status(result.get("status", "")),
@@ -106,35 +134,47 @@ class SMSACourierAdapter(BaseCourierAdapter):
     def _get_status_mappings(self) -> Dict[str, str]:
         """SMSA-specific status mappings"""
         return {
-            "shipment created": "PENDING",
-            "out for delivery": "OUT_FOR_DELIVERY",
-            "shipment picked up": "PICKED_UP",
-            "delivered": "DELIVERED",
-            "delivery failed": "FAILED",
-            "returned to shipper": "RETURNED"
+            "shipment created": ShipmentStatus.PENDING.value,
+            "out for delivery": ShipmentStatus.OUT_FOR_DELIVERY.value,
+            "shipment picked up": ShipmentStatus.PICKED_UP.value,
+            "delivered": ShipmentStatus.DELIVERED.value,
+            "delivery failed": ShipmentStatus.FAILED.value,
+            "returned to shipper": ShipmentStatus.RETURNED.value,
         }
     
     def cancel_shipment(self, waybill_id: str) -> Dict[str, Any]:
         """Cancel SMSA shipment"""
         endpoint = f"{self.config['api_url']}/cancelShipment"
         
-        payload = {
-            "awbNo": waybill_id,
-            "passKey": self.config['pass_key'],
-            "reason": "Customer request"
-        }
-        
-        response = self.session.post(
+        response = self._make_api_request(
+            "POST",
             endpoint,
-            json=payload,
+            operation="cancel",
+            json=self._build_cancel_payload(waybill_id),
             headers={"Content-Type": "application/json"}
         )
-        
-        if response.status_code != 200:
-            raise Exception(f"SMSA API error: {response.text}")
             
-        result = response.json()
-        
+        return self._parse_cancel_result(response.json(), waybill_id)
+
+    async def acancel_shipment(self, waybill_id: str) -> Dict[str, Any]:
+        """Cancel SMSA shipment without blocking the event loop"""
+        response = await self._amake_api_request(
+            "POST",
+            f"{self.config['api_url']}/cancelShipment",
+            operation="cancel",
+            json=self._build_cancel_payload(waybill_id),
+            headers={"Content-Type": "application/json"}
+        )
+        return self._parse_cancel_result(response.json(), waybill_id)
+
+    def _build_cancel_payload(self, waybill_id: str) -> Dict[str, Any]:
+        return {
+            "awbNo": waybill_id,
+            "passKey": self.config['pass_key'],
+            "reason": "Customer request"
+        }
+
+    def _parse_cancel_result(self, result: Dict[str, Any], waybill_id: str) -> Dict[str, Any]:
         return {
             "waybill_id": waybill_id,
             "status": "cancelled" if result.get("success", False) else "cancellation_failed",
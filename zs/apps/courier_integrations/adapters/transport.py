@@ -0,0 +1,97 @@
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Defaults for the `transport` section of a courier config. Every key can be
+# overridden in COURIER_CONFIG[<name>]["transport"] and, per deployment, in
+# Courier.config["transport"].
+DEFAULT_TRANSPORT = {
+    # requests: number of host pools and connections kept per host
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    # httpx: connections shared by all coroutines of one event loop
+    "async_max_connections": 200,
+    "async_max_keepalive_connections": 50,
+    # seconds
+    "connect_timeout": 5.0,
+    "read_timeout": 30.0,
+    "keep_alive": True,
+    "keepalive_expiry": 5.0,
+    "retries": 3,
+    "backoff_factor": 0.3,
+    "status_forcelist": (500, 502, 504),
+    # Per operation overrides, e.g. {"track": {"read": 10}, "label": {"read": 60}}
+    "timeouts": {},
+}
+
+
+class TransportProfile:
+    """
+    HTTP transport settings of a courier.
+
+    Builds the pooled requests session and httpx client used by the adapters
+    and resolves connect/read timeouts per operation (create, label, track,
+    cancel).
+    """
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        options = {**DEFAULT_TRANSPORT, **(options or {})}
+        self.pool_connections = int(options["pool_connections"])
+        self.pool_maxsize = int(options["pool_maxsize"])
+        self.async_max_connections = int(options["async_max_connections"])
+        self.async_max_keepalive_connections = int(options["async_max_keepalive_connections"])
+        self.connect_timeout = float(options["connect_timeout"])
+        self.read_timeout = float(options["read_timeout"])
+        self.keep_alive = bool(options["keep_alive"])
+        self.keepalive_expiry = float(options["keepalive_expiry"])
+        self.retries = int(options["retries"])
+        self.backoff_factor = float(options["backoff_factor"])
+        self.status_forcelist = tuple(options["status_forcelist"])
+        self.timeouts = dict(options["timeouts"])
+
+    def timeout(self, operation: Optional[str] = None) -> Tuple[float, float]:
+        """(connect, read) timeout in seconds for an operation"""
+        override = self.timeouts.get(operation, {}) if operation else {}
+        return (
+            float(override.get("connect", self.connect_timeout)),
+            float(override.get("read", self.read_timeout)),
+        )
+
+    def httpx_timeout(self, operation: Optional[str] = None) -> httpx.Timeout:
+        connect, read = self.timeout(operation)
+        return httpx.Timeout(read, connect=connect)
+
+    def build_session(self) -> requests.Session:
+        """Create session with a sized connection pool and retry policy"""
+        session = requests.Session()
+        retry = Retry(
+            total=self.retries,
+            read=self.retries,
+            connect=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.status_forcelist,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def build_async_client(self) -> httpx.AsyncClient:
+        """Create pooled async HTTP client with retry on connection errors"""
+        limits = httpx.Limits(
+            max_connections=self.async_max_connections,
+            max_keepalive_connections=self.async_max_keepalive_connections if self.keep_alive else 0,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        transport = httpx.AsyncHTTPTransport(retries=self.retries, limits=limits)
+        return httpx.AsyncClient(transport=transport, timeout=self.httpx_timeout())
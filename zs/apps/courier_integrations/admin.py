@@ -1,21 +1,29 @@
 from django.contrib import admin
 
+from zs.apps.courier_integrations.adapters.circuit_breaker import CircuitBreaker
 from zs.apps.courier_integrations.models.courier import Courier
+from zs.apps.courier_integrations.models.outbox import ShipmentOutbox
 from zs.apps.courier_integrations.models.shipment import Shipment
+from zs.apps.courier_integrations.models.status_rule import StatusRule, UnmappedStatus
 from zs.apps.courier_integrations.models.tracking import ShipmentTracking
+from zs.apps.courier_integrations.models.webhook import TrackingWebhookEvent
 
 
 @admin.register(Courier)
 class CourierAdmin(admin.ModelAdmin):
-    list_display = ('name', 'code', 'is_active', 'supports_cancellation')
+    list_display = ('name', 'code', 'is_active', 'supports_cancellation', 'circuit_state')
     list_filter = ('is_active', 'supports_cancellation')
     search_fields = ('name', 'code')
     ordering = ('name',)
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'circuit_breaker')
+    actions = ['reset_circuit_breaker']
     fieldsets = (
         (None, {
             'fields': ('name', 'code', 'is_active', 'supports_cancellation')
         }),
+        ('Circuit Breaker', {
+            'fields': ('circuit_breaker',)
+        }),
         ('Configuration', {
             'classes': ('collapse',),
             'fields': ('config',)
@@ -27,6 +35,22 @@ class CourierAdmin(admin.ModelAdmin):
     )
 
 
+    @admin.display(description='Circuit')
+    def circuit_state(self, obj):
+        return CircuitBreaker(obj.code).state
+
+    @admin.display(description='Circuit breaker')
+    def circuit_breaker(self, obj):
+        stats = CircuitBreaker(obj.code).stats()
+        return f"{stats['state']} ({stats['failures']}/{stats['requests']} failed in current window)"
+
+    @admin.action(description='Reset circuit breaker')
+    def reset_circuit_breaker(self, request, queryset):
+        for courier in queryset:
+            CircuitBreaker(courier.code).reset()
+        self.message_user(request, f"Reset circuit breaker of {queryset.count()} courier(s)")
+
+
 class ShipmentTrackingInline(admin.TabularInline):
     model = ShipmentTracking
     extra = 0
@@ -37,19 +61,25 @@ class ShipmentTrackingInline(admin.TabularInline):
 
 @admin.register(Shipment)
 class ShipmentAdmin(admin.ModelAdmin):
-    list_display = ('reference_number', 'courier', 'status', 'last_tracking_update', 'created_at')
+    list_display = ('reference_number', 'courier', 'status', 'last_tracking_update', 'next_poll_at', 'created_at')
     list_filter = ('status', 'courier')
     search_fields = ('reference_number', 'courier__name', 'waybill_id')
-    readonly_fields = ('created_at', 'updated_at', 'last_tracking_update')
+    readonly_fields = (
+        'created_at', 'updated_at', 'last_tracking_update', 'unchanged_polls',
+        'last_event_at', 'last_location', 'last_courier_status', 'event_count',
+    )
     ordering = ('-created_at',)
     inlines = [ShipmentTrackingInline]
     fieldsets = (
         (None, {
             'fields': ('reference_number', 'courier', 'waybill_id', 'status')
         }),
+        ('Latest Event', {
+            'fields': ('last_event_at', 'last_location', 'last_courier_status', 'event_count')
+        }),
         ('Timestamps', {
             'classes': ('collapse',),
-            'fields': ('created_at', 'updated_at', 'last_tracking_update')
+            'fields': ('created_at', 'updated_at', 'last_tracking_update', 'next_poll_at', 'unchanged_polls')
         }),
         ('Additional Data', {
             'classes': ('collapse',),
@@ -78,3 +108,37 @@ class ShipmentTrackingAdmin(admin.ModelAdmin):
             'fields': ('created_at',)
         }),
     )
+
+
+@admin.register(ShipmentOutbox)
+class ShipmentOutboxAdmin(admin.ModelAdmin):
+    list_display = ('shipment', 'operation', 'status', 'attempts', 'available_at', 'processed_at')
+    list_filter = ('status', 'operation')
+    search_fields = ('shipment__reference_number',)
+    readonly_fields = ('created_at', 'updated_at', 'processed_at', 'last_error')
+    raw_id_fields = ('shipment',)
+    ordering = ('-created_at',)
+
+
+@admin.register(TrackingWebhookEvent)
+class TrackingWebhookEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'courier', 'created_at', 'processed_at', 'error')
+    list_filter = ('courier',)
+    readonly_fields = ('created_at', 'updated_at', 'processed_at', 'error')
+    ordering = ('-id',)
+
+
+@admin.register(StatusRule)
+class StatusRuleAdmin(admin.ModelAdmin):
+    list_display = ('pattern', 'match_type', 'status', 'courier', 'priority', 'is_active')
+    list_filter = ('courier', 'match_type', 'status', 'is_active')
+    search_fields = ('pattern',)
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(UnmappedStatus)
+class UnmappedStatusAdmin(admin.ModelAdmin):
+    list_display = ('courier_status', 'courier_code', 'count', 'first_seen', 'last_seen')
+    list_filter = ('courier_code',)
+    search_fields = ('courier_status',)
+    readonly_fields = ('courier_code', 'courier_status', 'count', 'first_seen', 'last_seen')
@@ -1,13 +1,24 @@
 from zs.apps.courier_integrations.models.shipment import Shipment
 from zs.apps.courier_integrations.models.courier import Courier
 from zs.apps.courier_integrations.models.tracking import ShipmentTracking
+from zs.apps.courier_integrations.adapters.circuit_breaker import CircuitBreaker
 from rest_framework import serializers
 
 class CourierSerializer(serializers.ModelSerializer):
     """Courier serializer"""
+    circuit_state = serializers.SerializerMethodField()
+
     class Meta:
         model = Courier
-        fields = ['id', 'code', 'name', 'supports_cancellation']
+        fields = ['id', 'code', 'name', 'supports_cancellation', 'circuit_state']
+
+    def get_circuit_state(self, obj) -> str:
+        """closed, open or half_open"""
+        # Read once per courier when listing shipments
+        states = self.context.setdefault('circuit_states', {})
+        if obj.code not in states:
+            states[obj.code] = CircuitBreaker(obj.code).state
+        return states[obj.code]
 
 
 class ShipmentSerializer(serializers.ModelSerializer):
@@ -18,8 +29,10 @@ class ShipmentSerializer(serializers.ModelSerializer):
         model = Shipment
         fields = [
             'id', 'reference_number', 'courier', 'waybill_id', 
-            'status', 'created_at', 'updated_at', 'last_tracking_update'
+            'status', 'created_at', 'updated_at', 'last_tracking_update',
+            'last_event_at', 'last_location', 'last_courier_status', 'event_count',
         ]
+        read_only_fields = ['last_event_at', 'last_location', 'last_courier_status', 'event_count']
 
 
 class ShipmentCreateSerializer(serializers.Serializer):
@@ -44,6 +57,12 @@ class ShipmentCreateSerializer(serializers.Serializer):
     
     def validate_courier_code(self, value):
         """Validate courier exists and is active"""
+        # Bulk requests pass the active codes in the context instead of a query per item
+        active_codes = self.context.get('active_courier_codes')
+        if active_codes is not None:
+            if value not in active_codes:
+                raise serializers.ValidationError(f"Courier with code '{value}' does not exist or is inactive")
+            return value
         try:
             Courier.objects.get(code=value, is_active=True)
         except Courier.DoesNotExist:
@@ -58,4 +77,25 @@ class TrackingHistorySerializer(serializers.ModelSerializer):
         fields = [
             'id', 'courier_status', 'status', 'location', 
             'timestamp', 'description', 'created_at'
-        ]
\ No newline at end of file
+        ]
+
+
+class WaybillStatusSerializer(serializers.Serializer):
+    """Waybill creation progress of a shipment"""
+    shipment_id = serializers.IntegerField()
+    waybill_id = serializers.CharField(allow_blank=True)
+    status = serializers.CharField()
+    attempts = serializers.IntegerField()
+    last_error = serializers.CharField(allow_blank=True)
+
+    @classmethod
+    def from_shipment(cls, shipment, entry=None):
+        """Serialize from the shipment and its latest create_waybill outbox entry"""
+        return cls({
+            'shipment_id': shipment.id,
+            'waybill_id': shipment.waybill_id,
+            # Shipments created synchronously have no outbox entry
+            'status': entry.status if entry else ('done' if shipment.waybill_id else 'pending'),
+            'attempts': entry.attempts if entry else 0,
+            'last_error': entry.last_error if entry else '',
+        }).data
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from zs.apps.courier_integrations.api.v1.views import CourierViewSet, ShipmentViewSet
+from zs.apps.courier_integrations.api.v1.views import CourierViewSet, CourierWebhookView, ShipmentViewSet
 
 
 router = DefaultRouter()
@@ -8,5 +8,6 @@ router.register(r'shipments', ShipmentViewSet, basename='shipment')
 router.register(r'couriers', CourierViewSet, basename='courier')
 
 urlpatterns = [
+    path('webhooks/<slug:courier_code>/', CourierWebhookView.as_view(), name='courier-webhook'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
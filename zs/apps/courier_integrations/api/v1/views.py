@@ -1,18 +1,38 @@
-from rest_framework import viewsets, status
+import json
+from typing import Any, Dict, List, cast
+
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ParseError, PermissionDenied, ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.http import HttpResponse
-from zs.apps.core.renderers import CustomJSONRenderer
-from zs.apps.courier_integrations.models.shipment import Shipment
+from rest_framework.reverse import reverse
+from rest_framework.views import APIView
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from zs.apps.core.http import ranged_file_response
+from zs.apps.core.pagination import KeysetPagination
+from zs.apps.core.renderers import FastJSONRenderer
+from zs.apps.courier_integrations.models.shipment import Shipment, ShipmentQuerySet
 from zs.apps.courier_integrations.models.courier import Courier
+from zs.apps.courier_integrations.models.outbox import ShipmentOutbox
+from zs.apps.courier_integrations.models.webhook import TrackingWebhookEvent
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.factories.courier_factory import CourierFactory
+from zs.apps.courier_integrations.services.label_store import LabelStore
+from zs.apps.courier_integrations.services.shipment_export import EXPORT_CONTENT_TYPES, ShipmentExport
 from zs.apps.courier_integrations.services.shipment_service import ShipmentService
 from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
 from .serializers import (
     ShipmentSerializer,
     ShipmentCreateSerializer,
     CourierSerializer,
-    TrackingHistorySerializer
+    TrackingHistorySerializer,
+    WaybillStatusSerializer
 )
 
 
@@ -21,34 +41,196 @@ class CourierViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Courier.objects.filter(is_active=True)
     serializer_class = CourierSerializer
     permission_classes = [AllowAny]
-    renderer_classes = [CustomJSONRenderer]
+    renderer_classes = [FastJSONRenderer]
+
+
+class CourierWebhookView(APIView):
+    """
+    Receive tracking events pushed by a courier
+
+    The request is verified with the courier adapter and buffered as is;
+    apply_tracking_webhooks applies buffered events in batches.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    renderer_classes = [FastJSONRenderer]
+
+    def post(self, request, courier_code):
+        courier = Courier.objects.filter(code=courier_code, is_active=True).first()
+        if courier is None or courier_code not in settings.COURIER_MAPPING:
+            raise NotFound(f"Unknown courier '{courier_code}'")
+        courier_adapter = CourierFactory.get_courier(courier_code)
+        if not courier_adapter.verify_webhook(request.body, request.headers):
+            raise PermissionDenied("Invalid webhook signature")
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            raise ParseError("Webhook body is not valid JSON")
+        TrackingWebhookEvent.objects.create(courier=courier, payload=payload)
+        return Response({'received': True})
 
 
 class ShipmentViewSet(viewsets.ModelViewSet):
-    """API endpoints for shipments"""
-    queryset = Shipment.objects.all()
+    """
+    API endpoints for shipments
+
+    The list is newest first, paginated by (created_at, id) cursor. The
+    list and the export can be filtered with `status` (comma separated),
+    `courier` (code) and `created_after` / `created_before` (ISO 8601).
+    """
+    queryset = Shipment.objects.select_related('courier')
     serializer_class = ShipmentSerializer
     permission_classes = [AllowAny]
-    renderer_classes = [CustomJSONRenderer]
+    renderer_classes = [FastJSONRenderer]
+    pagination_class = KeysetPagination
+    # Actions that call couriers while writing; they manage their own
+    # transactions instead of running in the ATOMIC_REQUESTS one, so a
+    # rollback cannot orphan waybills the courier already created
+    non_atomic_actions = {'bulk'}
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if actions and set(actions.values()) <= cls.non_atomic_actions:
+            view = transaction.non_atomic_requests(view)
+        return view
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # The request payload is never listed
+            queryset = cast(ShipmentQuerySet, queryset).defer('data').matching(**self._list_filters())
+        return queryset
+
+    def _list_filters(self) -> Dict[str, Any]:
+        """Arguments of ShipmentQuerySet.matching from the query string"""
+        params = self.request.query_params
+        filters: Dict[str, Any] = {}
+        errors: Dict[str, List[str]] = {}
+        if params.get('status'):
+            filters['statuses'] = [value.strip() for value in params['status'].split(',')]
+            unknown = [value for value in filters['statuses'] if value not in ShipmentStatus.values]
+            if unknown:
+                errors['status'] = [f"Unknown status: {', '.join(unknown)}"]
+        if params.get('courier'):
+            filters['courier_code'] = params['courier']
+        for param in ('created_after', 'created_before'):
+            if not params.get(param):
+                continue
+            try:
+                filters[param] = parse_datetime(params[param])
+            except ValueError:
+                filters[param] = None
+            if filters[param] is None:
+                errors[param] = ["Expected an ISO 8601 datetime"]
+        if errors:
+            raise ValidationError(errors)
+        return filters
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream all matching shipments with their latest tracking event
+
+        `output` is csv (default) or ndjson. Rows are read from a
+        server-side cursor and sent as they are read, under WSGI and ASGI.
+        """
+        export_format = request.query_params.get('output', 'csv')
+        if export_format not in EXPORT_CONTENT_TYPES:
+            raise ValidationError({'output': [f"Expected one of: {', '.join(EXPORT_CONTENT_TYPES)}"]})
+        filters = self._list_filters()
+        filename = f"shipments_{timezone.now():%Y%m%d_%H%M%S}.{export_format}"
+        stream = ShipmentExport.astream if isinstance(request._request, ASGIRequest) else ShipmentExport.stream
+        return StreamingHttpResponse(
+            stream(export_format, chunk_size=settings.COURIER_EXPORT_CHUNK_SIZE, **filters),
+            content_type=EXPORT_CONTENT_TYPES[export_format],
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+        )
 
-    
     def get_serializer_class(self):
         if self.action == 'create':
             return ShipmentCreateSerializer
         return ShipmentSerializer
     
     def create(self, request, *args, **kwargs):
-        """Create shipment with waybill from courier API"""
+        """
+        Create shipment with waybill from courier API
+
+        In async mode (COURIER_ASYNC_WAYBILL_CREATION or a
+        "Prefer: respond-async" header) the waybill is created by a worker
+        and 202 is returned with the URL to poll for it.
+        """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        if self._respond_async(request):
+            shipment = ShipmentService.queue_shipment(serializer.validated_data)
+            status_url = reverse('api:shipment-waybill-status', args=[shipment.id], request=request)
+            data = {**ShipmentSerializer(shipment).data, 'status_url': status_url}
+            return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Location': status_url})
         shipment = ShipmentService.create_shipment(serializer.validated_data)
         result_serializer = ShipmentSerializer(shipment)
         return Response(result_serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create many shipments with their waybills in one request
+
+        The body is a list of shipment objects as accepted by create. The
+        response has one result per item, in order, with status "created"
+        (shipment_id and waybill_id) or "failed" (error).
+        """
+        context = {
+            **self.get_serializer_context(),
+            'active_courier_codes': set(Courier.objects.filter(is_active=True).values_list('code', flat=True)),
+        }
+        serializer: serializers.ListSerializer = serializers.ListSerializer(
+            child=ShipmentCreateSerializer(), data=request.data, context=context,
+            allow_empty=False, max_length=settings.COURIER_BULK_CREATE_MAX_ITEMS,
+        )
+        if not serializer.is_valid():
+            # Item errors are a list; the error renderer expects a dict, so
+            # they are keyed by index. Errors of the list itself are a dict.
+            errors: Any = serializer.errors
+            if isinstance(errors, list):
+                errors = {str(index): item_errors for index, item_errors in enumerate(errors) if item_errors}
+            raise ValidationError(errors)
+        results = ShipmentService.bulk_create_shipments(serializer.validated_data)
+        created = sum(result['status'] == 'created' for result in results)
+        return Response({
+            'created': created,
+            'failed': len(results) - created,
+            'results': results,
+        })
+
+    @staticmethod
+    def _waybill_pending_response() -> Response:
+        # Waybill creation is still queued or failed; there is nothing to
+        # ask the courier about yet
+        return Response({'detail': 'Waybill not yet created'}, status=status.HTTP_409_CONFLICT)
+
+    @staticmethod
+    def _respond_async(request) -> bool:
+        prefer = [value.strip() for value in request.headers.get('Prefer', '').split(',')]
+        return settings.COURIER_ASYNC_WAYBILL_CREATION or 'respond-async' in prefer
+
+    @action(detail=True, methods=['get'], url_path='waybill-status')
+    def waybill_status(self, request, pk=None):
+        """Progress of the waybill creation of a shipment"""
+        shipment = self.get_object()
+        entry = (
+            shipment.outbox_entries.filter(operation=ShipmentOutbox.Operation.CREATE_WAYBILL)
+            .order_by('-id')
+            .first()
+        )
+        return Response(WaybillStatusSerializer.from_shipment(shipment, entry))
     
     @action(detail=True, methods=['post'])
     def track(self, request, pk=None):
         """Track shipment and update status"""
         shipment = self.get_object()
+        if not shipment.waybill_id:
+            return self._waybill_pending_response()
         tracking_data = ShipmentService.update_tracking_status(shipment)
         return Response(tracking_data)
     
@@ -62,19 +244,42 @@ class ShipmentViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'])
     def label(self, request, pk=None):
-        """Get waybill label PDF"""
+        """Get waybill label PDF, streamed from the label store"""
         shipment = self.get_object()
-        from zs.apps.courier_integrations.factories.courier_factory import CourierFactory
-        courier_adapter = CourierFactory.get_courier(shipment.courier.code)
-        label_pdf = courier_adapter.print_waybill_label(shipment.waybill_id)        
-        response = HttpResponse(label_pdf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="waybill_{shipment.waybill_id}.pdf"'
-        return response
+        if not shipment.waybill_id:
+            return self._waybill_pending_response()
+        label = LabelStore.get_or_fetch(shipment)
+        return ranged_file_response(
+            request,
+            lambda: LabelStore.open(label),
+            size=label['size'],
+            etag=label['etag'],
+            content_type='application/pdf',
+            filename=f'waybill_{shipment.waybill_id}.pdf',
+        )
     
     @action(detail=True, methods=['get'])
     def history(self, request, pk=None):
-        """Get tracking history"""
+        """
+        Get tracking history
+
+        `since` and `until` (ISO 8601) limit the events by timestamp, so
+        only the matching monthly partitions are read when the tracking
+        table is partitioned.
+        """
         shipment = self.get_object()
         tracking_history = shipment.tracking_history.all()
+        bounds = {}
+        for param, lookup in (('since', 'timestamp__gte'), ('until', 'timestamp__lt')):
+            if not request.query_params.get(param):
+                continue
+            try:
+                bounds[lookup] = parse_datetime(request.query_params[param])
+            except ValueError:
+                bounds[lookup] = None
+            if bounds[lookup] is None:
+                raise ValidationError({param: ["Expected an ISO 8601 datetime"]})
+        if bounds:
+            tracking_history = tracking_history.filter(**bounds)
         serializer = TrackingHistorySerializer(tracking_history, many=True)
         return Response(serializer.data)
\ No newline at end of file
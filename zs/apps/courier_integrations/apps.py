@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "zs.apps.courier_integrations"
\ No newline at end of file
+    name = "zs.apps.courier_integrations"
+
+    def ready(self):
+        import zs.apps.courier_integrations.signals  # noqa: F401
@@ -10,4 +10,17 @@ class CourierNotImplementedError(Exception):
 
 class CourierConfigError(Exception):
     """Exception raised when courier configuration is invalid or missing"""
-    pass
\ No newline at end of file
+    pass
+
+
+class CourierCircuitOpenError(CourierAPIError):
+    """Exception raised when a request is refused because the courier circuit breaker is open"""
+    pass
+
+
+class CourierRateLimitError(CourierAPIError):
+    """Exception raised when no courier rate limit token became available in time"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -1,22 +1,151 @@
+import logging
+import threading
+import uuid
+from contextvars import ContextVar
+from typing import Dict, Optional, Set
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
 from zs.apps.courier_integrations.interfaces.courier_interface import CourierInterface
 from django.utils.module_loading import import_string
 
+logger = logging.getLogger(__name__)
+
+
+# Courier codes whose version stamp was checked in the current request or
+# task; None outside of them. A context variable rather than a thread local
+# so it follows async code through sync_to_async.
+_checked: ContextVar[Optional[Set[str]]] = ContextVar("courier_adapters_checked", default=None)
+
+
+def version_key(courier_code: str) -> str:
+    return f"courier_integrations:courier:{courier_code}:version"
+
+
 class CourierFactory:
-    _instances = {}
-    
+    """
+    Per-process registry of courier adapters
+
+    Adapters are built from COURIER_MAPPING with COURIER_CONFIG merged
+    with the config of the Courier record, and reused. Saving or deleting
+    a Courier stamps a new version for its code in the cache; the adapter
+    of that code alone is rebuilt on its next use, so credential and
+    transport changes apply without restarting workers; the replaced
+    adapter's connection pools are closed. The stamp is
+    checked at most once per request or Celery task for each courier, on
+    every call otherwise.
+    """
+    _instances: Dict[str, CourierInterface] = {}
+    _versions: Dict[str, Optional[str]] = {}
+    _lock = threading.Lock()
+
     @classmethod
     def get_courier(cls, courier_code: str) -> CourierInterface:
         """
-        Get or create courier instance based on courier code
-        Implements Singleton pattern per courier type
+        Get the adapter of a courier, building it when missing or stale
+
+        Raises:
+            ValueError: The courier code has no adapter in COURIER_MAPPING
         """
-        if courier_code not in cls._instances:
-            from django.conf import settings
-            courier_path = settings.COURIER_MAPPING.get(courier_code)
-            if not courier_path:
-                raise ValueError(f"Unsupported courier: {courier_code}")
-            
-            courier_class = import_string(courier_path)
-            cls._instances[courier_code] = courier_class()
-            
-        return cls._instances[courier_code]
\ No newline at end of file
+        courier = cls._instances.get(courier_code)
+        if courier is not None and cls._is_checked(courier_code):
+            return courier
+
+        version = cls._current_version(courier_code)
+        replaced = None
+        if courier is None or cls._versions.get(courier_code) != version:
+            with cls._lock:
+                courier = cls._instances.get(courier_code)
+                if courier is None or cls._versions.get(courier_code) != version:
+                    replaced = courier
+                    courier = cls._build(courier_code)
+                    cls._instances[courier_code] = courier
+                    cls._versions[courier_code] = version
+        if replaced is not None:
+            cls._close(courier_code, replaced)
+        cls._mark_checked(courier_code)
+        return courier
+
+    @classmethod
+    def _close(cls, courier_code: str, courier: CourierInterface):
+        """Release the connection pools of a replaced adapter"""
+        try:
+            courier.close()
+        except Exception:
+            logger.exception(f"Cannot close the replaced {courier_code} courier adapter")
+
+    @classmethod
+    def _build(cls, courier_code: str) -> CourierInterface:
+        from django.conf import settings
+        from zs.apps.courier_integrations.models.courier import Courier
+
+        courier_path = settings.COURIER_MAPPING.get(courier_code)
+        if not courier_path:
+            raise ValueError(f"Unsupported courier: {courier_code}")
+        courier_class = import_string(courier_path)
+        courier_config = (
+            Courier.objects.filter(code=courier_code)
+            .values_list("config", flat=True)
+            .first()
+        )
+        logger.info(f"Building {courier_code} courier adapter")
+        return courier_class(courier_code, courier_config or {})
+
+    @classmethod
+    def _current_version(cls, courier_code: str) -> Optional[str]:
+        key = version_key(courier_code)
+        version = cache.get(key)
+        if version is None:
+            # First process up or the stamp was evicted
+            cache.add(key, uuid.uuid4().hex, None)
+            version = cache.get(key)
+        return version
+
+    @classmethod
+    def bump_version(cls, courier_code: str):
+        """Make every process rebuild the adapter of a courier"""
+        cache.set(version_key(courier_code), uuid.uuid4().hex, None)
+        checked = _checked.get()
+        if checked is not None:
+            checked.discard(courier_code)
+
+    @classmethod
+    def begin(cls, **kwargs):
+        """Start of a request or task: check stamps again on first use"""
+        _checked.set(set())
+
+    @classmethod
+    def end(cls, **kwargs):
+        _checked.set(None)
+
+    @classmethod
+    def _is_checked(cls, courier_code: str) -> bool:
+        checked = _checked.get()
+        return checked is not None and courier_code in checked
+
+    @classmethod
+    def _mark_checked(cls, courier_code: str):
+        checked = _checked.get()
+        if checked is not None:
+            checked.add(courier_code)
+
+    @classmethod
+    async def aget_courier(cls, courier_code: str) -> CourierInterface:
+        """
+        Get courier instance from async code
+
+        The returned adapter exposes the async API (acreate_waybill,
+        atrack_shipment, ...). Construction loads config and builds HTTP
+        sessions, so checking and building run off the event loop.
+        """
+        courier = cls._instances.get(courier_code)
+        if courier is not None and cls._is_checked(courier_code):
+            return courier
+        return await sync_to_async(cls.get_courier)(courier_code)
+
+    @classmethod
+    async def aclose_all(cls):
+        """Close pooled async clients of all couriers on the running loop"""
+        for courier in list(cls._instances.values()):
+            if hasattr(courier, "aclose"):
+                await courier.aclose()
@@ -1,10 +1,24 @@
 # courier_integration/interfaces/courier_interface.py
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Mapping, Union
+
+from zs.apps.courier_integrations.adapters.transport import TransportProfile
 
 
 class CourierInterface(ABC):
     """Abstract interface for all courier implementations"""
+
+    # Couriers whose tracking API accepts several waybills per request
+    supports_batch_tracking = False
+    max_tracking_batch_size = 1
+
+    # Couriers whose create API accepts several shipments per request
+    supports_batch_creation = False
+    max_creation_batch_size = 1
+
+    # Courier settings and the HTTP transport built from them
+    config: Dict[str, Any]
+    transport: TransportProfile
     
     @abstractmethod
     def create_waybill(self, shipment_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -18,9 +32,29 @@ class CourierInterface(ABC):
             Dict containing waybill information including waybill_id
         """
         pass
+
+    def create_waybills(self, shipments_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create waybills for several shipments at once.
+        
+        Couriers with supports_batch_creation send up to max_creation_batch_size
+        shipments per API call; the default creates them one by one.
+        
+        Args:
+            shipments_data: Shipment details, one dictionary per shipment
+            
+        Returns:
+            One dict per shipment, in order: the waybill information, or
+            {"error": message} if the courier rejected that shipment
+        """
+        return [self.create_waybill(shipment_data) for shipment_data in shipments_data]
+
+    def get_creation_batch_size(self) -> int:
+        """Shipments sent per create_waybills API call"""
+        return 1
     
     @abstractmethod
-    def print_waybill_label(self, waybill_id: str) -> bytes:
+    def print_waybill_label(self, waybill_id: str) -> Union[bytes, Dict[str, Any]]:
         """
         Generate waybill label as PDF bytes.
         
@@ -28,9 +62,25 @@ class CourierInterface(ABC):
             waybill_id: The waybill identifier
             
         Returns:
-            Bytes containing PDF data of the label
+            Bytes containing PDF data of the label, or a dict with its
+            label_url for couriers that return a link to the document
         """
         pass
+
+    def fetch_label_pdf(self, waybill_id: str) -> bytes:
+        """
+        Get the waybill label as PDF bytes, whatever print_waybill_label returns.
+        
+        Args:
+            waybill_id: The waybill identifier
+            
+        Returns:
+            Bytes containing PDF data of the label
+        
+        Raises:
+            CourierAPIError: If no PDF label could be obtained
+        """
+        raise NotImplementedError("This courier does not support label download")
     
     @abstractmethod
     def track_shipment(self, waybill_id: str) -> Dict[str, Any]:
@@ -44,6 +94,26 @@ class CourierInterface(ABC):
             Dict containing tracking information
         """
         pass
+
+    def track_shipments(self, waybill_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Track several shipments at once.
+        
+        Couriers with supports_batch_tracking send up to max_tracking_batch_size
+        waybills per API call; the default tracks them one by one.
+        
+        Args:
+            waybill_ids: The waybill identifiers
+            
+        Returns:
+            Dict of tracking information keyed by waybill_id. Waybills the
+            courier returned nothing for are left out.
+        """
+        return {waybill_id: self.track_shipment(waybill_id) for waybill_id in waybill_ids}
+
+    def get_tracking_batch_size(self) -> int:
+        """Waybills sent per track_shipments API call"""
+        return 1
     
     @abstractmethod
     def map_status(self, courier_status: str) -> str:
@@ -71,4 +141,104 @@ class CourierInterface(ABC):
         Raises:
             NotImplementedError: If courier doesn't support cancellation
         """
-        raise NotImplementedError("This courier does not support cancellation")
\ No newline at end of file
+        raise NotImplementedError("This courier does not support cancellation")
+
+    def verify_webhook(self, body: bytes, headers: Mapping[str, str]) -> bool:
+        """
+        Check that a webhook request was sent by the courier.
+        
+        Args:
+            body: Raw request body
+            headers: Request headers
+            
+        Returns:
+            True if the request is authentic; couriers without webhooks
+            reject all requests
+        """
+        return False
+
+    def parse_webhook(self, payload: Any) -> List[Dict[str, Any]]:
+        """
+        Extract tracking events from a verified webhook payload.
+        
+        Args:
+            payload: Decoded JSON body of the webhook request
+            
+        Returns:
+            Events with waybill_id, courier_status, location, timestamp
+            (ISO string) and description
+        
+        Raises:
+            CourierAPIError: If the payload has an unexpected format
+        """
+        raise NotImplementedError("This courier does not support webhooks")
+
+    def close(self):
+        """
+        Release the connections held by the adapter.
+        
+        Called when the adapter is replaced; the default holds none.
+        """
+
+    async def acreate_waybill(self, shipment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of create_waybill for ASGI and other coroutine callers.
+        
+        Args:
+            shipment_data: Dictionary containing shipment details
+            
+        Returns:
+            Dict containing waybill information including waybill_id
+        """
+        raise NotImplementedError("This courier does not support async waybill creation")
+    
+    async def aprint_waybill_label(self, waybill_id: str) -> Union[bytes, Dict[str, Any]]:
+        """
+        Async variant of print_waybill_label.
+        
+        Args:
+            waybill_id: The waybill identifier
+            
+        Returns:
+            Bytes containing PDF data of the label, or a dict with its label_url
+        """
+        raise NotImplementedError("This courier does not support async label printing")
+    
+    async def atrack_shipment(self, waybill_id: str) -> Dict[str, Any]:
+        """
+        Async variant of track_shipment.
+        
+        Args:
+            waybill_id: The waybill identifier
+            
+        Returns:
+            Dict containing tracking information
+        """
+        raise NotImplementedError("This courier does not support async tracking")
+
+    async def atrack_shipments(self, waybill_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Async variant of track_shipments.
+        
+        Args:
+            waybill_ids: The waybill identifiers
+            
+        Returns:
+            Dict of tracking information keyed by waybill_id
+        """
+        return {waybill_id: await self.atrack_shipment(waybill_id) for waybill_id in waybill_ids}
+    
+    async def acancel_shipment(self, waybill_id: str) -> Dict[str, Any]:
+        """
+        Async variant of cancel_shipment.
+        
+        Args:
+            waybill_id: The waybill identifier
+            
+        Returns:
+            Dict containing cancellation result
+        
+        Raises:
+            NotImplementedError: If courier doesn't support cancellation
+        """
+        raise NotImplementedError("This courier does not support cancellation")
@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.services.shipment_export import EXPORT_CONTENT_TYPES, ShipmentExport
+
+
+def iso_datetime(value):
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+class Command(BaseCommand):
+    help = 'Streams shipments with their latest tracking event as CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            dest='export_format',
+            choices=list(EXPORT_CONTENT_TYPES),
+            default='csv',
+            help='Output format'
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write to; standard output when omitted'
+        )
+        parser.add_argument(
+            '--courier',
+            help='Only shipments of this courier code'
+        )
+        parser.add_argument(
+            '--status',
+            action='append',
+            choices=ShipmentStatus.values,
+            help='Only shipments in this status; repeat for several'
+        )
+        parser.add_argument(
+            '--created-after',
+            type=iso_datetime,
+            help='Only shipments created at or after this ISO 8601 datetime'
+        )
+        parser.add_argument(
+            '--created-before',
+            type=iso_datetime,
+            help='Only shipments created before this ISO 8601 datetime'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.COURIER_EXPORT_CHUNK_SIZE,
+            help='Rows read from the database per round trip'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        chunks = ShipmentExport.stream(
+            options['export_format'],
+            chunk_size=options['chunk_size'],
+            statuses=options['status'],
+            courier_code=options['courier'],
+            created_after=options['created_after'],
+            created_before=options['created_before'],
+        )
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Exported shipments to {options['output']}"))
+        else:
+            # Binary when stdout is a terminal or pipe, text otherwise (tests)
+            buffer = getattr(self.stdout, 'buffer', None)
+            for chunk in chunks:
+                if buffer is not None:
+                    buffer.write(chunk)
+                else:
+                    self.stdout.write(chunk.decode(), ending='')
+            self.stdout.flush()
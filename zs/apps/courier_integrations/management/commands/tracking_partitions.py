@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from zs.apps.courier_integrations.services.tracking_partitions import TrackingPartitions
+
+
+class Command(BaseCommand):
+    help = 'Partitions tracking history by month, creates upcoming partitions and expires old ones'
+
+    def add_arguments(self, parser):
+        config = getattr(settings, 'COURIER_TRACKING_PARTITIONS', {})
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Turn the tracking table into a partitioned table first'
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=config.get('months_ahead', 3),
+            help='Months after the current one to create partitions for'
+        )
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            default=config.get('retention_months'),
+            help='Expire partitions older than this many months; none expire when omitted'
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            default=config.get('expired') == 'drop',
+            help='Drop expired partitions instead of detaching them'
+        )
+        parser.add_argument(
+            '--archive-schema',
+            default=config.get('archive_schema'),
+            help='Schema detached partitions are moved to'
+        )
+
+    def handle(self, *args, **options):
+        if options['months_ahead'] < 0:
+            raise CommandError('--months-ahead cannot be negative')
+        if options['convert']:
+            try:
+                TrackingPartitions.convert()
+            except ValueError as err:
+                raise CommandError(str(err))
+            self.stdout.write(self.style.SUCCESS('Converted the tracking table to monthly partitions'))
+        elif not TrackingPartitions.is_partitioned():
+            raise CommandError('The tracking table is not partitioned; run with --convert first')
+
+        for name in TrackingPartitions.create_partitions(options['months_ahead']):
+            self.stdout.write(f"Created {name}")
+        if options['retention_months'] is not None:
+            expired = TrackingPartitions.expire_partitions(
+                options['retention_months'],
+                drop=options['drop'],
+                archive_schema=options['archive_schema'],
+            )
+            for name in expired:
+                self.stdout.write(f"{'Dropped' if options['drop'] else 'Detached'} {name}")
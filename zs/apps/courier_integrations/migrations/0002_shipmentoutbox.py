@@ -0,0 +1,41 @@
+# Generated by Django 5.1.8 on 2026-10-17 00:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier_integrations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='shipment',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('picked_up', 'Picked Up'), ('in_transit', 'In Transit'), ('out_for_delivery', 'Out for Delivery'), ('delivered', 'Delivered'), ('attempted_delivery', 'Attempted Delivery'), ('failed', 'Failed'), ('returned', 'Returned'), ('cancelled', 'Cancelled'), ('unknown', 'Unknown')], default='pending', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='ShipmentOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('operation', models.CharField(choices=[('create_waybill', 'Create waybill')], max_length=30)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('shipment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox_entries', to='courier_integrations.shipment')),
+            ],
+            options={
+                'verbose_name': 'Shipment Outbox',
+                'verbose_name_plural': 'Shipment Outbox',
+                'ordering': ['available_at'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='shipment_outbox_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.8 on 2026-10-17 00:12
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Now
+
+
+TERMINAL_STATUSES = ['delivered', 'returned', 'cancelled']
+
+
+def schedule_active_shipments(apps, schema_editor):
+    """Keep the old 6 hour cadence; shipments never tracked are due now"""
+    Shipment = apps.get_model('courier_integrations', 'Shipment')
+    Shipment.objects.exclude(status__in=TERMINAL_STATUSES).update(
+        next_poll_at=Coalesce(models.F('last_tracking_update') + timedelta(hours=6), Now())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier_integrations', '0002_shipmentoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shipment',
+            name='next_poll_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='unchanged_polls',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(schedule_active_shipments, migrations.RunPython.noop),
+    ]
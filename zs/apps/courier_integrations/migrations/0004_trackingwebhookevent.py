@@ -0,0 +1,32 @@
+# Generated by Django 5.1.8 on 2026-10-17 00:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier_integrations', '0003_shipment_next_poll_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackingWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('payload', models.JSONField()),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('courier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='webhook_events', to='courier_integrations.courier')),
+            ],
+            options={
+                'verbose_name': 'Tracking Webhook Event',
+                'verbose_name_plural': 'Tracking Webhook Events',
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['id'], name='webhook_event_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.8 on 2026-10-17 00:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier_integrations', '0004_trackingwebhookevent'),
+    ]
+
+    operations = [
+        # Earlier polls stored the full history each time; keep the first copy
+        migrations.RunSQL(
+            """
+            DELETE FROM courier_integrations_shipmenttracking duplicate
+            USING courier_integrations_shipmenttracking original
+            WHERE duplicate.shipment_id = original.shipment_id
+              AND duplicate.timestamp = original.timestamp
+              AND duplicate.courier_status = original.courier_status
+              AND duplicate.id > original.id
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='shipmenttracking',
+            constraint=models.UniqueConstraint(fields=('shipment', 'timestamp', 'courier_status'), name='shipment_tracking_event_uniq'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.8 on 2026-10-17 00:17
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are built without locking the shipment table against writes
+    atomic = False
+
+    dependencies = [
+        ('courier_integrations', '0005_shipment_tracking_event_uniq'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='shipment',
+            name='next_poll_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='shipment',
+            index=models.Index(condition=models.Q(('next_poll_at__isnull', False)), fields=['next_poll_at', 'id'], name='shipment_poll_due_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='shipment',
+            index=models.Index(fields=['waybill_id'], name='shipment_waybill_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.8 on 2026-10-17 01:05
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('courier_integrations', '0006_shipment_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='shipment',
+            index=models.Index(fields=['created_at', 'id'], name='shipment_created_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.8 on 2026-10-17 00:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier_integrations', '0007_shipment_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnmappedStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('courier_code', models.CharField(max_length=50)),
+                ('courier_status', models.CharField(max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Unmapped Status',
+                'verbose_name_plural': 'Unmapped Statuses',
+                'ordering': ['-count'],
+                'constraints': [models.UniqueConstraint(fields=('courier_code', 'courier_status'), name='unmapped_status_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StatusRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('match_type', models.CharField(choices=[('exact', 'Exact'), ('prefix', 'Prefix'), ('regex', 'Regular expression')], default='exact', max_length=10)),
+                ('pattern', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('picked_up', 'Picked Up'), ('in_transit', 'In Transit'), ('out_for_delivery', 'Out for Delivery'), ('delivered', 'Delivered'), ('attempted_delivery', 'Attempted Delivery'), ('failed', 'Failed'), ('returned', 'Returned'), ('cancelled', 'Cancelled'), ('unknown', 'Unknown')], max_length=20)),
+                ('priority', models.PositiveSmallIntegerField(default=100)),
+                ('is_active', models.BooleanField(default=True)),
+                ('courier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='status_rules', to='courier_integrations.courier')),
+            ],
+            options={
+                'verbose_name': 'Status Rule',
+                'verbose_name_plural': 'Status Rules',
+                'ordering': ['courier__code', 'match_type', 'priority', 'pattern'],
+                'constraints': [models.UniqueConstraint(fields=('courier', 'match_type', 'pattern'), name='status_rule_uniq')],
+            },
+        ),
+    ]
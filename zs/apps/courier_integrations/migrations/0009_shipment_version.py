@@ -0,0 +1,18 @@
+# Generated by Django 5.1.8 on 2026-10-17 00:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier_integrations', '0008_status_rules'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shipment',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
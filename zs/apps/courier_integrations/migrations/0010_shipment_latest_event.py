@@ -0,0 +1,51 @@
+# Generated by Django 5.1.8 on 2026-10-17 00:42
+
+from django.db import migrations, models
+
+
+# Snapshot of the events stored so far; new events keep it up to date
+BACKFILL_SQL = """
+UPDATE courier_integrations_shipment AS shipment
+SET last_event_at = latest.timestamp,
+    last_location = latest.location,
+    last_courier_status = latest.courier_status,
+    event_count = latest.event_count
+FROM (
+    SELECT DISTINCT ON (shipment_id)
+        shipment_id, timestamp, location, courier_status,
+        count(*) OVER (PARTITION BY shipment_id) AS event_count
+    FROM courier_integrations_shipmenttracking
+    ORDER BY shipment_id, timestamp DESC, courier_status DESC
+) AS latest
+WHERE latest.shipment_id = shipment.id
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier_integrations', '0009_shipment_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shipment',
+            name='event_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='last_courier_status',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='last_event_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='shipment',
+            name='last_location',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
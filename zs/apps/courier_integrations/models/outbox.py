@@ -0,0 +1,39 @@
+from django.db import models
+from django.utils import timezone
+from zs.apps.core.models import TimeStampedModel
+from zs.apps.courier_integrations.models.shipment import Shipment
+
+
+class ShipmentOutbox(TimeStampedModel):
+    """
+    Courier operation written in the same transaction as its shipment and
+    carried out by a Celery worker after commit
+    """
+
+    class Operation(models.TextChoices):
+        CREATE_WAYBILL = "create_waybill", "Create waybill"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        PROCESSING = "processing", "Processing"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    shipment = models.ForeignKey(Shipment, on_delete=models.CASCADE, related_name='outbox_entries')
+    operation = models.CharField(max_length=30, choices=Operation.choices)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Shipment Outbox"
+        verbose_name_plural = "Shipment Outbox"
+        ordering = ['available_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='shipment_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.operation} {self.shipment_id} ({self.status})"
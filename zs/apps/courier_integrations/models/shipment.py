@@ -1,9 +1,33 @@
+from datetime import datetime
+from typing import List, Optional
+
 from django.db import models
 from zs.apps.core.models import TimeStampedModel
 from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
 from zs.apps.courier_integrations.models.courier import Courier
 
 
+class ShipmentQuerySet(models.QuerySet):
+    def matching(
+        self,
+        statuses: Optional[List[str]] = None,
+        courier_code: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+    ) -> "ShipmentQuerySet":
+        """Filters shared by the shipment list and the export"""
+        queryset = self
+        if statuses:
+            queryset = queryset.filter(status__in=statuses)
+        if courier_code:
+            queryset = queryset.filter(courier__code=courier_code)
+        if created_after:
+            queryset = queryset.filter(created_at__gte=created_after)
+        if created_before:
+            queryset = queryset.filter(created_at__lt=created_before)
+        return queryset
+
+
 class Shipment(TimeStampedModel):
     reference_number = models.CharField(max_length=100, unique=True)
     courier = models.ForeignKey(Courier, on_delete=models.PROTECT)
@@ -12,7 +36,35 @@ class Shipment(TimeStampedModel):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     last_tracking_update = models.DateTimeField(null=True, blank=True)
+    # Set by PollSchedule; NULL once the shipment reaches a terminal status
+    next_poll_at = models.DateTimeField(null=True, blank=True)
+    unchanged_polls = models.PositiveSmallIntegerField(default=0)
+    # Bumped by every status write, see ShipmentTransitions
+    version = models.PositiveIntegerField(default=0)
+    # Newest tracking event, kept by TrackingSnapshot so lists need no
+    # tracking_history query per shipment
+    last_event_at = models.DateTimeField(null=True, blank=True)
+    last_location = models.CharField(max_length=255, blank=True)
+    last_courier_status = models.CharField(max_length=100, blank=True)
+    event_count = models.PositiveIntegerField(default=0)
     data = models.JSONField(default=dict)
+
+    objects = ShipmentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Tracking dispatch: due shipments in keyset order. Terminal
+            # shipments have no next_poll_at and are left out of the index.
+            models.Index(
+                fields=['next_poll_at', 'id'],
+                condition=models.Q(next_poll_at__isnull=False),
+                name='shipment_poll_due_idx',
+            ),
+            # Lookups by courier waybill (webhooks, admin search)
+            models.Index(fields=['waybill_id'], name='shipment_waybill_idx'),
+            # Shipment list keyset, newest first
+            models.Index(fields=['created_at', 'id'], name='shipment_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.reference_number} - {self.courier.name}"
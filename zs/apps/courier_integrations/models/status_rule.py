@@ -0,0 +1,70 @@
+import re
+from django.core.exceptions import ValidationError
+from django.db import models
+from zs.apps.core.models import TimeStampedModel
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.models.courier import Courier
+
+
+class StatusRule(TimeStampedModel):
+    """
+    Maps courier status texts to a unified ShipmentStatus.
+
+    Rules without a courier apply to every courier. They are compiled by
+    StatusRules together with the adapter's built-in mappings, which they
+    override. Patterns are matched against the status text lowercased with
+    whitespace collapsed.
+    """
+
+    class MatchType(models.TextChoices):
+        EXACT = "exact", "Exact"
+        PREFIX = "prefix", "Prefix"
+        REGEX = "regex", "Regular expression"
+
+    courier = models.ForeignKey(
+        Courier, on_delete=models.CASCADE, null=True, blank=True, related_name='status_rules'
+    )
+    match_type = models.CharField(max_length=10, choices=MatchType.choices, default=MatchType.EXACT)
+    pattern = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=ShipmentStatus.choices)
+    # Regex rules are tried in ascending priority
+    priority = models.PositiveSmallIntegerField(default=100)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "Status Rule"
+        verbose_name_plural = "Status Rules"
+        ordering = ['courier__code', 'match_type', 'priority', 'pattern']
+        constraints = [
+            models.UniqueConstraint(fields=['courier', 'match_type', 'pattern'], name='status_rule_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.match_type} {self.pattern!r} -> {self.status}"
+
+    def clean(self):
+        if self.match_type == self.MatchType.REGEX:
+            try:
+                re.compile(self.pattern)
+            except re.error as err:
+                raise ValidationError({'pattern': f"Invalid regular expression: {err}"})
+
+
+class UnmappedStatus(models.Model):
+    """Courier status texts that no rule matched, with how often they were seen"""
+    courier_code = models.CharField(max_length=50)
+    courier_status = models.CharField(max_length=255)
+    count = models.PositiveIntegerField(default=0)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Unmapped Status"
+        verbose_name_plural = "Unmapped Statuses"
+        ordering = ['-count']
+        constraints = [
+            models.UniqueConstraint(fields=['courier_code', 'courier_status'], name='unmapped_status_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.courier_code}: {self.courier_status}"
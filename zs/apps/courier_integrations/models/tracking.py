@@ -16,4 +16,11 @@ class ShipmentTracking(TimeStampedModel):
     class Meta:
         verbose_name = "Shipment Tracking"
         verbose_name_plural = "Shipment Trackings"
-        ordering = ['-timestamp']
\ No newline at end of file
+        ordering = ['-timestamp']
+        constraints = [
+            # Polls return the full history; only new events are inserted
+            models.UniqueConstraint(
+                fields=['shipment', 'timestamp', 'courier_status'],
+                name='shipment_tracking_event_uniq',
+            ),
+        ]
\ No newline at end of file
@@ -0,0 +1,32 @@
+from django.db import models
+from zs.apps.core.models import TimeStampedModel
+from zs.apps.courier_integrations.models.courier import Courier
+
+
+class TrackingWebhookEvent(TimeStampedModel):
+    """
+    Verified courier webhook payload waiting to be applied.
+
+    The receiver only inserts rows; apply_tracking_webhooks drains them in
+    batches and deletes them once applied. Payloads that cannot be applied
+    are kept with processed_at and error set.
+    """
+    courier = models.ForeignKey(Courier, on_delete=models.CASCADE, related_name='webhook_events')
+    payload = models.JSONField()
+    processed_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Tracking Webhook Event"
+        verbose_name_plural = "Tracking Webhook Events"
+        ordering = ['id']
+        indexes = [
+            models.Index(
+                fields=['id'],
+                condition=models.Q(processed_at__isnull=True),
+                name='webhook_event_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.courier_id} webhook {self.id}"
@@ -0,0 +1,72 @@
+import hashlib
+import logging
+from typing import Dict, Any
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils.text import get_valid_filename
+
+from zs.apps.courier_integrations.factories.courier_factory import CourierFactory
+from zs.apps.courier_integrations.models.shipment import Shipment
+
+
+logger = logging.getLogger(__name__)
+
+
+class LabelStore:
+    """
+    Waybill label PDFs kept in the default storage (media directory locally,
+    S3 in production).
+
+    A label is fetched from the courier the first time it is requested and
+    served from storage afterwards. Labels never change for a waybill, so
+    size and content hash are cached for ETags without reading the file.
+    """
+
+    @staticmethod
+    def path(courier_code: str, waybill_id: str) -> str:
+        return f"labels/{courier_code}/{get_valid_filename(waybill_id)}.pdf"
+
+    @staticmethod
+    def get_or_fetch(shipment: Shipment) -> Dict[str, Any]:
+        """
+        Store the shipment's label if needed
+
+        Returns:
+            Dict with the storage ``name``, ``size`` and ``etag`` of the label
+
+        Raises:
+            CourierAPIError: If the label has to be fetched and the courier fails
+        """
+        name = LabelStore.path(shipment.courier.code, shipment.waybill_id)
+        key = f"courier:label:{name}"
+        meta = cache.get(key)
+        if meta is not None:
+            return meta
+
+        if default_storage.exists(name):
+            with default_storage.open(name, "rb") as label_file:
+                digest = hashlib.sha256()
+                size = 0
+                for chunk in label_file.chunks():
+                    digest.update(chunk)
+                    size += len(chunk)
+        else:
+            courier_adapter = CourierFactory.get_courier(shipment.courier.code)
+            content = courier_adapter.fetch_label_pdf(shipment.waybill_id)
+            saved_name = default_storage.save(name, ContentFile(content))
+            if saved_name != name:
+                # Another process stored the label first
+                default_storage.delete(saved_name)
+            logger.info(f"Stored label for waybill {shipment.waybill_id} at {name}")
+            digest = hashlib.sha256(content)
+            size = len(content)
+
+        meta = {"name": name, "size": size, "etag": digest.hexdigest()[:32]}
+        cache.set(key, meta, None)
+        return meta
+
+    @staticmethod
+    def open(meta: Dict[str, Any]):
+        return default_storage.open(meta["name"], "rb")
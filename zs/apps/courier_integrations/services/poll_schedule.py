@@ -0,0 +1,87 @@
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+
+
+# Statuses that are never polled again
+TERMINAL_STATUSES = frozenset({
+    ShipmentStatus.DELIVERED.value,
+    ShipmentStatus.RETURNED.value,
+    ShipmentStatus.CANCELLED.value,
+})
+
+# Seconds between tracking polls by unified status while the status keeps
+# changing. Out for delivery settles within hours; pending may take days.
+DEFAULT_POLL_INTERVALS = {
+    ShipmentStatus.OUT_FOR_DELIVERY.value: 30 * 60,
+    ShipmentStatus.ATTEMPTED_DELIVERY.value: 2 * 60 * 60,
+    ShipmentStatus.PICKED_UP.value: 2 * 60 * 60,
+    ShipmentStatus.IN_TRANSIT.value: 3 * 60 * 60,
+    ShipmentStatus.PENDING.value: 2 * 60 * 60,
+}
+
+
+class PollSchedule:
+    """
+    When a shipment is next polled for tracking.
+
+    The base interval depends on the status and doubles with every poll
+    that found no status change, up to `max_interval`. Each interval is
+    stretched or shrunk by up to `jitter` so shipments created or updated
+    together are not polled together again. Terminal statuses are not
+    polled at all.
+    """
+
+    @staticmethod
+    def _settings() -> Dict[str, Any]:
+        return getattr(settings, "COURIER_POLL_SCHEDULE", {})
+
+    @staticmethod
+    def interval(status: str, unchanged_polls: int = 0) -> Optional[float]:
+        """Seconds until the next poll without jitter, or None for terminal statuses"""
+        if status in TERMINAL_STATUSES:
+            return None
+        config = PollSchedule._settings()
+        intervals = {**DEFAULT_POLL_INTERVALS, **config.get("intervals", {})}
+        base = float(intervals.get(status, config.get("default_interval", 6 * 60 * 60)))
+        max_interval = float(config.get("max_interval", 24 * 60 * 60))
+        # The exponent is capped so large counts cannot overflow
+        return min(base * 2 ** min(unchanged_polls, 32), max(base, max_interval))
+
+    @staticmethod
+    def next_poll_at(status: str, unchanged_polls: int = 0, now: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Time of the next poll
+
+        Args:
+            status: Current unified status of the shipment
+            unchanged_polls: Polls in a row that found no status change
+            now: Time of the current poll, defaults to now
+
+        Returns:
+            Jittered next poll time, or None for terminal statuses
+        """
+        interval = PollSchedule.interval(status, unchanged_polls)
+        if interval is None:
+            return None
+        jitter = float(PollSchedule._settings().get("jitter", 0.2))
+        interval *= random.uniform(1 - jitter, 1 + jitter)
+        return (now or timezone.now()) + timedelta(seconds=interval)
+
+    @staticmethod
+    def after_webhook(status: str, now: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Next poll of a shipment whose courier pushed its tracking
+
+        Such shipments are only polled as a safety net, `webhook_interval`
+        (a day by default) after the last pushed event.
+        """
+        if status in TERMINAL_STATUSES:
+            return None
+        interval = float(PollSchedule._settings().get("webhook_interval", 24 * 60 * 60))
+        return (now or timezone.now()) + timedelta(seconds=interval)
@@ -0,0 +1,137 @@
+import csv
+import io
+from datetime import datetime
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Generator, Iterable
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import JSONObject
+
+from zs.apps.courier_integrations.models.shipment import Shipment
+from zs.apps.courier_integrations.models.tracking import ShipmentTracking
+
+
+# Export columns, in order; latest_event_* come from the newest tracking event
+EXPORT_FIELDS = (
+    'id', 'reference_number', 'courier', 'waybill_id', 'status',
+    'created_at', 'updated_at', 'last_tracking_update',
+    'latest_event_status', 'latest_event_courier_status', 'latest_event_location', 'latest_event_at',
+)
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class ShipmentExport:
+    """
+    Streams shipments with their latest tracking event as CSV or NDJSON.
+
+    Rows are read with a server-side cursor, `chunk_size` at a time, and
+    written out chunk by chunk, so memory use does not depend on the size
+    of the export. The cursor lives in a transaction opened for the export,
+    which also gives the whole file a single consistent snapshot. Under
+    ASGI, astream must be used: Django reads a sync iterator to the end
+    before it sends the first byte.
+    """
+
+    @staticmethod
+    def rows(**filters) -> QuerySet:
+        """
+        Export rows as dicts, in id order
+
+        The latest event is read with one correlated subquery per shipment,
+        which walks the shipment_tracking_event_uniq index backwards.
+        """
+        latest_event = (
+            ShipmentTracking.objects.filter(shipment=OuterRef('pk'))
+            .order_by('-timestamp', '-courier_status')
+            .values(event=JSONObject(
+                status='status', courier_status='courier_status', location='location', timestamp='timestamp',
+            ))[:1]
+        )
+        queryset = Shipment.objects.matching(**filters)
+        return (
+            queryset.annotate(latest_event=Subquery(latest_event))
+            .order_by('id')
+            .values(
+                'id', 'reference_number', 'waybill_id', 'status', 'created_at', 'updated_at',
+                'last_tracking_update', 'latest_event', courier_code=F('courier__code'),
+            )
+        )
+
+    @staticmethod
+    def stream(export_format: str, chunk_size: int = 2000, **filters) -> Generator[bytes, None, None]:
+        """
+        Yield the export, one encoded chunk of rows at a time
+
+        Args:
+            export_format: "csv" or "ndjson"
+            chunk_size: Rows fetched from the cursor and written per chunk
+            **filters: Keyword arguments of ShipmentQuerySet.matching
+
+        Yields:
+            UTF-8 encoded chunks; CSV starts with a header line
+        """
+        encode = {'csv': ShipmentExport._encode_csv, 'ndjson': ShipmentExport._encode_ndjson}[export_format]
+        if export_format == 'csv':
+            yield encode([dict(zip(EXPORT_FIELDS, EXPORT_FIELDS))])
+        with transaction.atomic():
+            chunk = []
+            for row in ShipmentExport.rows(**filters).iterator(chunk_size=chunk_size):
+                chunk.append(ShipmentExport._flatten(row))
+                if len(chunk) == chunk_size:
+                    yield encode(chunk)
+                    chunk = []
+            if chunk:
+                yield encode(chunk)
+
+    @staticmethod
+    async def astream(export_format: str, chunk_size: int = 2000, **filters) -> AsyncIterator[bytes]:
+        """
+        Async variant of stream for ASGI servers
+
+        Every chunk is pulled from stream through sync_to_async. Calls are
+        thread sensitive, so they all run on the request's sync thread,
+        which keeps the cursor and its transaction on one connection.
+        """
+        chunks = ShipmentExport.stream(export_format, chunk_size, **filters)
+        next_chunk = sync_to_async(partial(next, chunks, None))
+        try:
+            while True:
+                chunk = await next_chunk()
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            # Ends the transaction when the client disconnects early
+            await sync_to_async(chunks.close)()
+
+    @staticmethod
+    def _flatten(row: Dict[str, Any]) -> Dict[str, Any]:
+        row['courier'] = row.pop('courier_code')
+        event = row.pop('latest_event') or {}
+        row['latest_event_status'] = event.get('status')
+        row['latest_event_courier_status'] = event.get('courier_status')
+        row['latest_event_location'] = event.get('location')
+        row['latest_event_at'] = event.get('timestamp')
+        return row
+
+    @staticmethod
+    def _encode_csv(rows: Iterable[Dict[str, Any]]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in (row[field] for field in EXPORT_FIELDS)
+            ])
+        return buffer.getvalue().encode()
+
+    @staticmethod
+    def _encode_ndjson(rows: Iterable[Dict[str, Any]]) -> bytes:
+        return b''.join(orjson.dumps({field: row[field] for field in EXPORT_FIELDS}) + b'\n' for row in rows)
@@ -1,14 +1,29 @@
-from typing import Dict, Any
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import batched
+from typing import Dict, Any, List, Optional, Tuple
+from django.conf import settings
 from django.utils import timezone
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import F
 from zs.apps.courier_integrations.models.shipment import Shipment
 from zs.apps.courier_integrations.models.courier import Courier
+from zs.apps.courier_integrations.models.outbox import ShipmentOutbox
 from zs.apps.courier_integrations.models.tracking import ShipmentTracking
 from zs.apps.courier_integrations.factories.courier_factory import CourierFactory
 from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
-from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError, CourierRateLimitError
+from zs.apps.courier_integrations.services.poll_schedule import PollSchedule
+from zs.apps.courier_integrations.services.status_transitions import ShipmentTransitions
+from zs.apps.courier_integrations.services.tracking_history import TrackingHistory
+from zs.apps.courier_integrations.services.tracking_snapshot import TrackingSnapshot
+from zs.apps.courier_integrations.services.tracking_cache import TrackingCache
 from datetime import date, datetime
 
+logger = logging.getLogger(__name__)
+
+
 class ShipmentService:
     """Business logic for shipment operations"""
     
@@ -28,69 +43,399 @@ class ShipmentService:
             ValidationError: If courier is invalid or inactive
             CourierAPIError: If courier API returns an error
         """
+        shipment = ShipmentService._create_shipment_record(data)
+        
+        # Get courier adapter and create waybill
+        courier_adapter = CourierFactory.get_courier(shipment.courier.code)
+        result = courier_adapter.create_waybill(shipment.data)
+        
+        # Update shipment with waybill information
+        shipment.waybill_id = result['waybill_id']
+        shipment.save()
+        
+        return shipment
 
-        for key, value in data.items():
-            if isinstance(value, (date, datetime)):
-                data[key] = value.isoformat()
+    @staticmethod
+    @transaction.atomic
+    def queue_shipment(data: Dict[str, Any]) -> Shipment:
+        """
+        Create a shipment whose waybill is created asynchronously
+
+        The shipment and an outbox entry are written in one transaction; a
+        Celery worker creates the waybill after commit, so no transaction
+        or connection is held during the courier call.
+
+        Args:
+            data: Shipment data including courier_code
+
+        Returns:
+            Created Shipment instance, without waybill_id
+        """
+        from zs.apps.courier_integrations.tasks.shipment_tasks import process_shipment_outbox
 
-        courier_code = data.pop('courier_code')
+        shipment = ShipmentService._create_shipment_record(data)
+        entry = ShipmentOutbox.objects.create(
+            shipment=shipment,
+            operation=ShipmentOutbox.Operation.CREATE_WAYBILL,
+        )
+        transaction.on_commit(lambda: process_shipment_outbox.delay(entry.id))
+        return shipment
+
+    @staticmethod
+    def _create_shipment_record(data: Dict[str, Any]) -> Shipment:
+        """Create the shipment row, without waybill, from validated data"""
+        courier_code = ShipmentService._prepare_shipment_data(data)
         courier = Courier.objects.get(code=courier_code, is_active=True)
         
-        # Create shipment record first without waybill
-        shipment = Shipment.objects.create(
+        return Shipment.objects.create(
             reference_number=data['reference_number'],
             courier=courier,
             status=ShipmentStatus.PENDING.value,
+            next_poll_at=PollSchedule.next_poll_at(ShipmentStatus.PENDING.value),
             data=data
         )
-        
-        # Get courier adapter and create waybill
+
+    @staticmethod
+    def _prepare_shipment_data(data: Dict[str, Any]) -> str:
+        """Make validated data JSON serializable and pop its courier code"""
+        for key, value in data.items():
+            if isinstance(value, (date, datetime)):
+                data[key] = value.isoformat()
+        return data.pop('courier_code')
+
+    @staticmethod
+    def bulk_create_shipments(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create many shipments with their waybills
+
+        Couriers are loaded in one query and all rows are inserted with
+        bulk_create. Waybills are then requested per courier in batches of
+        get_creation_batch_size() shipments (one CreateShipments call per 50
+        for ARAMEX), with batches sent concurrently up to the courier's
+        connection pool size. No transaction is held during courier calls.
+        Shipments whose waybill could not be created are deleted again, so
+        the same items can be resubmitted.
+
+        Args:
+            items: Validated shipment data, each including courier_code
+
+        Returns:
+            One result per item, in order, with status "created" or "failed"
+        """
+        results = [{'index': index, 'reference_number': data['reference_number']} for index, data in enumerate(items)]
+        courier_codes = [ShipmentService._prepare_shipment_data(data) for data in items]
+        couriers = Courier.objects.filter(code__in=set(courier_codes), is_active=True).in_bulk(field_name='code')
+        existing = set(
+            Shipment.objects.filter(
+                reference_number__in=[data['reference_number'] for data in items]
+            ).values_list('reference_number', flat=True)
+        )
+
+        pending = []
+        seen = set()
+        for result, courier_code, data in zip(results, courier_codes, items):
+            reference_number = data['reference_number']
+            if courier_code not in couriers:
+                result.update(status='failed', error=f"Courier with code '{courier_code}' does not exist or is inactive")
+            elif reference_number in existing or reference_number in seen:
+                result.update(status='failed', error=f"Shipment with reference number '{reference_number}' already exists")
+            else:
+                seen.add(reference_number)
+                shipment = Shipment(
+                    reference_number=reference_number,
+                    courier=couriers[courier_code],
+                    status=ShipmentStatus.PENDING.value,
+                    next_poll_at=PollSchedule.next_poll_at(ShipmentStatus.PENDING.value),
+                    data=data,
+                )
+                pending.append((result, shipment))
+
+        with transaction.atomic():
+            Shipment.objects.bulk_create([shipment for _, shipment in pending], batch_size=500)
+
+        by_courier: Dict[str, List] = {}
+        for result, shipment in pending:
+            by_courier.setdefault(shipment.courier.code, []).append((result, shipment))
+        for courier_code, entries in by_courier.items():
+            ShipmentService._create_waybills(courier_code, entries)
+
+        created = [shipment for result, shipment in pending if result['status'] == 'created']
+        failed_ids = [shipment.id for result, shipment in pending if result['status'] == 'failed']
+        with transaction.atomic():
+            Shipment.objects.bulk_update(created, ['waybill_id'], batch_size=500)
+            Shipment.objects.filter(id__in=failed_ids).delete()
+
+        logger.info(f"Bulk created {len(created)} of {len(items)} shipments")
+        return results
+
+    @staticmethod
+    def _create_waybills(courier_code: str, entries: List):
+        """Request waybills for (result, shipment) pairs of one courier and fill in the results"""
         courier_adapter = CourierFactory.get_courier(courier_code)
-        result = courier_adapter.create_waybill(data)
-        
-        # Update shipment with waybill information
-        shipment.waybill_id = result['waybill_id']
-        shipment.save()
-        
-        return shipment
+        batches = list(batched(entries, courier_adapter.get_creation_batch_size()))
+
+        def create_batch(batch):
+            try:
+                return courier_adapter.create_waybills([dict(shipment.data) for _, shipment in batch])
+            except CourierAPIError as err:
+                return [{'error': str(err)}] * len(batch)
+
+        workers = min(len(batches), courier_adapter.transport.pool_maxsize)
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            for batch, waybills in zip(batches, executor.map(create_batch, batches)):
+                for (result, shipment), waybill in zip(batch, waybills):
+                    if waybill.get('error') or not waybill.get('waybill_id'):
+                        result.update(status='failed', error=waybill.get('error') or 'No waybill returned')
+                        continue
+                    shipment.waybill_id = waybill['waybill_id']
+                    result.update(status='created', shipment_id=shipment.id, waybill_id=shipment.waybill_id)
+
+    @staticmethod
+    def process_outbox_entry(entry_id: int) -> Optional[ShipmentOutbox]:
+        """
+        Carry out a due outbox entry
+
+        The entry is claimed in a short transaction, the courier is called
+        outside of any transaction, and the result is written in another.
+        Failed calls, including unexpected errors and answers without a
+        waybill, are retried with exponential backoff until
+        COURIER_OUTBOX_MAX_ATTEMPTS is reached.
+
+        Args:
+            entry_id: ID of the ShipmentOutbox entry
+
+        Returns:
+            The processed entry, or None if it is not due or already claimed
+        """
+        with transaction.atomic():
+            entry = (
+                ShipmentOutbox.objects.select_for_update(skip_locked=True)
+                .select_related('shipment__courier')
+                .filter(id=entry_id, status=ShipmentOutbox.Status.PENDING, available_at__lte=timezone.now())
+                .first()
+            )
+            if entry is None:
+                return None
+            entry.status = ShipmentOutbox.Status.PROCESSING
+            entry.attempts += 1
+            entry.save(update_fields=['status', 'attempts', 'updated_at'])
+
+        shipment = entry.shipment
+        try:
+            courier_adapter = CourierFactory.get_courier(shipment.courier.code)
+            result = courier_adapter.create_waybill(dict(shipment.data))
+            if not result.get('waybill_id'):
+                raise CourierAPIError(result.get('error') or 'Courier returned no waybill')
+        except Exception as err:
+            if not isinstance(err, CourierAPIError):
+                logger.exception(f"Unexpected error creating the waybill of {entry}")
+            ShipmentService._reschedule_outbox_entry(entry, err)
+            return entry
+
+        with transaction.atomic():
+            shipment.waybill_id = result['waybill_id']
+            shipment.save(update_fields=['waybill_id', 'updated_at'])
+            entry.status = ShipmentOutbox.Status.DONE
+            entry.last_error = ''
+            entry.processed_at = timezone.now()
+            entry.save(update_fields=['status', 'last_error', 'processed_at', 'updated_at'])
+        return entry
+
+    @staticmethod
+    def _reschedule_outbox_entry(entry: ShipmentOutbox, err: Exception):
+        entry.last_error = str(err)
+        if entry.attempts >= settings.COURIER_OUTBOX_MAX_ATTEMPTS:
+            logger.error(f"Giving up on {entry} after {entry.attempts} attempts: {err}")
+            entry.status = ShipmentOutbox.Status.FAILED
+        else:
+            if isinstance(err, CourierRateLimitError) and err.retry_after:
+                delay = err.retry_after
+            else:
+                delay = min(30 * 2 ** (entry.attempts - 1), 60 * 60)
+            logger.warning(f"Retrying {entry} in {delay:.0f}s: {err}")
+            entry.status = ShipmentOutbox.Status.PENDING
+            entry.available_at = timezone.now() + timedelta(seconds=delay)
+        entry.save(update_fields=['status', 'last_error', 'available_at', 'updated_at'])
+
+    @staticmethod
+    def due_outbox_entry_ids(limit: int = 500) -> List[int]:
+        """
+        IDs of outbox entries ready to be processed
+
+        Entries stuck in processing longer than the Celery hard time limit
+        (worker crash) are put back to pending first.
+        """
+        stale_before = timezone.now() - timedelta(seconds=settings.CELERY_TASK_TIME_LIMIT)
+        ShipmentOutbox.objects.filter(
+            status=ShipmentOutbox.Status.PROCESSING, updated_at__lt=stale_before
+        ).update(status=ShipmentOutbox.Status.PENDING, updated_at=timezone.now())
+        return list(
+            ShipmentOutbox.objects.filter(
+                status=ShipmentOutbox.Status.PENDING, available_at__lte=timezone.now()
+            ).values_list('id', flat=True)[:limit]
+        )
     
     @staticmethod
-    def update_tracking_status(shipment: Shipment) -> Dict[str, Any]:
+    def due_for_tracking(cutoff: datetime, after: Optional[Tuple[datetime, int]] = None):
+        """
+        Shipments due for a tracking poll, as (id, courier_id, next_poll_at)
+
+        Ordered by (next_poll_at, id) so pages are range scans of
+        shipment_poll_due_idx.
+
+        Args:
+            cutoff: Only shipments due at or before this time
+            after: (next_poll_at, id) of the last shipment of the previous page
+        """
+        # Criteria:
+        # 1. Due for a poll; terminal shipments have no next_poll_at
+        # 2. Have a waybill to track
+        due = Shipment.objects.filter(
+            next_poll_at__lte=cutoff
+        ).exclude(
+            waybill_id=''
+        )
+        if after:
+            after_poll_at, after_id = after
+            due = due.filter(next_poll_at__gte=after_poll_at).exclude(next_poll_at=after_poll_at, id__lte=after_id)
+        return due.order_by('next_poll_at', 'id').values_list('id', 'courier_id', 'next_poll_at')
+
+    @staticmethod
+    def claim_due_for_tracking(
+        cutoff: datetime,
+        limit: int,
+        lease_until: datetime,
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Tuple[int, int, datetime]]:
+        """
+        Claim a page of shipments due for a tracking poll
+
+        One statement reads the page of due_for_tracking and moves the
+        next_poll_at of its shipments to `lease_until`, so a dispatch run
+        that overlaps the previous one, or a page chain that outlasts the
+        beat interval, does not queue them again. The poll schedules the
+        real next poll; a poll that fails leaves the lease to expire and
+        the shipment is picked up again. Rows locked by another dispatcher
+        are skipped.
+
+        Returns:
+            (id, courier_id, next_poll_at before the claim), in
+            (next_poll_at, id) order
+        """
+        due = ShipmentService.due_for_tracking(cutoff, after).select_for_update(skip_locked=True)[:limit]
+        due_sql, due_params = due.query.sql_with_params()
+        table = connection.ops.quote_name(Shipment._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'WITH due AS ({due_sql}) '
+                f'UPDATE {table} SET next_poll_at = %s FROM due WHERE {table}.id = due.id '
+                f'RETURNING due.id, due.courier_id, due.next_poll_at',
+                (*due_params, lease_until),
+            )
+            claimed = cursor.fetchall()
+        return sorted(claimed, key=lambda row: (row[2], row[0]))
+    
+    @staticmethod
+    def update_tracking_status(shipment: Shipment, scheduled: bool = False) -> Dict[str, Any]:
         """
         Update shipment tracking status
+
+        Results are cached per waybill (see TrackingCache); a cached result
+        is returned without touching the shipment again. A fetched result
+        also schedules the next periodic poll (see PollSchedule). The status
+        is changed with a conditional update (see ShipmentTransitions), so a
+        stale result never replaces a newer status.
         
         Args:
             shipment: Shipment instance to update
+            scheduled: This is the periodic poll of the shipment; a cached
+                result (fresh, or stale while the courier fails) then
+                counts as a poll without change and backs off the next one
             
         Returns:
             Tracking data dictionary
             
         Raises:
-            CourierAPIError: If courier API returns an error
+            CourierAPIError: If courier API returns an error and no cached result exists
         """
         courier_adapter = CourierFactory.get_courier(shipment.courier.code)
-        tracking_data = courier_adapter.track_shipment(shipment.waybill_id)
+        tracking_data, fetched = TrackingCache.get_or_fetch(
+            shipment.courier.code,
+            shipment.waybill_id,
+            lambda: courier_adapter.track_shipment(shipment.waybill_id),
+        )
+        if not fetched:
+            if scheduled:
+                ShipmentService._postpone_poll(shipment)
+            return tracking_data
         
+        now = timezone.now()
+
+        def poll_fields(current: Shipment, status: str) -> Dict[str, Any]:
+            # Back off polling while the status does not change
+            unchanged_polls = current.unchanged_polls + 1 if status == current.status else 0
+            return {
+                'unchanged_polls': unchanged_polls,
+                'last_tracking_update': now,
+                'next_poll_at': PollSchedule.next_poll_at(status, unchanged_polls, now),
+            }
+
         with transaction.atomic():
-            # Update shipment status
-            shipment.status = tracking_data['current_status']
-            shipment.last_tracking_update = timezone.now()
-            shipment.save()
+            # Conditional update; a concurrent newer status is not overwritten
+            ShipmentTransitions.transition(shipment, tracking_data['current_status'], poll_fields)
             
-            # Create tracking history records
-            for event in tracking_data.get('history', []):
-                ShipmentTracking.objects.create(
-                    shipment=shipment,
-                    courier_status=event.get('description', ''),
-                    status=event.get('status', ''),
-                    location=event.get('location', ''),
-                    timestamp=event.get('timestamp', timezone.now()),
-                    description=event.get('description', ''),
-                    raw_data=event
-                )
+            history = ShipmentService._new_tracking_history(shipment, tracking_data.get('history', []), now)
+            if history:
+                ShipmentTracking.objects.bulk_create(history, ignore_conflicts=True)
+                TrackingSnapshot.refresh([shipment.id])
         
         return tracking_data
     
+    @staticmethod
+    def _postpone_poll(shipment: Shipment):
+        """Schedule the next poll of a shipment whose poll was answered from the cache"""
+        if shipment.next_poll_at is None:
+            return
+        now = timezone.now()
+        unchanged_polls = shipment.unchanged_polls + 1
+        # Matches only the version read; a concurrent update has scheduled
+        # the shipment already
+        Shipment.objects.filter(id=shipment.id, version=shipment.version).update(
+            unchanged_polls=unchanged_polls,
+            next_poll_at=PollSchedule.next_poll_at(shipment.status, unchanged_polls, now),
+            version=F('version') + 1,
+            updated_at=now,
+        )
+
+    @staticmethod
+    def _new_tracking_history(shipment: Shipment, events: List[Dict[str, Any]], now) -> List[ShipmentTracking]:
+        """
+        Tracking history records for polled events
+
+        Events stored by earlier polls hit the unique key and are skipped on
+        insert. Events without a courier timestamp are stored at the poll
+        time, so the key cannot catch them; they are skipped here when an
+        event with the same status, location and description is stored.
+        """
+        def key(event):
+            description = event.get('description', '')
+            return (shipment.id, description, event.get('location', ''), description)
+
+        stored = TrackingHistory.stored(key(event) for event in events if not event.get('timestamp'))
+        return [
+            ShipmentTracking(
+                shipment=shipment,
+                courier_status=event.get('description', ''),
+                status=event.get('status', ''),
+                location=event.get('location', ''),
+                timestamp=event.get('timestamp') or now,
+                description=event.get('description', ''),
+                raw_data=event
+            )
+            for event in events
+            if event.get('timestamp') or key(event) not in stored
+        ]
+
     @staticmethod
     def cancel_shipment(shipment: Shipment) -> Dict[str, Any]:
         """
@@ -112,7 +457,7 @@ class ShipmentService:
         # Update shipment status if cancelled
         if result.get('status') == 'cancelled':
             with transaction.atomic():
-                shipment.status = ShipmentStatus.CANCELLED.value
-                shipment.save()
+                if not ShipmentTransitions.transition(shipment, ShipmentStatus.CANCELLED.value):
+                    logger.warning(f"Courier cancelled shipment {shipment.id} in status {shipment.status}")
         
         return result
\ No newline at end of file
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from django.db import DatabaseError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+
+
+logger = logging.getLogger(__name__)
+
+# Unmapped counts are written to the database at most this often per process
+UNMAPPED_FLUSH_SECONDS = 30
+# Non-exact lookups remembered per courier; courier vocabularies are small
+MEMO_SIZE = 10000
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(courier_status: str) -> str:
+    """Lowercase status text with whitespace collapsed, the form rules match"""
+    return _WHITESPACE.sub(" ", courier_status or "").strip().lower()
+
+
+def valid_status(status: str) -> Optional[str]:
+    """The ShipmentStatus value for `status`, accepting member names too"""
+    if status in ShipmentStatus.values:
+        return status
+    lowered = str(status).lower()
+    return lowered if lowered in ShipmentStatus.values else None
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class StatusRules:
+    """
+    Compiled status rules of one courier.
+
+    Built-in mappings of the adapter and active StatusRule rows (courier
+    specific, then global) are compiled once into an exact-match dict, a
+    prefix list (longest first) and a regex list (by priority). Exact
+    matches are a dict lookup; results of prefix and regex matching are
+    memoized, so mapping a known text is O(1). Texts that nothing matches
+    map to UNKNOWN and are counted in UnmappedStatus.
+    """
+
+    _unmapped: Counter = Counter()
+    _unmapped_lock = threading.Lock()
+    _flushed_at = time.monotonic()
+
+    def __init__(
+        self,
+        courier_code: str,
+        exact: Dict[str, str],
+        prefixes: List[Tuple[str, str]],
+        patterns: List[Tuple[re.Pattern, str]],
+    ):
+        self.courier_code = courier_code
+        self.exact = exact
+        self.prefixes = prefixes
+        self.patterns = patterns
+        self._memo: Dict[str, str] = {}
+
+    @classmethod
+    def compile(cls, courier_code: Optional[str], builtin: Dict[str, str]) -> "StatusRules":
+        """
+        Compile the rules of a courier
+
+        Args:
+            courier_code: Courier whose StatusRule rows apply; global rules only when None
+            builtin: Adapter mappings of lowercase status text to ShipmentStatus
+
+        Returns:
+            Compiled rules; built-in targets that are not a ShipmentStatus are dropped
+        """
+        from zs.apps.courier_integrations.models.status_rule import StatusRule
+
+        exact = {}
+        for text, status in builtin.items():
+            target = valid_status(status)
+            if target is None:
+                logger.warning(f"Ignoring {courier_code} mapping {text!r} to unknown status {status!r}")
+                continue
+            exact[normalize(text)] = target
+
+        scope = Q(courier__isnull=True)
+        if courier_code:
+            scope |= Q(courier__code=courier_code)
+        # Global rules first so courier rules for the same text replace them
+        rules = StatusRule.objects.filter(scope, is_active=True).order_by(
+            F('courier').asc(nulls_first=True), 'priority', 'id'
+        )
+        prefixes = {}
+        patterns = []
+        for rule in rules:
+            if rule.match_type == StatusRule.MatchType.EXACT:
+                exact[normalize(rule.pattern)] = rule.status
+            elif rule.match_type == StatusRule.MatchType.PREFIX:
+                prefixes[normalize(rule.pattern)] = rule.status
+            else:
+                try:
+                    pattern = re.compile(rule.pattern, re.IGNORECASE)
+                except re.error as err:
+                    logger.warning(f"Ignoring status rule {rule.id}: {err}")
+                    continue
+                # Courier rules before global ones of the same priority
+                patterns.append((rule.priority, rule.courier_id is None, pattern, rule.status))
+        patterns.sort(key=lambda item: (item[0], item[1]))
+        return cls(
+            courier_code or "",
+            exact,
+            sorted(prefixes.items(), key=lambda item: len(item[0]), reverse=True),
+            [(pattern, status) for _, _, pattern, status in patterns],
+        )
+
+    def map(self, courier_status: str) -> str:
+        """Unified status of a courier status text"""
+        text = normalize(courier_status)
+        status = self.exact.get(text)
+        if status is not None:
+            return status
+        status = self._memo.get(text)
+        if status is None:
+            status = self._match(text)
+            if len(self._memo) < MEMO_SIZE:
+                self._memo[text] = status
+        if status == ShipmentStatus.UNKNOWN.value and text:
+            self.record_unmapped(self.courier_code, text)
+        return status
+
+    def _match(self, text: str) -> str:
+        for prefix, status in self.prefixes:
+            if text.startswith(prefix):
+                return status
+        for pattern, status in self.patterns:
+            if pattern.search(text):
+                return status
+        return ShipmentStatus.UNKNOWN.value
+
+    @classmethod
+    def record_unmapped(cls, courier_code: str, text: str):
+        """Count an unmapped status text; counts are written out periodically"""
+        with cls._unmapped_lock:
+            cls._unmapped[(courier_code, text[:255])] += 1
+            due = time.monotonic() - cls._flushed_at >= UNMAPPED_FLUSH_SECONDS
+        if due and not _in_event_loop():
+            cls.flush_unmapped()
+
+    @classmethod
+    def flush_unmapped(cls):
+        """Add the counts gathered by this process to UnmappedStatus"""
+        from zs.apps.courier_integrations.models.status_rule import UnmappedStatus
+
+        with cls._unmapped_lock:
+            counts, cls._unmapped = cls._unmapped, Counter()
+            cls._flushed_at = time.monotonic()
+        if not counts:
+            return
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                UnmappedStatus.objects.bulk_create(
+                    [UnmappedStatus(courier_code=code, courier_status=text) for code, text in counts],
+                    ignore_conflicts=True,
+                )
+                for (code, text), count in counts.items():
+                    UnmappedStatus.objects.filter(courier_code=code, courier_status=text).update(
+                        count=F('count') + count, last_seen=now
+                    )
+        except DatabaseError as err:
+            # Counting must never break tracking ingestion
+            logger.error(f"Cannot store unmapped status counts: {err}")
+        logger.warning(f"Unmapped courier statuses: {dict(counts)}")
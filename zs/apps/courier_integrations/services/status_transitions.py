@@ -0,0 +1,172 @@
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.models.shipment import Shipment
+
+
+logger = logging.getLogger(__name__)
+
+# Conditional updates tried before a transition is given up
+MAX_ATTEMPTS = 3
+
+# Statuses a shipment moves between while it is on its way
+ACTIVE_STATUSES = frozenset({
+    ShipmentStatus.PENDING.value,
+    ShipmentStatus.PICKED_UP.value,
+    ShipmentStatus.IN_TRANSIT.value,
+    ShipmentStatus.OUT_FOR_DELIVERY.value,
+    ShipmentStatus.ATTEMPTED_DELIVERY.value,
+    ShipmentStatus.FAILED.value,
+    ShipmentStatus.UNKNOWN.value,
+})
+
+# Statuses a shipment may move to each status from. A shipment never goes
+# back to pending once picked up, and delivered, returned and cancelled
+# shipments stay so; only a delivered shipment may still be returned.
+# Keeping the current status is always allowed.
+ALLOWED_PREDECESSORS: Dict[str, FrozenSet[str]] = {
+    ShipmentStatus.PENDING.value: frozenset({ShipmentStatus.UNKNOWN.value}),
+    ShipmentStatus.PICKED_UP.value: frozenset({ShipmentStatus.PENDING.value, ShipmentStatus.UNKNOWN.value}),
+    ShipmentStatus.IN_TRANSIT.value: ACTIVE_STATUSES,
+    ShipmentStatus.OUT_FOR_DELIVERY.value: ACTIVE_STATUSES,
+    ShipmentStatus.ATTEMPTED_DELIVERY.value: ACTIVE_STATUSES,
+    ShipmentStatus.FAILED.value: ACTIVE_STATUSES,
+    ShipmentStatus.UNKNOWN.value: frozenset({ShipmentStatus.PENDING.value}),
+    ShipmentStatus.DELIVERED.value: ACTIVE_STATUSES,
+    ShipmentStatus.RETURNED.value: ACTIVE_STATUSES | {ShipmentStatus.DELIVERED.value},
+    ShipmentStatus.CANCELLED.value: ACTIVE_STATUSES,
+}
+
+# Fields re-read after a lost update; `fields` callables may depend on them
+REFRESH_FIELDS = ['status', 'version', 'unchanged_polls', 'last_tracking_update', 'next_poll_at']
+
+FieldsCallable = Callable[[Shipment, str], Dict[str, Any]]
+
+
+def predecessors(status: str) -> FrozenSet[str]:
+    """Statuses a shipment may move to `status` from, `status` included"""
+    return ALLOWED_PREDECESSORS.get(status, frozenset()) | {status}
+
+
+def can_transition(current: str, status: str) -> bool:
+    return current in predecessors(status)
+
+
+class ShipmentTransitions:
+    """
+    Lock-free shipment status updates.
+
+    Writers never save a loaded instance. They issue one conditional
+    UPDATE that matches only the version they read and the statuses the
+    new status may follow, and bump the version. An update that matches
+    no row lost a race: the shipment is read again without locking and
+    the transition is checked and tried again on the fresh state, so a
+    stale tracking result can neither overwrite a newer one nor move a
+    delivered shipment back in transit.
+    """
+
+    @staticmethod
+    def transition(shipment: Shipment, status: str, fields: Optional[FieldsCallable] = None) -> bool:
+        """
+        Move a shipment to a status
+
+        A transition that is not allowed from the current status keeps the
+        status; the other fields are written either way.
+
+        Args:
+            shipment: Shipment to update; updated in place on success
+            status: New unified status
+            fields: Called with the current shipment and the status that
+                will be stored; returns further fields to set
+
+        Returns:
+            True when the shipment has `status` afterwards
+        """
+        for _ in range(MAX_ATTEMPTS):
+            target = status if can_transition(shipment.status, status) else shipment.status
+            values = fields(shipment, target) if fields else {}
+            now = timezone.now()
+            updated = Shipment.objects.filter(
+                id=shipment.id, version=shipment.version, status__in=predecessors(target)
+            ).update(status=target, version=F('version') + 1, updated_at=now, **values)
+            if updated:
+                shipment.status = target
+                shipment.version += 1
+                shipment.updated_at = now
+                for name, value in values.items():
+                    setattr(shipment, name, value)
+                if target != status:
+                    logger.info(f"Shipment {shipment.id} kept status {target}, ignoring {status}")
+                return target == status
+            shipment.refresh_from_db(fields=REFRESH_FIELDS)
+
+        logger.warning(f"Shipment {shipment.id} changed concurrently, not moved to {status}")
+        return False
+
+    @staticmethod
+    def transition_many(
+        changes: List[Tuple[Shipment, str]],
+        fields: Callable[[str], Dict[str, Any]],
+        now: datetime,
+    ) -> int:
+        """
+        Move many shipments at once, with one conditional UPDATE per status
+
+        Shipments whose update lost a race go through `transition` one by
+        one. `fields` only depends on the stored status, so shipments with
+        the same new status share the UPDATE.
+
+        Args:
+            changes: Shipments, with `status` and `version` loaded, and their new status
+            fields: Returns further fields to set for a stored status
+            now: Time of the update
+
+        Returns:
+            Number of shipments that reached their new status
+        """
+        groups: Dict[str, List[Tuple[Shipment, str]]] = {}
+        for shipment, status in changes:
+            target = status if can_transition(shipment.status, status) else shipment.status
+            groups.setdefault(target, []).append((shipment, status))
+
+        moved = 0
+        for target, members in groups.items():
+            values = fields(target)
+            matches = Q()
+            for shipment, _ in members:
+                matches |= Q(id=shipment.id, version=shipment.version)
+            updated = Shipment.objects.filter(matches, status__in=predecessors(target)).update(
+                status=target, version=F('version') + 1, updated_at=now, **values
+            )
+
+            lost = set()
+            if updated < len(members):
+                # Rows this UPDATE changed stay locked until commit, so they
+                # still carry the version it set; deleted rows are dropped
+                stored = {
+                    shipment_id: (version, stored_status)
+                    for shipment_id, version, stored_status in Shipment.objects.filter(
+                        id__in=[shipment.id for shipment, _ in members]
+                    ).values_list('id', 'version', 'status')
+                }
+                lost = {
+                    shipment.id for shipment, _ in members
+                    if stored.get(shipment.id, (shipment.version + 1, target)) != (shipment.version + 1, target)
+                }
+            for shipment, status in members:
+                if shipment.id in lost:
+                    shipment.refresh_from_db(fields=['status', 'version'])
+                    moved += ShipmentTransitions.transition(shipment, status, lambda _, stored: fields(stored))
+                    continue
+                shipment.status = target
+                shipment.version += 1
+                shipment.updated_at = now
+                for name, value in values.items():
+                    setattr(shipment, name, value)
+                moved += target == status
+        return moved
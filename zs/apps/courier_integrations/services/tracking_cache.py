@@ -0,0 +1,112 @@
+import logging
+import math
+import random
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds a tracking result stays fresh, by unified status. Terminal statuses
+# rarely change again; out for delivery changes within the hour.
+DEFAULT_TRACKING_TTLS = {
+    ShipmentStatus.DELIVERED.value: 24 * 60 * 60,
+    ShipmentStatus.RETURNED.value: 24 * 60 * 60,
+    ShipmentStatus.CANCELLED.value: 24 * 60 * 60,
+    ShipmentStatus.OUT_FOR_DELIVERY.value: 2 * 60,
+    ShipmentStatus.ATTEMPTED_DELIVERY.value: 5 * 60,
+    ShipmentStatus.PICKED_UP.value: 15 * 60,
+    ShipmentStatus.IN_TRANSIT.value: 15 * 60,
+    ShipmentStatus.PENDING.value: 10 * 60,
+}
+
+
+class TrackingCache:
+    """
+    Cache of courier tracking results keyed by courier and waybill.
+
+    Entries are fresh for a status dependent TTL. Shortly before expiry a
+    caller may refresh early with a probability that grows as expiry nears
+    (XFetch), so a hot waybill is refreshed by one caller instead of all of
+    them at once. Expired entries are kept for `stale_ttl` more seconds and
+    served when the courier call fails, e.g. while its circuit is open.
+    """
+
+    @staticmethod
+    def _settings() -> Dict[str, Any]:
+        return getattr(settings, "COURIER_TRACKING_CACHE", {})
+
+    @staticmethod
+    def key(courier_code: str, waybill_id: str) -> str:
+        return f"courier:tracking:{courier_code}:{waybill_id}"
+
+    @staticmethod
+    def ttl_for(status: Optional[str]) -> int:
+        """Fresh lifetime in seconds of a result with the given unified status"""
+        config = TrackingCache._settings()
+        ttls = {**DEFAULT_TRACKING_TTLS, **config.get("ttls", {})}
+        return int(ttls.get((status or "").lower(), config.get("default_ttl", 5 * 60)))
+
+    @staticmethod
+    def get_or_fetch(
+        courier_code: str, waybill_id: str, fetch: Callable[[], Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Return the cached tracking result or fetch a new one
+
+        Args:
+            courier_code: Courier of the waybill
+            waybill_id: Waybill to track
+            fetch: Calls the courier and returns tracking data
+
+        Returns:
+            (tracking data, True when it was fetched from the courier)
+
+        Raises:
+            CourierAPIError: fetch failed and there is no cached result
+        """
+        key = TrackingCache.key(courier_code, waybill_id)
+        entry = cache.get(key)
+        if entry is not None and not TrackingCache._should_refresh(entry):
+            return entry["data"], False
+
+        started = time.monotonic()
+        try:
+            data = fetch()
+        except CourierAPIError as err:
+            if entry is None:
+                raise
+            logger.warning(f"Serving cached tracking for {courier_code} {waybill_id}: {err}")
+            return entry["data"], False
+
+        TrackingCache.store(courier_code, waybill_id, data, time.monotonic() - started)
+        return data, True
+
+    @staticmethod
+    def store(courier_code: str, waybill_id: str, data: Dict[str, Any], delta: float = 0.0):
+        """Cache tracking data; delta is the seconds it took to fetch"""
+        ttl = TrackingCache.ttl_for(data.get("current_status"))
+        stale_ttl = int(TrackingCache._settings().get("stale_ttl", 24 * 60 * 60))
+        entry = {"data": data, "expires_at": time.time() + ttl, "delta": delta}
+        cache.set(TrackingCache.key(courier_code, waybill_id), entry, ttl + stale_ttl)
+
+    @staticmethod
+    def invalidate(courier_code: str, waybill_id: str):
+        cache.delete(TrackingCache.key(courier_code, waybill_id))
+
+    @staticmethod
+    def invalidate_many(courier_code: str, waybill_ids: List[str]):
+        cache.delete_many([TrackingCache.key(courier_code, waybill_id) for waybill_id in waybill_ids])
+
+    @staticmethod
+    def _should_refresh(entry: Dict[str, Any]) -> bool:
+        """XFetch: expired, or refresh early with probability rising towards expiry"""
+        beta = float(TrackingCache._settings().get("beta", 1.0))
+        jitter = entry["delta"] * beta * -math.log(1.0 - random.random())
+        return time.time() + jitter >= entry["expires_at"]
@@ -0,0 +1,49 @@
+from typing import Iterable, Set, Tuple
+
+from django.db.models import Q
+
+from zs.apps.courier_integrations.models.tracking import ShipmentTracking
+
+
+EventKey = Tuple[int, str, str, str]
+
+
+class TrackingHistory:
+    """
+    Duplicate checks for tracking events without a courier timestamp.
+
+    Tracking events are stored with bulk inserts that skip rows hitting
+    the (shipment, timestamp, courier_status) unique key, so an event
+    received again is stored once. Events without a courier timestamp are
+    stored at the time they are received, so the key cannot catch them;
+    writers skip those whose status, location and description are stored
+    for the shipment already.
+    """
+
+    @staticmethod
+    def stored(keys: Iterable[EventKey]) -> Set[EventKey]:
+        """
+        Which events are stored already, with one query
+
+        Args:
+            keys: (shipment_id, courier_status, location, description) of
+                undated events
+
+        Returns:
+            The keys that match a stored event
+        """
+        keys = set(keys)
+        if not keys:
+            return set()
+        matches = Q()
+        for shipment_id, courier_status, location, description in keys:
+            matches |= Q(
+                shipment_id=shipment_id,
+                courier_status=courier_status,
+                location=location,
+                description=description,
+            )
+        return set(
+            ShipmentTracking.objects.filter(matches)
+            .values_list('shipment_id', 'courier_status', 'location', 'description')
+        )
@@ -0,0 +1,311 @@
+import logging
+import re
+from datetime import date, datetime, timezone as dt_timezone
+from typing import Dict, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from zs.apps.courier_integrations.models.tracking import ShipmentTracking
+
+
+logger = logging.getLogger(__name__)
+
+TABLE = ShipmentTracking._meta.db_table
+# The table as it was before partitioning, kept as the oldest partition
+LEGACY_TABLE = f"{TABLE}_legacy"
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+_BOUND = re.compile(r"FOR VALUES FROM \((.+)\) TO \((.+)\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    # None for MINVALUE and MAXVALUE
+    start: Optional[datetime]
+    end: Optional[datetime]
+
+
+def month_start(value: date, months: int = 0) -> datetime:
+    """UTC midnight of the first day of the month `months` after that of `value`"""
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def _quote(name: str) -> str:
+    return connection.ops.quote_name(name)
+
+
+def _literal(value: datetime) -> str:
+    return f"'{value.isoformat()}'"
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return parse_datetime(value.strip("'").replace(" ", "T"))
+
+
+class TrackingPartitions:
+    """
+    Monthly range partitions of the tracking history table.
+
+    Partitioning is optional: `convert` turns the table into a table
+    partitioned by `timestamp`, and `maintain` (the daily
+    maintain_tracking_partitions task) creates the partitions of the
+    coming months and detaches or drops those past retention. Until the
+    table is converted, `maintain` does nothing.
+
+    The existing table is not copied; it becomes the partition of all
+    events before the month after next. Events outside every monthly
+    partition land in a default partition. Queries filtering on
+    `timestamp` only scan the partitions of that range.
+    """
+
+    @staticmethod
+    def _settings():
+        return getattr(settings, "COURIER_TRACKING_PARTITIONS", {})
+
+    @staticmethod
+    def is_partitioned() -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+                [TABLE],
+            )
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def partitions() -> List[Partition]:
+        """Attached partitions with a range, oldest first; the default partition is left out"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+                FROM pg_inherits
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = to_regclass(%s)
+                """,
+                [TABLE],
+            )
+            rows = cursor.fetchall()
+        partitions = []
+        for name, bound in rows:
+            match = _BOUND.match(bound)
+            if match:
+                partitions.append(Partition(name, _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+        last = datetime.max.replace(tzinfo=dt_timezone.utc)
+        return sorted(partitions, key=lambda partition: partition.end or last)
+
+    @staticmethod
+    def convert(concurrently: bool = True, today: Optional[date] = None):
+        """
+        Turn the tracking table into a partitioned table
+
+        Rows stay where they are: the table is renamed and attached as the
+        partition of all events before the month after next. The unique
+        index the primary key (id, timestamp) needs, and the CHECK
+        constraint that spares attaching a scan, are built and validated
+        first without blocking writes. The swap itself holds an exclusive
+        lock for a moment.
+
+        Args:
+            concurrently: Build the index concurrently; needs autocommit
+            today: Defaults to today
+
+        Raises:
+            ValueError: The table is partitioned already
+            IntegrityError: Stored events are dated after the legacy bound
+        """
+        if TrackingPartitions.is_partitioned():
+            raise ValueError(f"{TABLE} is partitioned already")
+        bound = month_start(today or timezone.now().date(), 2)
+        table, legacy = _quote(TABLE), _quote(LEGACY_TABLE)
+        sequence = f"{TABLE}_id_seq"
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE UNIQUE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS "
+                f"{_quote(f'{LEGACY_TABLE}_id_timestamp')} ON {table} (id, \"timestamp\")"
+            )
+            # Left behind by a conversion that failed to validate it
+            cursor.execute(
+                f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {_quote(f'{LEGACY_TABLE}_bound')}, "
+                f"ADD CONSTRAINT {_quote(f'{LEGACY_TABLE}_bound')} "
+                f"CHECK (\"timestamp\" < {_literal(bound)}) NOT VALID"
+            )
+            cursor.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {_quote(f'{LEGACY_TABLE}_bound')}")
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+            # Constraints and plain indexes to recreate on the partitioned
+            # table; they are read before the rename, so the definitions
+            # name the new table
+            cursor.execute(
+                """
+                SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint
+                WHERE conrelid = %s::regclass AND contype IN ('u', 'f')
+                """,
+                [TABLE],
+            )
+            constraints = cursor.fetchall()
+            cursor.execute(
+                """
+                SELECT index.relname, pg_get_indexdef(index.oid) FROM pg_index
+                JOIN pg_class index ON index.oid = pg_index.indexrelid
+                WHERE pg_index.indrelid = %s::regclass AND NOT pg_index.indisunique
+                """,
+                [TABLE],
+            )
+            indexes = cursor.fetchall()
+
+            # Ids continue from the identity sequence, which goes with the
+            # identity; partitioned tables cannot have identity columns
+            cursor.execute("SELECT nextval(pg_get_serial_sequence(%s, 'id'))", [TABLE])
+            next_id = cursor.fetchone()[0] + 1
+            cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id DROP IDENTITY")
+            cursor.execute(
+                f"ALTER TABLE {table} DROP CONSTRAINT {_quote(f'{TABLE}_pkey')}, "
+                f"ADD CONSTRAINT {_quote(f'{LEGACY_TABLE}_pkey')} PRIMARY KEY "
+                f"USING INDEX {_quote(f'{LEGACY_TABLE}_id_timestamp')}"
+            )
+            cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+            # Index names are unique per schema
+            unique = [name for name, kind, _ in constraints if kind == 'u']
+            for number, name in enumerate(unique):
+                cursor.execute(
+                    f"ALTER TABLE {legacy} RENAME CONSTRAINT {_quote(name)} "
+                    f"TO {_quote(f'{LEGACY_TABLE}_uniq{number}')}"
+                )
+            for number, (name, _) in enumerate(indexes):
+                cursor.execute(f"ALTER INDEX {_quote(name)} RENAME TO {_quote(f'{LEGACY_TABLE}_idx{number}')}")
+
+            cursor.execute(
+                f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING STORAGE) "
+                f"PARTITION BY RANGE (\"timestamp\")"
+            )
+            cursor.execute(f"CREATE SEQUENCE {_quote(sequence)} START WITH {next_id} OWNED BY {table}.id")
+            cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval(%s)", [sequence])
+            cursor.execute(
+                f"ALTER TABLE {table} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO ({_literal(bound)})"
+            )
+            cursor.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {_quote(f'{LEGACY_TABLE}_bound')}")
+
+            # Matching indexes of the legacy partition are attached, not rebuilt
+            cursor.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {_quote(f'{TABLE}_pkey')} PRIMARY KEY (id, \"timestamp\")"
+            )
+            for name, _, definition in constraints:
+                cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {_quote(name)} {definition}")
+            for _, definition in indexes:
+                cursor.execute(definition)
+            cursor.execute(f"CREATE TABLE {_quote(DEFAULT_PARTITION)} PARTITION OF {table} DEFAULT")
+
+        logger.info(f"Partitioned {TABLE}; events before {bound:%Y-%m} stay in {LEGACY_TABLE}")
+
+    @staticmethod
+    def create_partitions(months_ahead: int, today: Optional[date] = None) -> List[str]:
+        """
+        Create the partitions of this month and the next `months_ahead` months
+
+        Months covered by an existing partition are skipped. Events of a new
+        month that already landed in the default partition are moved into
+        the new partition before it is attached.
+
+        Returns:
+            Names of the created partitions
+        """
+        today = today or timezone.now().date()
+        existing = TrackingPartitions.partitions()
+        created = []
+        for months in range(months_ahead + 1):
+            start, end = month_start(today, months), month_start(today, months + 1)
+            if any(
+                (part.start is None or part.start < end) and (part.end is None or start < part.end)
+                for part in existing
+            ):
+                continue
+            name = partition_name(start)
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f"CREATE TABLE {_quote(name)} (LIKE {_quote(TABLE)} INCLUDING DEFAULTS)")
+                cursor.execute(
+                    f"WITH moved AS (DELETE FROM {_quote(DEFAULT_PARTITION)} "
+                    f"WHERE \"timestamp\" >= %s AND \"timestamp\" < %s RETURNING *) "
+                    f"INSERT INTO {_quote(name)} SELECT * FROM moved",
+                    [start, end],
+                )
+                cursor.execute(
+                    f"ALTER TABLE {_quote(TABLE)} ATTACH PARTITION {_quote(name)} "
+                    f"FOR VALUES FROM ({_literal(start)}) TO ({_literal(end)})"
+                )
+            created.append(name)
+            logger.info(f"Created tracking partition {name}")
+        return created
+
+    @staticmethod
+    def expire_partitions(
+        retention_months: int,
+        drop: bool = False,
+        archive_schema: Optional[str] = None,
+        today: Optional[date] = None,
+    ) -> List[str]:
+        """
+        Detach the partitions whose events are all older than the retention
+
+        Args:
+            retention_months: Whole months of events kept besides the current one
+            drop: Drop detached partitions instead of keeping them as tables
+            archive_schema: Schema detached partitions are moved to; they
+                stay in the current schema when None
+            today: Defaults to today
+
+        Returns:
+            Names of the detached partitions
+        """
+        cutoff = month_start(today or timezone.now().date(), -retention_months)
+        expired = [
+            part.name for part in TrackingPartitions.partitions() if part.end is not None and part.end <= cutoff
+        ]
+        for name in expired:
+            with transaction.atomic(), connection.cursor() as cursor:
+                # Detaching takes a short exclusive lock on the parent; fail
+                # rather than queue every tracking write behind it
+                cursor.execute("SET LOCAL lock_timeout = '5s'")
+                cursor.execute(f"ALTER TABLE {_quote(TABLE)} DETACH PARTITION {_quote(name)}")
+                if drop:
+                    cursor.execute(f"DROP TABLE {_quote(name)}")
+                elif archive_schema:
+                    cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {_quote(archive_schema)}")
+                    cursor.execute(f"ALTER TABLE {_quote(name)} SET SCHEMA {_quote(archive_schema)}")
+            logger.info(f"{'Dropped' if drop else 'Detached'} tracking partition {name}")
+        return expired
+
+    @staticmethod
+    def maintain(today: Optional[date] = None) -> Dict[str, List[str]]:
+        """
+        Create upcoming partitions and expire old ones per COURIER_TRACKING_PARTITIONS
+
+        Does nothing while the table is not partitioned.
+
+        Returns:
+            Names of the created and the expired partitions
+        """
+        if not TrackingPartitions.is_partitioned():
+            return {'created': [], 'expired': []}
+        config = TrackingPartitions._settings()
+        created = TrackingPartitions.create_partitions(config.get('months_ahead', 3), today)
+        expired = []
+        if config.get('retention_months') is not None:
+            expired = TrackingPartitions.expire_partitions(
+                config['retention_months'],
+                drop=config.get('expired') == 'drop',
+                archive_schema=config.get('archive_schema'),
+                today=today,
+            )
+        return {'created': created, 'expired': expired}
@@ -0,0 +1,43 @@
+from typing import Iterable
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from zs.apps.courier_integrations.models.shipment import Shipment
+from zs.apps.courier_integrations.models.tracking import ShipmentTracking
+
+
+class TrackingSnapshot:
+    """
+    Newest tracking event of each shipment, denormalized onto Shipment.
+
+    Writers that append tracking events call `refresh` in the same
+    transaction. It recomputes the snapshot from the stored events, so
+    events skipped as duplicates are not counted twice. The newest event
+    is read backwards from the shipment_tracking_event_uniq index and the
+    count from the same index.
+    """
+
+    @staticmethod
+    def refresh(shipment_ids: Iterable[int]) -> int:
+        """
+        Recompute the snapshot of shipments with one UPDATE
+
+        Args:
+            shipment_ids: Shipments whose tracking events were written
+
+        Returns:
+            Number of shipments updated
+        """
+        shipment_ids = list(shipment_ids)
+        if not shipment_ids:
+            return 0
+        events = ShipmentTracking.objects.filter(shipment=OuterRef('pk'))
+        latest = events.order_by('-timestamp', '-courier_status')[:1]
+        event_count = events.order_by().values('shipment').annotate(count=Count('*')).values('count')
+        return Shipment.objects.filter(id__in=shipment_ids).update(
+            last_event_at=Subquery(latest.values('timestamp')),
+            last_location=Coalesce(Subquery(latest.values('location')), Value('')),
+            last_courier_status=Coalesce(Subquery(latest.values('courier_status')), Value('')),
+            event_count=Coalesce(Subquery(event_count, output_field=IntegerField()), Value(0)),
+        )
@@ -0,0 +1,204 @@
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
+from zs.apps.courier_integrations.factories.courier_factory import CourierFactory
+from zs.apps.courier_integrations.models.courier import Courier
+from zs.apps.courier_integrations.models.shipment import Shipment
+from zs.apps.courier_integrations.models.tracking import ShipmentTracking
+from zs.apps.courier_integrations.models.webhook import TrackingWebhookEvent
+from zs.apps.courier_integrations.services.poll_schedule import PollSchedule
+from zs.apps.courier_integrations.services.status_transitions import ShipmentTransitions
+from zs.apps.courier_integrations.services.tracking_history import EventKey, TrackingHistory
+from zs.apps.courier_integrations.services.tracking_snapshot import TrackingSnapshot
+from zs.apps.courier_integrations.services.tracking_cache import TrackingCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class TrackingWebhooks:
+    """
+    Applies tracking events pushed by couriers.
+
+    The webhook view only verifies and buffers payloads as
+    TrackingWebhookEvent rows. Buffered events are applied here in
+    batches: statuses are mapped with the courier adapter and shipments
+    and their tracking history are written with bulk queries. Shipments
+    updated this way are only polled again after the long
+    `webhook_interval` of COURIER_POLL_SCHEDULE.
+    """
+
+    @staticmethod
+    def apply_pending(batch_size: int = 500) -> int:
+        """
+        Apply the oldest buffered webhook events
+
+        Events are claimed with SKIP LOCKED, so several workers can drain
+        the buffer at once. Applied events are deleted; events that cannot
+        be parsed or applied are kept with their error, so one malformed
+        event never holds back the rest of the buffer.
+
+        Args:
+            batch_size: Maximum number of events to apply
+
+        Returns:
+            Number of events taken from the buffer
+        """
+        with transaction.atomic():
+            events = list(
+                TrackingWebhookEvent.objects.select_for_update(skip_locked=True, of=('self',))
+                .select_related('courier')
+                .filter(processed_at__isnull=True)
+                .order_by('id')[:batch_size]
+            )
+            if not events:
+                return 0
+
+            now = timezone.now()
+            parsed: Dict[Courier, List[Tuple[TrackingWebhookEvent, List[Dict[str, Any]]]]] = {}
+            failed = []
+            for event in events:
+                try:
+                    courier_adapter = CourierFactory.get_courier(event.courier.code)
+                    tracking_events = courier_adapter.parse_webhook(event.payload)
+                    for tracking_event in tracking_events:
+                        tracking_event["status"] = courier_adapter.map_status(tracking_event["courier_status"])
+                except Exception as err:
+                    TrackingWebhooks._mark_failed(event, err, now)
+                    failed.append(event)
+                    continue
+                parsed.setdefault(event.courier, []).append((event, tracking_events))
+
+            for courier, courier_events in parsed.items():
+                failed.extend(TrackingWebhooks._apply_isolated(courier, courier_events, now))
+
+            TrackingWebhookEvent.objects.bulk_update(failed, ['processed_at', 'error'])
+            failed_ids = {event.id for event in failed}
+            TrackingWebhookEvent.objects.filter(
+                id__in=[event.id for event in events if event.id not in failed_ids]
+            ).delete()
+
+        logger.info(f"Applied {len(events) - len(failed)} webhook events")
+        return len(events)
+
+    @staticmethod
+    def _apply_isolated(
+        courier: Courier,
+        courier_events: List[Tuple[TrackingWebhookEvent, List[Dict[str, Any]]]],
+        now: datetime,
+    ) -> List[TrackingWebhookEvent]:
+        """
+        Apply the parsed events of one courier, returning the events that failed
+
+        The events are applied together in a savepoint. When that fails
+        they are applied again one at a time, each in a savepoint of its
+        own, so only the events that fail by themselves are marked failed.
+        """
+        try:
+            with transaction.atomic():
+                TrackingWebhooks._apply_courier_events(courier, TrackingWebhooks._by_waybill(courier_events), now)
+            return []
+        except Exception as err:
+            logger.warning(f"Applying {len(courier_events)} {courier.code} webhook events failed, "
+                           f"applying them one at a time: {err!r}")
+
+        failed = []
+        for event, tracking_events in courier_events:
+            try:
+                with transaction.atomic():
+                    TrackingWebhooks._apply_courier_events(
+                        courier, TrackingWebhooks._by_waybill([(event, tracking_events)]), now
+                    )
+            except Exception as err:
+                TrackingWebhooks._mark_failed(event, err, now)
+                failed.append(event)
+        return failed
+
+    @staticmethod
+    def _by_waybill(
+        courier_events: List[Tuple[TrackingWebhookEvent, List[Dict[str, Any]]]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        by_waybill: Dict[str, List[Dict[str, Any]]] = {}
+        for _, tracking_events in courier_events:
+            for tracking_event in tracking_events:
+                by_waybill.setdefault(tracking_event["waybill_id"], []).append(tracking_event)
+        return by_waybill
+
+    @staticmethod
+    def _mark_failed(event: TrackingWebhookEvent, err: Exception, now: datetime):
+        if isinstance(err, (CourierAPIError, ValueError)):
+            logger.warning(f"Cannot apply webhook event {event.id}: {err}")
+        else:
+            logger.exception(f"Cannot apply webhook event {event.id}")
+        event.processed_at = now
+        event.error = str(err) or repr(err)
+
+    @staticmethod
+    def _apply_courier_events(courier: Courier, by_waybill: Dict[str, List[Dict[str, Any]]], now: datetime):
+        """Update the shipments of one courier from their events, keyed by waybill"""
+        shipments = list(
+            Shipment.objects.filter(courier=courier, waybill_id__in=list(by_waybill))
+            .only('id', 'waybill_id', 'status', 'version')
+        )
+        dated: List[ShipmentTracking] = []
+        undated: List[ShipmentTracking] = []
+        changes = []
+        for shipment in shipments:
+            events = []
+            for event in by_waybill[shipment.waybill_id]:
+                timestamp = TrackingWebhooks._parse_timestamp(event["timestamp"])
+                record = ShipmentTracking(
+                    shipment=shipment,
+                    courier_status=event["courier_status"][:100],
+                    status=event["status"],
+                    location=event["location"][:255],
+                    # Stored as received now; skipped below when pushed before
+                    timestamp=timestamp or now,
+                    description=event["description"],
+                    raw_data=event,
+                )
+                if timestamp is None:
+                    undated.append(record)
+                else:
+                    dated.append(record)
+                events.append(record)
+            events.sort(key=lambda record: record.timestamp)
+            changes.append((shipment, events[-1].status))
+        stored = TrackingHistory.stored(TrackingWebhooks._event_key(record) for record in undated)
+        tracking = dated + [record for record in undated if TrackingWebhooks._event_key(record) not in stored]
+
+        # One conditional UPDATE per new status; stale events do not move
+        # shipments back (see ShipmentTransitions)
+        ShipmentTransitions.transition_many(
+            changes,
+            lambda status: {'last_tracking_update': now, 'next_poll_at': PollSchedule.after_webhook(status, now)},
+            now,
+        )
+        # Couriers may push an event more than once
+        ShipmentTracking.objects.bulk_create(tracking, batch_size=500, ignore_conflicts=True)
+        TrackingSnapshot.refresh(shipment.id for shipment in shipments)
+        TrackingCache.invalidate_many(courier.code, [shipment.waybill_id for shipment in shipments])
+
+        unknown = len(by_waybill) - len(shipments)
+        if unknown:
+            logger.info(f"Ignored webhook events for {unknown} unknown {courier.code} waybills")
+
+    @staticmethod
+    def _event_key(record: ShipmentTracking) -> EventKey:
+        return (record.shipment_id, record.courier_status, record.location, record.description)
+
+    @staticmethod
+    def _parse_timestamp(value: str) -> Optional[datetime]:
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is not None and timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
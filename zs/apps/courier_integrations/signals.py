@@ -0,0 +1,34 @@
+from functools import partial
+
+from celery.signals import task_postrun, task_prerun
+from django.core.signals import request_finished, request_started
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from zs.apps.courier_integrations.factories.courier_factory import CourierFactory
+from zs.apps.courier_integrations.models.courier import Courier
+from zs.apps.courier_integrations.models.status_rule import StatusRule
+
+
+@receiver([post_save, post_delete], sender=Courier)
+def courier_changed(sender, instance, **kwargs):
+    # Workers must not rebuild the adapter before the change is visible to them
+    transaction.on_commit(partial(CourierFactory.bump_version, instance.code))
+
+
+@receiver([post_save, post_delete], sender=StatusRule)
+def status_rule_changed(sender, instance, **kwargs):
+    # Adapters compile their status rules when rebuilt
+    courier = Courier.objects.filter(id=instance.courier_id).values_list('code', flat=True).first()
+    codes = [courier] if instance.courier_id else list(settings.COURIER_MAPPING)
+    for code in codes:
+        if code:
+            transaction.on_commit(partial(CourierFactory.bump_version, code))
+
+
+request_started.connect(CourierFactory.begin, dispatch_uid="courier_factory_begin")
+request_finished.connect(CourierFactory.end, dispatch_uid="courier_factory_end")
+task_prerun.connect(CourierFactory.begin, dispatch_uid="courier_factory_begin", weak=False)
+task_postrun.connect(CourierFactory.end, dispatch_uid="courier_factory_end", weak=False)
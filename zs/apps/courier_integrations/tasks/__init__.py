@@ -0,0 +1,2 @@
+# email_tasks is not imported here: it needs the optional appmail package
+from .shipment_tasks import *  # noqa: F401,F403
@@ -1,19 +1,27 @@
 from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta
 import logging
+import time
+from typing import Dict, List, Tuple
 
 from zs.apps.courier_integrations.models.shipment import Shipment
 from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
 from zs.apps.courier_integrations.services.shipment_service import ShipmentService
-from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
+from zs.apps.courier_integrations.services.tracking_partitions import TrackingPartitions
+from zs.apps.courier_integrations.services.tracking_webhooks import TrackingWebhooks
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError, CourierRateLimitError
 
 logger = logging.getLogger(__name__)
 
-@shared_task
-def update_shipment_status(shipment_id):
+@shared_task(bind=True, max_retries=5)
+def update_shipment_status(self, shipment_id):
     """
     Update tracking status for a single shipment
+
+    Calls refused by the courier rate limiter are re-queued instead of
+    waiting in the worker.
     
     Args:
         shipment_id: ID of the shipment to update
@@ -33,43 +41,125 @@ def update_shipment_status(shipment_id):
             return
         
         # Update tracking status
-        tracking_data = ShipmentService.update_tracking_status(shipment)
+        tracking_data = ShipmentService.update_tracking_status(shipment, scheduled=True)
         logger.info(f"Updated tracking for shipment {shipment.reference_number}, status: {shipment.status}")
         return tracking_data
         
     except Shipment.DoesNotExist:
         logger.error(f"Shipment with ID {shipment_id} not found")
+    except CourierRateLimitError as e:
+        logger.info(f"Rate limited updating shipment {shipment_id}, retrying in {e.retry_after:.1f}s")
+        if self.request.called_directly:
+            # Run inside a chunk, where retry() would fail the rest of the chunk
+            update_shipment_status.apply_async((shipment_id,), countdown=e.retry_after)
+            return
+        raise self.retry(exc=e, countdown=e.retry_after)
     except CourierAPIError as e:
         logger.error(f"Error updating shipment {shipment_id}: {str(e)}")
 
 
 @shared_task
-def update_all_active_shipments():
+def update_all_active_shipments(after=None, cutoff=None):
     """
     Update tracking for all active shipments
     
-    This task should be scheduled to run periodically
-    """
-    # Get shipments that need tracking updates
-    # Criteria:
-    # 1. Not in terminal status
-    # 2. Either never updated or not updated in last 6 hours
+    This task should be scheduled to run periodically, e.g. every few
+    minutes; each shipment is picked up once its next_poll_at (see
+    PollSchedule) has passed. Due shipments are claimed in pages of IDs in
+    (next_poll_at, id) order, a range scan of shipment_poll_due_idx, which
+    moves their next_poll_at to the end of a short lease so no other run
+    queues them again, and each page is queued as chunks of
+    update_shipment_status grouped by courier. The task then re-queues itself for the next page, delayed to
+    keep dispatch at COURIER_TRACKING_DISPATCH["rate"] shipments per
+    second, so memory and task run time stay bounded however many
+    shipments are active.
     
-    terminal_statuses = [
-        ShipmentStatus.DELIVERED.value,
-        ShipmentStatus.RETURNED.value,
-        ShipmentStatus.CANCELLED.value
-    ]
+    Args:
+        after: [next_poll_at ISO timestamp, id] of the last shipment
+            dispatched by the previous page
+        cutoff: ISO timestamp fixed by the first page; shipments that
+            became due after it are left for the next run
+    """
+    config = getattr(settings, 'COURIER_TRACKING_DISPATCH', {})
+    page_size = int(config.get('page_size', 1000))
+    chunk_size = int(config.get('chunk_size', 50))
+    rate = float(config.get('rate', 0))
+    lease = float(config.get('lease', 15 * 60))
     
-    update_cutoff = timezone.now() - timedelta(hours=6)
+    if cutoff is None:
+        cutoff = timezone.now().isoformat()
+    if after:
+        after = (datetime.fromisoformat(after[0]), after[1])
     
-    shipments_to_update = Shipment.objects.exclude(
-        status__in=terminal_statuses
-    ).filter(
-        last_tracking_update__lt=update_cutoff
+    page = ShipmentService.claim_due_for_tracking(
+        datetime.fromisoformat(cutoff), page_size, timezone.now() + timedelta(seconds=lease), after
     )
     
-    logger.info(f"Found {shipments_to_update.count()} shipments to update")
+    by_courier: Dict[int, List[Tuple[int]]] = {}
+    for shipment_id, courier_id, _ in page:
+        by_courier.setdefault(courier_id, []).append((shipment_id,))
+    for courier_id, shipment_args in by_courier.items():
+        update_shipment_status.chunks(shipment_args, chunk_size).apply_async()
+    
+    logger.info(f"Queued tracking updates for {len(page)} shipments")
+    
+    if len(page) == page_size:
+        last_id, _, last_poll_at = page[-1]
+        update_all_active_shipments.apply_async(
+            kwargs={'after': [last_poll_at.isoformat(), last_id], 'cutoff': cutoff},
+            countdown=len(page) / rate if rate > 0 else 0,
+        )
+
+
+@shared_task
+def process_shipment_outbox(entry_id):
+    """
+    Create the waybill of a shipment queued with ShipmentService.queue_shipment
+    
+    Args:
+        entry_id: ID of the ShipmentOutbox entry
+    """
+    entry = ShipmentService.process_outbox_entry(entry_id)
+    if entry is not None:
+        logger.info(f"Processed outbox entry {entry_id}: {entry.status}")
+
+
+@shared_task
+def dispatch_shipment_outbox():
+    """
+    Queue every due outbox entry
+    
+    Picks up entries whose on-commit dispatch was lost and retries after
+    backoff. This task should be scheduled to run every minute.
+    """
+    for entry_id in ShipmentService.due_outbox_entry_ids():
+        process_shipment_outbox.delay(entry_id)
+
+
+@shared_task
+def apply_tracking_webhooks():
+    """
+    Apply buffered courier webhook events
+    
+    Drains the buffer in batches of COURIER_WEBHOOK_BATCH_SIZE until it is
+    empty or the run nears the soft time limit. This task should be
+    scheduled to run every few seconds.
+    """
+    batch_size = settings.COURIER_WEBHOOK_BATCH_SIZE
+    deadline = time.monotonic() + settings.CELERY_TASK_SOFT_TIME_LIMIT * 0.75
+    while time.monotonic() < deadline:
+        if TrackingWebhooks.apply_pending(batch_size) < batch_size:
+            break
+
+
+@shared_task
+def maintain_tracking_partitions():
+    """
+    Create upcoming tracking history partitions and expire old ones
     
-    for shipment in shipments_to_update:
-        update_shipment_status.delay(shipment.id)
\ No newline at end of file
+    Does nothing until the tracking table is partitioned (see
+    COURIER_TRACKING_PARTITIONS). This task should be scheduled to run daily.
+    """
+    result = TrackingPartitions.maintain()
+    if result['created'] or result['expired']:
+        logger.info(f"Tracking partitions created: {result['created']}, expired: {result['expired']}")
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark for ARAMEX response extraction.
+
+Compares the single-pass extractor, which collects every TrackingResult of
+every waybill, with the previous per-field lookups, which only read the first
+one, on large multi-waybill tracking responses:
+
+    DJANGO_SETTINGS_MODULE=config.settings.test python -m zs.apps.courier_integrations.tests.bench_aramex_response
+"""
+import timeit
+import xml.etree.ElementTree as ET
+
+import django
+
+django.setup()
+
+from zs.apps.courier_integrations.adapters.aramex_response import parse_aramex_response  # noqa: E402
+from zs.apps.courier_integrations.tests.mocks import MockCourierResponses  # noqa: E402
+
+NAMESPACES = (
+    'http://schemas.xmlsoap.org/soap/envelope/',
+    'http://ws.aramex.net/ShippingAPI/v1/',
+    'http://ws.aramex.net/ShippingAPI/v2/',
+)
+
+
+def legacy_extract(root, xpath):
+    """Previous ARAMEXCourierAdapter._extract_xml_value lookup"""
+    clean_xpath = xpath.lstrip('/.')
+    for uri in NAMESPACES:
+        elements = root.findall(f'.//{{{uri}}}{clean_xpath}')
+        if elements and elements[0].text:
+            return elements[0].text
+    for elem in root.iter():
+        if '}' in elem.tag:
+            elem.tag = elem.tag.split('}', 1)[1]
+    if '/' in clean_xpath:
+        tag_name = clean_xpath.split('/')[-1]
+        for elem in root.iter():
+            if elem.tag == tag_name and elem.text:
+                return elem.text
+    return None
+
+
+def legacy_parse(content):
+    """Previous tracking parse: one tree lookup per field, first result only"""
+    root = ET.fromstring(content)
+    return {
+        'has_errors': legacy_extract(root, './/HasErrors'),
+        'status': legacy_extract(root, './/TrackingResult/Value'),
+        'location': legacy_extract(root, './/TrackingResult/UpdateLocation'),
+        'timestamp': legacy_extract(root, './/TrackingResult/UpdateDateTime'),
+    }
+
+
+def build_response(waybills, events):
+    return MockCourierResponses.aramex_tracking_response({
+        f'AWB{n}': [
+            (f'Update {i}', 'Dubai', f'2025-04-06T10:{i % 60:02d}:00')
+            for i in range(events)
+        ]
+        for n in range(waybills)
+    })
+
+
+def main():
+    for waybills, events in ((1, 5), (50, 10), (500, 20)):
+        content = build_response(waybills, events)
+        number = max(1, 2000 // (waybills * events))
+        legacy = timeit.timeit(lambda: legacy_parse(content), number=number) / number
+        single = timeit.timeit(lambda: parse_aramex_response(content), number=number) / number
+        print(
+            f'{waybills:>4} waybills x {events:>2} events ({len(content) // 1024:>5} KiB): '
+            f'legacy {legacy * 1000:8.2f} ms  single-pass {single * 1000:8.2f} ms  '
+            f'({legacy / single:.1f}x)'
+        )
+
+
+if __name__ == '__main__':
+    main()
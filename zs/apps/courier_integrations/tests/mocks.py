@@ -65,4 +65,65 @@ class MockCourierResponses:
                 'message': 'Shipment cancelled successfully'
             },
             status=200
-        )
\ No newline at end of file
+        )
+    @staticmethod
+    def aramex_tracking_response(tracking):
+        """
+        Build an ARAMEX TrackShipments SOAP response
+
+        Args:
+            tracking: Dict of waybill number to a list of (description, location, datetime) events
+        """
+        entries = []
+        for waybill_id, events in tracking.items():
+            results = "".join(
+                f"<TrackingResult><WaybillNumber>{waybill_id}</WaybillNumber>"
+                f"<UpdateCode>SH</UpdateCode><UpdateDescription>{description}</UpdateDescription>"
+                f"<UpdateDateTime>{timestamp}</UpdateDateTime><UpdateLocation>{location}</UpdateLocation>"
+                f"<Comments/><ProblemCode/></TrackingResult>"
+                for description, location, timestamp in events
+            )
+            entries.append(
+                f"<a:KeyValueOfstringArrayOfTrackingResultmFAkxlpY><a:Key>{waybill_id}</a:Key>"
+                f"<a:Value>{results}</a:Value></a:KeyValueOfstringArrayOfTrackingResultmFAkxlpY>"
+            )
+        return (
+            '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>'
+            '<ShipmentTrackingResponse xmlns="http://ws.aramex.net/ShippingAPI/v1/">'
+            '<Notifications/><HasErrors>false</HasErrors>'
+            '<TrackingResults xmlns:a="http://schemas.microsoft.com/2003/10/Serialization/Arrays">'
+            f'{"".join(entries)}</TrackingResults>'
+            '</ShipmentTrackingResponse></s:Body></s:Envelope>'
+        ).encode()
+
+    @staticmethod
+    def aramex_create_response(shipments):
+        """
+        Build an ARAMEX CreateShipments SOAP response
+
+        Args:
+            shipments: List with one waybill number per shipment, or an error
+                message for a shipment ARAMEX rejected (prefixed with "!")
+        """
+        processed = []
+        for item in shipments:
+            if item.startswith("!"):
+                processed.append(
+                    "<ProcessedShipment><ID/><HasErrors>true</HasErrors><Notifications><Notification>"
+                    f"<Code>ERR52</Code><Message>{item[1:]}</Message></Notification></Notifications>"
+                    "</ProcessedShipment>"
+                )
+            else:
+                processed.append(
+                    f"<ProcessedShipment><ID>{item}</ID><HasErrors>false</HasErrors><Notifications/>"
+                    f"<ShipmentLabel><LabelURL>https://labels.example.com/{item}.pdf</LabelURL></ShipmentLabel>"
+                    "</ProcessedShipment>"
+                )
+        has_errors = "true" if any(item.startswith("!") for item in shipments) else "false"
+        return (
+            '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>'
+            '<ShipmentCreationResponse xmlns="http://ws.aramex.net/ShippingAPI/v1/">'
+            f'<Notifications/><HasErrors>{has_errors}</HasErrors>'
+            f'<Shipments>{"".join(processed)}</Shipments>'
+            '</ShipmentCreationResponse></s:Body></s:Envelope>'
+        ).encode()
@@ -13,6 +13,8 @@ from .factories import CourierFactory, ShipmentFactory, ShipmentTrackingFactory
 
 class TestCourierAPI(TestCase):
     """Test courier API endpoints"""
+
+    client: APIClient
     
     def setUp(self):
         self.client = APIClient()
@@ -60,8 +62,9 @@ class TestCourierAPI(TestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['reference_number'], self.shipment.reference_number)
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['reference_number'], self.shipment.reference_number)
     
     def test_create_shipment(self):
         """Test creating a shipment via API"""
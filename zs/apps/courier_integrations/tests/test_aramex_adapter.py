@@ -0,0 +1,264 @@
+import responses
+import xml.etree.ElementTree as ET
+from typing import cast
+from django.test import TestCase
+from unittest.mock import patch
+
+from zs.apps.courier_integrations.adapters.aramex import ARAMEXCourierAdapter
+from zs.apps.courier_integrations.adapters.aramex_envelope import ARAMEXEnvelopeBuilder
+from zs.apps.courier_integrations.adapters.aramex_response import parse_aramex_response
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from .mocks import MockCourierResponses
+
+
+TRACKING_ENDPOINT = 'https://api.example.com/ShippingAPI.V2/Tracking/Service_1_0.svc'
+
+
+class TestAramexBatchTracking(TestCase):
+    """Test ARAMEX multi-waybill tracking"""
+
+    def setUp(self):
+        self.settings_patcher = patch('django.conf.settings.COURIER_CONFIG', {
+            'ARAMEX': {
+                'api_url': 'https://api.example.com',
+                'tracking_url': 'https://tracking.example.com',
+                'tracking_batch_size': 2,
+            },
+        })
+        self.settings_patcher.start()
+        self.adapter = ARAMEXCourierAdapter()
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+
+    def test_batch_capability(self):
+        self.assertTrue(self.adapter.supports_batch_tracking)
+        self.assertEqual(self.adapter.get_tracking_batch_size(), 2)
+
+    @responses.activate
+    def test_track_shipments_splits_results_by_waybill(self):
+        """Results are split back out per waybill and sent in batches"""
+        responses.add(responses.POST, TRACKING_ENDPOINT, body=MockCourierResponses.aramex_tracking_response({
+            'AWB1': [
+                ('Shipment Created', 'Amman', '2025-04-05T09:00:00'),
+                ('Delivered', 'Dubai', '2025-04-06T10:30:00'),
+            ],
+            'AWB2': [('Out for Delivery', 'Riyadh', '2025-04-06T08:00:00')],
+        }))
+        responses.add(responses.POST, TRACKING_ENDPOINT, body=MockCourierResponses.aramex_tracking_response({
+            'AWB3': [('In Transit', 'Cairo', '2025-04-06T07:00:00')],
+        }))
+
+        results = self.adapter.track_shipments(['AWB1', 'AWB2', 'AWB3'])
+
+        self.assertEqual(len(responses.calls), 2)
+        first_body = cast(bytes, responses.calls[0].request.body)
+        self.assertIn(b'<v1:string>AWB1</v1:string>', first_body)
+        self.assertIn(b'<v1:string>AWB2</v1:string>', first_body)
+        self.assertNotIn(b'AWB3', first_body)
+
+        self.assertEqual(set(results), {'AWB1', 'AWB2', 'AWB3'})
+        self.assertEqual(results['AWB1']['current_status'], ShipmentStatus.DELIVERED.value)
+        self.assertEqual(results['AWB1']['current_location'], 'Dubai')
+        self.assertEqual(len(results['AWB1']['history']), 2)
+        self.assertEqual(results['AWB2']['current_status'], ShipmentStatus.OUT_FOR_DELIVERY.value)
+        self.assertEqual(results['AWB3']['current_status'], ShipmentStatus.IN_TRANSIT.value)
+
+    @responses.activate
+    def test_track_shipment_unknown_waybill(self):
+        """A waybill missing from the response is reported as unknown"""
+        responses.add(responses.POST, TRACKING_ENDPOINT, body=MockCourierResponses.aramex_tracking_response({}))
+
+        result = self.adapter.track_shipment('AWB404')
+
+        self.assertEqual(result['waybill_id'], 'AWB404')
+        self.assertEqual(result['current_status'], ShipmentStatus.UNKNOWN.value)
+        self.assertEqual(result['history'], [])
+
+
+SHIPPING_ENDPOINT = 'https://api.example.com/ShippingAPI.V2/Shipping/Service_1_0.svc'
+
+
+class TestAramexBatchCreation(TestCase):
+    """Test ARAMEX multi-shipment CreateShipments"""
+
+    def setUp(self):
+        self.settings_patcher = patch('django.conf.settings.COURIER_CONFIG', {
+            'ARAMEX': {
+                'api_url': 'https://api.example.com',
+                'tracking_url': 'https://tracking.example.com',
+                'creation_batch_size': 2,
+            },
+        })
+        self.settings_patcher.start()
+        self.adapter = ARAMEXCourierAdapter()
+        self.shipments = [
+            {'reference_number': f'REF{n}', 'shipping_date': '2025-04-06'} for n in range(3)
+        ]
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+
+    @responses.activate
+    def test_create_waybills_in_batches(self):
+        responses.add(responses.POST, SHIPPING_ENDPOINT, body=MockCourierResponses.aramex_create_response(['AWB0', 'AWB1']))
+        responses.add(responses.POST, SHIPPING_ENDPOINT, body=MockCourierResponses.aramex_create_response(['AWB2']))
+
+        results = self.adapter.create_waybills(self.shipments)
+
+        self.assertEqual(len(responses.calls), 2)
+        first = ET.fromstring(cast(bytes, responses.calls[0].request.body))
+        self.assertEqual(len([elem for elem in first.iter() if elem.tag.endswith('}Shipment')]), 2)
+        self.assertEqual([result['waybill_id'] for result in results], ['AWB0', 'AWB1', 'AWB2'])
+        self.assertEqual(results[2]['label_url'], 'https://labels.example.com/AWB2.pdf')
+
+    @responses.activate
+    def test_rejected_shipment_reported_per_item(self):
+        """The top level HasErrors does not fail the other shipments of the batch"""
+        responses.add(responses.POST, SHIPPING_ENDPOINT, body=MockCourierResponses.aramex_create_response(
+            ['AWB0', '!Invalid phone number']
+        ))
+
+        results = self.adapter.create_waybills(self.shipments[:2])
+
+        self.assertEqual(results[0]['waybill_id'], 'AWB0')
+        self.assertEqual(results[1], {'error': 'ERR52: Invalid phone number'})
+
+    @responses.activate
+    def test_request_level_error_raises(self):
+        responses.add(responses.POST, SHIPPING_ENDPOINT, body=ERROR_RESPONSE)
+
+        with self.assertRaisesMessage(CourierAPIError, 'ERR01: Invalid account'):
+            self.adapter.create_waybills(self.shipments[:2])
+
+
+class TestAramexEnvelopeBuilder(TestCase):
+    """Test ARAMEX SOAP envelope rendering"""
+
+    def setUp(self):
+        self.builder = ARAMEXEnvelopeBuilder({
+            'username': 'api<user>',
+            'password': 'p&ss',
+            'account_number': '20016',
+            'shipper_name': 'Shipper & Sons',
+        })
+        self.shipment_data = {
+            'reference_number': 'REF1',
+            'shipping_date': '2025-04-06',
+            'customer_name': 'Tom & Jerry <Ltd>',
+            'destination_country': 'AE',
+            'destination_city': 'Dubai',
+            'address_line1': '1 Main St',
+            'phone_number': '+971500000000',
+            'weight': 2.5,
+        }
+
+    def test_create_shipments_escapes_values(self):
+        """Dynamic and credential values are escaped and the body is valid XML"""
+        body = self.builder.create_shipments([self.shipment_data])
+
+        self.assertIsInstance(body, bytes)
+        root = ET.fromstring(body)
+        texts = {elem.tag.rsplit('}', 1)[-1]: elem.text for elem in root.iter()}
+        self.assertEqual(texts['UserName'], 'api<user>')
+        self.assertEqual(texts['Password'], 'p&ss')
+        self.assertEqual(texts['PersonName'], 'Tom & Jerry <Ltd>')
+        self.assertEqual(texts['ShippingDateTime'], '2025-04-06T00:00:00')
+        self.assertEqual(texts['Version'], 'v1.0')
+        self.assertIn(b'Tom &amp; Jerry &lt;Ltd&gt;', body)
+
+    def test_create_shipments_renders_one_shipment_per_item(self):
+        second = dict(self.shipment_data, reference_number='REF2')
+        root = ET.fromstring(self.builder.create_shipments([self.shipment_data, second]))
+
+        shipments = [elem for elem in root.iter() if elem.tag.endswith('}Shipment')]
+        self.assertEqual(len(shipments), 2)
+
+    def test_missing_values_render_empty(self):
+        root = ET.fromstring(self.builder.create_shipments([self.shipment_data]))
+        emails = [elem.text for elem in root.iter() if elem.tag.endswith('}EmailAddress')]
+        self.assertEqual(emails, [None, None])
+
+    def test_waybill_lists(self):
+        body = self.builder.track_shipments(['A&1', 'B2'])
+        self.assertIn(b'<v1:string>A&amp;1</v1:string><v1:string>B2</v1:string>', body)
+        ET.fromstring(body)
+        ET.fromstring(self.builder.cancel_shipments(['A1']))
+        ET.fromstring(self.builder.print_label('A1'))
+
+
+CREATE_RESPONSE = b"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>
+<ShipmentCreationResponse xmlns="http://ws.aramex.net/ShippingAPI/v1/">
+  <Notifications/>
+  <HasErrors>false</HasErrors>
+  <Shipments>
+    <ProcessedShipment>
+      <ID>42874663101</ID>
+      <Reference1>REF1</Reference1>
+      <HasErrors>false</HasErrors>
+      <Notifications/>
+      <ShipmentLabel><LabelURL>https://labels.example.com/42874663101.pdf</LabelURL></ShipmentLabel>
+    </ProcessedShipment>
+  </Shipments>
+</ShipmentCreationResponse></s:Body></s:Envelope>"""
+
+ERROR_RESPONSE = b"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>
+<ShipmentCreationResponse xmlns="http://ws.aramex.net/ShippingAPI/v1/">
+  <Notifications>
+    <Notification><Code>ERR01</Code><Message>Invalid account</Message></Notification>
+  </Notifications>
+  <HasErrors>true</HasErrors>
+</ShipmentCreationResponse></s:Body></s:Envelope>"""
+
+
+class TestAramexResponseParser(TestCase):
+    """Test single-pass ARAMEX response extraction"""
+
+    def test_processed_shipment(self):
+        parsed = parse_aramex_response(CREATE_RESPONSE)
+
+        self.assertFalse(parsed.has_errors)
+        self.assertEqual(parsed.processed_shipments, [{
+            'id': '42874663101',
+            'label_url': 'https://labels.example.com/42874663101.pdf',
+            'has_errors': False,
+            'notifications': [],
+        }])
+        self.assertIsNone(parsed.label_url)
+
+    def test_errors_and_notifications(self):
+        parsed = parse_aramex_response(ERROR_RESPONSE)
+
+        self.assertTrue(parsed.has_errors)
+        self.assertEqual(parsed.error_message, 'ERR01: Invalid account')
+        self.assertEqual(parsed.message, 'Invalid account')
+
+    def test_tracking_results(self):
+        parsed = parse_aramex_response(MockCourierResponses.aramex_tracking_response({
+            'AWB1': [('Delivered', 'Dubai', '2025-04-06T10:30:00')],
+            'AWB2': [],
+        }))
+
+        self.assertEqual(parsed.tracking_results['AWB1'][0]['UpdateLocation'], 'Dubai')
+        self.assertEqual(parsed.tracking_results['AWB2'], [])
+
+    def test_invalid_xml_raises_courier_api_error(self):
+        with self.assertRaises(CourierAPIError):
+            parse_aramex_response(b'<html>Service Unavailable')
+
+    @responses.activate
+    def test_create_waybill_api_error(self):
+        """Adapter raises CourierAPIError with the notification text"""
+        responses.add(
+            responses.POST,
+            'https://api.example.com/ShippingAPI.V2/Shipping/Service_1_0.svc',
+            body=ERROR_RESPONSE,
+        )
+        with patch('django.conf.settings.COURIER_CONFIG', {
+            'ARAMEX': {'api_url': 'https://api.example.com', 'tracking_url': 'https://tracking.example.com'},
+        }):
+            adapter = ARAMEXCourierAdapter()
+
+        with self.assertRaisesMessage(CourierAPIError, 'ERR01: Invalid account'):
+            adapter.create_waybill({'reference_number': 'REF1', 'shipping_date': '2025-04-06'})
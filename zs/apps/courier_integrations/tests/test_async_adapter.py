@@ -0,0 +1,176 @@
+import json
+import httpx
+import responses
+from django.test import TestCase
+from unittest.mock import patch
+
+from zs.apps.courier_integrations.adapters.aramex import ARAMEXCourierAdapter
+from zs.apps.courier_integrations.adapters.base import BaseCourierAdapter
+from zs.apps.courier_integrations.adapters.smsa import SMSACourierAdapter
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
+from zs.apps.courier_integrations.factories.courier_factory import CourierFactory
+
+
+ARAMEX_TRACK_RESPONSE = b"""<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <ShipmentTrackingResponse xmlns="http://ws.aramex.net/ShippingAPI/v1/">
+      <HasErrors>false</HasErrors>
+      <TrackingResults>
+        <KeyValueOfstringArrayOfTrackingResult>
+          <Key>AWB1</Key>
+          <Value>
+            <TrackingResult>
+              <WaybillNumber>AWB1</WaybillNumber>
+              <UpdateDescription>Delivered</UpdateDescription>
+              <UpdateLocation>Dubai</UpdateLocation>
+              <UpdateDateTime>2025-04-06T10:30:00</UpdateDateTime>
+            </TrackingResult>
+          </Value>
+        </KeyValueOfstringArrayOfTrackingResult>
+      </TrackingResults>
+    </ShipmentTrackingResponse>
+  </s:Body>
+</s:Envelope>"""
+
+
+def mock_client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestAsyncCourierAdapters(TestCase):
+    """Test async adapter variants on the pooled httpx client"""
+
+    def setUp(self):
+        self.settings_patcher = patch('django.conf.settings.COURIER_CONFIG', {
+            'ARAMEX': {
+                'api_url': 'https://api.example.com',
+                'tracking_url': 'https://tracking.example.com',
+                'username': 'user',
+                'password': 'secret',
+            },
+            'SMSA': {
+                'api_url': 'https://smsa.example.com',
+                'tracking_url': 'https://tracking.example.com',
+                'pass_key': 'test_api_key',
+            },
+        })
+        self.settings_patcher.start()
+        self.requests = []
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+
+    async def test_aramex_atrack_shipment(self):
+        """ARAMEX tracking goes through the async client and parses the response"""
+        def handler(request):
+            self.requests.append(request)
+            return httpx.Response(200, content=ARAMEX_TRACK_RESPONSE)
+
+        adapter = ARAMEXCourierAdapter()
+        with patch.object(adapter, '_create_async_client', return_value=mock_client(handler)):
+            result = await adapter.atrack_shipment('AWB1')
+
+        self.assertEqual(result['waybill_id'], 'AWB1')
+        self.assertEqual(result['current_location'], 'Dubai')
+        self.assertEqual(len(self.requests), 1)
+        request = self.requests[0]
+        self.assertEqual(
+            request.headers['SOAPAction'],
+            'http://ws.aramex.net/ShippingAPI/v1/Service_1_0/TrackShipments',
+        )
+        self.assertIn(b'<v1:string>AWB1</v1:string>', request.content)
+
+    async def test_smsa_acreate_waybill(self):
+        """SMSA waybill creation sends the same payload as the sync path"""
+        def handler(request):
+            self.requests.append(request)
+            return httpx.Response(200, json={'sawb': 'SMSA123'})
+
+        adapter = SMSACourierAdapter()
+        shipment_data = {
+            'reference_number': 'REF1',
+            'shipping_date': '2025-04-06',
+            'customer_id': 'CUST1',
+            'customer_name': 'Test Customer',
+            'destination_country': 'SA',
+            'destination_city': 'Riyadh',
+            'postal_code': '12345',
+            'phone_number': '+966500000000',
+            'address_line1': 'Street 1',
+            'package_count': 1,
+            'weight': 1.5,
+        }
+        with patch.object(adapter, '_create_async_client', return_value=mock_client(handler)):
+            result = await adapter.acreate_waybill(shipment_data)
+
+        self.assertEqual(result['waybill_id'], 'SMSA123')
+        self.assertEqual(json.loads(self.requests[0].content)['refNo'], 'REF1')
+
+    async def test_smsa_atrack_shipment(self):
+        def handler(request):
+            return httpx.Response(200, json={
+                'status': 'delivered',
+                'location': 'Riyadh',
+                'date': '2025-04-06T10:30:00Z',
+                'history': [{'activity': 'delivered', 'location': 'Riyadh', 'date': '2025-04-06T10:30:00Z'}],
+            })
+
+        adapter = SMSACourierAdapter()
+        with patch.object(adapter, '_create_async_client', return_value=mock_client(handler)):
+            result = await adapter.atrack_shipment('SMSA123')
+
+        self.assertEqual(result['current_location'], 'Riyadh')
+        self.assertEqual(len(result['history']), 1)
+
+    async def test_http_error_raises_courier_api_error(self):
+        adapter = SMSACourierAdapter()
+        client = mock_client(lambda request: httpx.Response(502, text='Bad gateway'))
+        with patch.object(adapter, '_create_async_client', return_value=client):
+            with self.assertRaises(CourierAPIError):
+                await adapter.atrack_shipment('SMSA123')
+
+    @responses.activate
+    def test_sync_http_error_raises_the_same_error(self):
+        """Sync and async paths raise CourierAPIError for the same failure"""
+        responses.add(responses.GET, 'https://smsa.example.com/getTracking', status=502, body='Bad gateway')
+
+        with self.assertRaises(CourierAPIError):
+            SMSACourierAdapter().track_shipment('SMSA123')
+
+    async def test_async_client_is_pooled_per_loop(self):
+        """The async client is created once and reused across calls"""
+        adapter = SMSACourierAdapter()
+        client = mock_client(lambda request: httpx.Response(200, content=b'%PDF'))
+        with patch.object(adapter, '_create_async_client', return_value=client) as create:
+            await adapter.aprint_waybill_label('SMSA123')
+            await adapter.aprint_waybill_label('SMSA123')
+
+        self.assertEqual(create.call_count, 1)
+        await adapter.aclose()
+        self.assertTrue(client.is_closed)
+
+    async def test_factory_aget_courier(self):
+        with patch(
+            'django.conf.settings.COURIER_MAPPING',
+            {'smsa_async': 'zs.apps.courier_integrations.adapters.smsa.SMSACourierAdapter'},
+        ):
+            adapter = await CourierFactory.aget_courier('smsa_async')
+            self.assertIs(adapter, CourierFactory.get_courier('smsa_async'))
+        CourierFactory._instances.pop('smsa_async', None)
+
+    async def test_sync_only_adapter_falls_back_to_thread(self):
+        """Adapters without a native async method run the sync call off-loop"""
+        class SyncOnlyCourierAdapter(BaseCourierAdapter):
+            def create_waybill(self, shipment_data):
+                return {}
+
+            def print_waybill_label(self, waybill_id):
+                return b''
+
+            def track_shipment(self, waybill_id):
+                return {'waybill_id': waybill_id, 'current_status': ShipmentStatus.IN_TRANSIT.value}
+
+        result = await SyncOnlyCourierAdapter().atrack_shipment('X1')
+        self.assertEqual(result['current_status'], ShipmentStatus.IN_TRANSIT.value)
@@ -0,0 +1,128 @@
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from unittest.mock import patch, MagicMock
+
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
+from zs.apps.courier_integrations.models.shipment import Shipment
+from zs.apps.courier_integrations.services.shipment_service import ShipmentService
+from .factories import CourierFactory, ShipmentFactory
+
+
+def shipment_item(reference_number, courier_code='aramex'):
+    return {
+        'courier_code': courier_code,
+        'reference_number': reference_number,
+        'customer_name': 'Test Customer',
+        'shipping_date': '2025-04-06',
+        'destination_country': 'UAE',
+        'destination_city': 'Dubai',
+        'address_line1': '123 Test Street',
+        'phone_number': '+9715012345678',
+        'weight': 2.5,
+    }
+
+
+# The view module may first be imported while test_api patches the service
+@patch('zs.apps.courier_integrations.api.v1.views.ShipmentService', ShipmentService)
+class TestBulkShipmentCreation(TestCase):
+    """Test POST /shipments/bulk/"""
+
+    client: APIClient
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('api:shipment-bulk')
+        CourierFactory(code='aramex')
+        self.factory_patcher = patch('zs.apps.courier_integrations.factories.courier_factory.CourierFactory.get_courier')
+        self.mock_adapter = MagicMock()
+        self.mock_adapter.get_creation_batch_size.return_value = 2
+        self.mock_adapter.transport.pool_maxsize = 4
+        self.mock_adapter.create_waybills.side_effect = lambda batch: [
+            {'waybill_id': f"AWB-{data['reference_number']}"} for data in batch
+        ]
+        self.factory_patcher.start().return_value = self.mock_adapter
+
+    def tearDown(self):
+        self.factory_patcher.stop()
+
+    def post_counting_queries(self, items):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, items, format='json')
+        return response, len(queries)
+
+    def test_query_count_does_not_grow_with_items(self):
+        _, few = self.post_counting_queries([shipment_item(f'FEW{n}') for n in range(3)])
+        _, many = self.post_counting_queries([shipment_item(f'MANY{n}') for n in range(40)])
+
+        self.assertEqual(few, many)
+        self.assertEqual(Shipment.objects.exclude(waybill_id='').count(), 43)
+
+    def test_runs_outside_the_request_transaction(self):
+        # Waybills created by the courier must not be undone by a rollback
+        self.assertEqual(getattr(resolve(self.url).func, '_non_atomic_requests', None), {'default'})
+        self.assertFalse(hasattr(resolve(reverse('api:shipment-list')).func, '_non_atomic_requests'))
+
+    def test_creates_shipments_in_batches(self):
+        items = [shipment_item(f'BULK{n}') for n in range(5)]
+
+        response = self.client.post(self.url, items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 5)
+        self.assertEqual(self.mock_adapter.create_waybills.call_count, 3)
+        self.assertEqual(
+            [result['waybill_id'] for result in response.data['results']],
+            [f'AWB-BULK{n}' for n in range(5)],
+        )
+        shipment = Shipment.objects.get(reference_number='BULK3')
+        self.assertEqual(shipment.waybill_id, 'AWB-BULK3')
+        self.assertEqual(shipment.data['shipping_date'], '2025-04-06')
+
+    def test_per_item_failures(self):
+        ShipmentFactory(reference_number='BULK-EXISTS')
+        self.mock_adapter.create_waybills.side_effect = [
+            [{'waybill_id': 'AWB-1'}, {'error': 'ERR52: Invalid phone number'}],
+            CourierAPIError('HTTP error: 502'),
+        ]
+        items = [shipment_item(reference) for reference in ('B1', 'B2', 'BULK-EXISTS', 'B3', 'B1')]
+
+        response = self.client.post(self.url, items, format='json')
+
+        results = response.data['results']
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([result['status'] for result in results], ['created', 'failed', 'failed', 'failed', 'failed'])
+        self.assertEqual(results[1]['error'], 'ERR52: Invalid phone number')
+        self.assertIn('already exists', results[2]['error'])
+        self.assertEqual(results[3]['error'], 'HTTP error: 502')
+        self.assertIn('already exists', results[4]['error'])
+        # Failed shipments are removed so they can be resubmitted
+        self.assertEqual(
+            set(Shipment.objects.filter(reference_number__startswith='B').values_list('reference_number', flat=True)),
+            {'B1', 'BULK-EXISTS'},
+        )
+
+    def test_validation_errors_reject_request(self):
+        items = [shipment_item('B1'), shipment_item('B2', courier_code='unknown')]
+
+        # The view is not atomic, so DRF marks the test transaction for
+        # rollback on errors; a savepoint keeps that to the request
+        with transaction.atomic():
+            response = self.client.post(self.url, items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()['error']['1']['courier_code']['error_string'],
+            "Courier with code 'unknown' does not exist or is inactive",
+        )
+        self.assertFalse(Shipment.objects.exists())
+        self.mock_adapter.create_waybills.assert_not_called()
+
+    def test_item_limit(self):
+        with self.settings(COURIER_BULK_CREATE_MAX_ITEMS=1), transaction.atomic():
+            response = self.client.post(self.url, [shipment_item('B1'), shipment_item('B2')], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,171 @@
+import threading
+import responses
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from unittest.mock import patch
+
+from zs.apps.courier_integrations.adapters import circuit_breaker
+from zs.apps.courier_integrations.adapters.circuit_breaker import CircuitBreaker
+from zs.apps.courier_integrations.adapters.smsa import SMSACourierAdapter
+from zs.apps.courier_integrations.exceptions.courier_exceptions import (
+    CourierAPIError,
+    CourierCircuitOpenError,
+    CourierRateLimitError,
+)
+from .factories import CourierFactory
+
+
+BREAKER_OPTIONS = {'minimum_requests': 4, 'failure_rate_threshold': 0.5, 'open_seconds': 30}
+
+
+class TestCircuitBreaker(TestCase):
+    """Test the cache backed circuit breaker"""
+
+    def setUp(self):
+        cache.clear()
+        self.breaker = CircuitBreaker('test_courier', BREAKER_OPTIONS)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_opens_on_failure_rate(self):
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, circuit_breaker.CLOSED)
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, circuit_breaker.OPEN)
+        with self.assertRaises(CourierCircuitOpenError):
+            self.breaker.before_request()
+
+    def test_state_is_shared_between_instances(self):
+        for _ in range(4):
+            self.breaker.record_failure()
+
+        self.assertEqual(CircuitBreaker('test_courier').state, circuit_breaker.OPEN)
+
+    def test_half_open_allows_single_probe(self):
+        for _ in range(4):
+            self.breaker.record_failure()
+
+        with patch.object(circuit_breaker.time, 'time', return_value=circuit_breaker.time.time() + 31):
+            self.assertEqual(self.breaker.state, circuit_breaker.HALF_OPEN)
+            self.assertTrue(self.breaker.before_request())
+            with self.assertRaises(CourierCircuitOpenError):
+                self.breaker.before_request()
+
+            self.breaker.record_success(probe=True)
+
+        self.assertEqual(self.breaker.state, circuit_breaker.CLOSED)
+        self.assertFalse(self.breaker.before_request())
+
+    def test_failed_probe_reopens(self):
+        for _ in range(4):
+            self.breaker.record_failure()
+
+        with patch.object(circuit_breaker.time, 'time', return_value=circuit_breaker.time.time() + 31):
+            self.assertTrue(self.breaker.before_request())
+            self.breaker.record_failure(probe=True)
+            self.assertEqual(self.breaker.state, circuit_breaker.OPEN)
+
+
+class TestAdapterCircuitBreaker(TestCase):
+    """Test adapters fail fast once the courier circuit opens"""
+
+    def setUp(self):
+        cache.clear()
+        self.settings_patcher = patch('django.conf.settings.COURIER_CONFIG', {
+            'SMSA': {
+                'api_url': 'https://smsa.example.com',
+                'tracking_url': 'https://tracking.example.com',
+                'pass_key': 'test_api_key',
+                'transport': {'retries': 0},
+                'circuit_breaker': BREAKER_OPTIONS,
+            },
+        })
+        self.settings_patcher.start()
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+        cache.clear()
+
+    @responses.activate
+    def test_server_errors_open_circuit(self):
+        responses.add(responses.GET, 'https://smsa.example.com/getTracking', status=503)
+        adapter = SMSACourierAdapter('smsa')
+
+        for _ in range(4):
+            with self.assertRaises(CourierAPIError):
+                adapter.track_shipment('SMSA123')
+
+        with self.assertRaises(CourierCircuitOpenError):
+            adapter.track_shipment('SMSA123')
+        self.assertEqual(len(responses.calls), 4)
+
+    @responses.activate
+    def test_client_errors_do_not_count(self):
+        responses.add(responses.GET, 'https://smsa.example.com/getTracking', status=404)
+        adapter = SMSACourierAdapter('smsa')
+
+        for _ in range(5):
+            with self.assertRaises(CourierAPIError):
+                adapter.track_shipment('SMSA123')
+
+        self.assertEqual(adapter.circuit_breaker.state, circuit_breaker.CLOSED)
+
+    def open_circuit(self):
+        for _ in range(4):
+            CircuitBreaker('smsa', BREAKER_OPTIONS).record_failure()
+
+    def test_rate_limited_probe_is_released(self):
+        self.open_circuit()
+        adapter = SMSACourierAdapter('smsa')
+
+        with patch.object(circuit_breaker.time, 'time', return_value=circuit_breaker.time.time() + 31), \
+                patch.object(adapter.rate_limiter, 'acquire', side_effect=CourierRateLimitError('busy')):
+            with self.assertRaises(CourierRateLimitError):
+                adapter.track_shipment('SMSA123')
+            # The next request may still probe the courier
+            self.assertTrue(adapter.circuit_breaker.before_request())
+
+    async def test_async_rate_limited_probe_is_released(self):
+        await sync_to_async(self.open_circuit)()
+        adapter = await sync_to_async(SMSACourierAdapter)('smsa')
+
+        with patch.object(circuit_breaker.time, 'time', return_value=circuit_breaker.time.time() + 31), \
+                patch.object(adapter.rate_limiter, 'aacquire', side_effect=CourierRateLimitError('busy')):
+            with self.assertRaises(CourierRateLimitError):
+                await adapter.atrack_shipment('SMSA123')
+            self.assertTrue(await sync_to_async(adapter.circuit_breaker.before_request)())
+
+    async def test_async_requests_check_the_circuit_off_the_loop(self):
+        adapter = await sync_to_async(SMSACourierAdapter)('smsa')
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def before_request():
+            threads.append(threading.get_ident())
+            raise CourierCircuitOpenError('open')
+
+        with patch.object(adapter.circuit_breaker, 'before_request', side_effect=before_request):
+            with self.assertRaises(CourierCircuitOpenError):
+                await adapter.atrack_shipment('SMSA123')
+
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
+
+    def test_couriers_api_exposes_state(self):
+        CourierFactory(code='smsa')
+        for _ in range(4):
+            CircuitBreaker('smsa', BREAKER_OPTIONS).record_failure()
+
+        response = APIClient().get(reverse('api:courier-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['circuit_state'], circuit_breaker.OPEN)
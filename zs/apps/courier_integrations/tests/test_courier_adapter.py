@@ -124,9 +124,9 @@ class TestAramexCourierAdapter(TestCase):
     def test_map_status(self):
         """Test mapping courier status to system status"""
         mappings = [
-            ('shipment created', 'PENDING'),
-            ('out for delivery', 'OUT_FOR_DELIVERY'),
-            ('delivered', 'DELIVERED'),
+            ('shipment created', 'pending'),
+            ('out for delivery', 'out_for_delivery'),
+            ('delivered', 'delivered'),
         ]
         
         for courier_status, expected_status in mappings:
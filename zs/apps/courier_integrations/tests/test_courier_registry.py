@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+from typing import Any, List, cast
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase
+from unittest.mock import patch
+
+from zs.apps.courier_integrations.adapters.base import BaseCourierAdapter
+from zs.apps.courier_integrations.factories.courier_factory import CourierFactory as AdapterFactory, version_key
+from .factories import CourierFactory
+
+
+COURIER_MAPPING = {
+    'aramex': 'zs.apps.courier_integrations.adapters.aramex.ARAMEXCourierAdapter',
+    'smsa': 'zs.apps.courier_integrations.adapters.smsa.SMSACourierAdapter',
+}
+
+COURIER_CONFIG = {
+    'ARAMEX': {
+        'api_url': 'https://api.example.com',
+        'username': 'settings-user',
+        'password': 'settings-password',
+        'transport': {'pool_maxsize': 10, 'read_timeout': 20},
+    },
+    'SMSA': {'api_url': 'https://smsa.example.com'},
+}
+
+
+class TestCourierRegistry(TestCase):
+    """Test building and hot reloading courier adapters"""
+
+    def setUp(self):
+        cache.clear()
+        self.patchers: List[Any] = [
+            patch('django.conf.settings.COURIER_MAPPING', COURIER_MAPPING),
+            patch('django.conf.settings.COURIER_CONFIG', COURIER_CONFIG),
+            patch.dict(AdapterFactory._instances, clear=True),
+            patch.dict(AdapterFactory._versions, clear=True),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        self.aramex = CourierFactory(code='aramex', config={
+            'password': 'rotated-password',
+            'transport': {'pool_maxsize': 40},
+        })
+        self.smsa = CourierFactory(code='smsa')
+
+    def tearDown(self):
+        AdapterFactory.end()
+        for patcher in reversed(self.patchers):
+            patcher.stop()
+        cache.clear()
+
+    def test_courier_record_overrides_settings(self):
+        adapter = AdapterFactory.get_courier('aramex')
+
+        self.assertEqual(adapter.config['username'], 'settings-user')
+        self.assertEqual(adapter.config['password'], 'rotated-password')
+        self.assertEqual(adapter.transport.pool_maxsize, 40)
+        self.assertEqual(adapter.transport.timeout(), (5.0, 20.0))
+
+    def test_saving_a_courier_rebuilds_only_its_adapter(self):
+        aramex = AdapterFactory.get_courier('aramex')
+        smsa = AdapterFactory.get_courier('smsa')
+        self.assertIs(AdapterFactory.get_courier('aramex'), aramex)
+
+        self.aramex.config = {'password': 'next-password'}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.aramex.save()
+
+        rebuilt = AdapterFactory.get_courier('aramex')
+        self.assertIsNot(rebuilt, aramex)
+        self.assertEqual(rebuilt.config['password'], 'next-password')
+        self.assertIs(AdapterFactory.get_courier('smsa'), smsa)
+
+    def test_replaced_adapter_is_closed(self):
+        AdapterFactory.get_courier('aramex')
+        AdapterFactory.bump_version('aramex')
+
+        with patch('requests.Session.close') as close_session:
+            AdapterFactory.get_courier('aramex')
+
+        close_session.assert_called_once_with()
+
+    async def test_replaced_adapter_closes_its_async_clients(self):
+        adapter = cast(BaseCourierAdapter, await AdapterFactory.aget_courier('smsa'))
+        client = adapter._get_async_client()
+        await sync_to_async(AdapterFactory.bump_version)('smsa')
+
+        self.assertIsNot(await AdapterFactory.aget_courier('smsa'), adapter)
+        # Closed on this loop, which the factory does not wait for
+        for _ in range(10):
+            await asyncio.sleep(0)
+        self.assertTrue(client.is_closed)
+
+    def test_version_is_checked_once_per_request(self):
+        AdapterFactory.begin()
+        adapter = AdapterFactory.get_courier('aramex')
+        # Another process saved the courier
+        cache.set(version_key('aramex'), 'other')
+
+        with patch.object(cache, 'get', wraps=cache.get) as cache_get:
+            self.assertIs(AdapterFactory.get_courier('aramex'), adapter)
+        cache_get.assert_not_called()
+
+        AdapterFactory.begin()
+        self.assertIsNot(AdapterFactory.get_courier('aramex'), adapter)
+
+    def test_concurrent_first_use_builds_once(self):
+        built = []
+
+        def build(courier_code):
+            time.sleep(0.05)
+            built.append(courier_code)
+            return object()
+
+        results = []
+        with patch.object(AdapterFactory, '_build', side_effect=build):
+            threads = [
+                threading.Thread(target=lambda: results.append(AdapterFactory.get_courier('smsa')))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(built, ['smsa'])
+        self.assertEqual(len({id(result) for result in results}), 1)
+
+    def test_unknown_courier(self):
+        with self.assertRaises(ValueError):
+            AdapterFactory.get_courier('unknown')
@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from typing import Any
+from unittest.mock import patch
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.services.shipment_export import EXPORT_FIELDS, ShipmentExport
+from .factories import CourierFactory, ShipmentFactory, ShipmentTrackingFactory
+
+
+class TestShipmentExport(TestCase):
+    """Test streaming shipment exports"""
+
+    client: APIClient
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('api:shipment-export')
+        self.aramex = CourierFactory(code='aramex')
+        self.other = CourierFactory(code='other')
+        now = timezone.now()
+        self.tracked = ShipmentFactory(courier=self.aramex, status=ShipmentStatus.IN_TRANSIT.value)
+        ShipmentTrackingFactory(shipment=self.tracked, courier_status='Picked up', location='Amman',
+                                timestamp=now - timedelta(days=1))
+        ShipmentTrackingFactory(shipment=self.tracked, courier_status='In transit', location='Dubai',
+                                timestamp=now)
+        self.untracked = ShipmentFactory(courier=self.other, status=ShipmentStatus.PENDING.value)
+
+    def read_csv(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        return list(csv.DictReader(io.StringIO(response.getvalue().decode())))
+
+    def test_csv_rows_carry_the_latest_event(self):
+        rows = self.read_csv(self.client.get(self.url))
+
+        self.assertEqual(list(rows[0]), list(EXPORT_FIELDS))
+        self.assertEqual([row['reference_number'] for row in rows],
+                         [self.tracked.reference_number, self.untracked.reference_number])
+        self.assertEqual(rows[0]['courier'], 'aramex')
+        self.assertEqual(rows[0]['latest_event_courier_status'], 'In transit')
+        self.assertEqual(rows[0]['latest_event_location'], 'Dubai')
+        self.assertEqual(rows[1]['latest_event_status'], '')
+
+    def test_ndjson_with_filters(self):
+        response = self.client.get(self.url, {'output': 'ndjson', 'courier': 'other', 'status': 'pending'})
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = response.getvalue().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [self.untracked.id])
+        self.assertIsNone(json.loads(lines[0])['latest_event_at'])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'output': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'status': 'lost'}).status_code, 400)
+
+    def test_rows_are_written_in_chunks(self):
+        for _ in range(3):
+            ShipmentFactory(courier=self.aramex)
+
+        chunks = list(ShipmentExport.stream('ndjson', chunk_size=2))
+
+        self.assertEqual([chunk.count(b'\n') for chunk in chunks], [2, 2, 1])
+
+    async def test_asgi_export_is_sent_as_rows_are_read(self):
+        for _ in range(3):
+            await sync_to_async(ShipmentFactory)(courier=self.aramex)
+        encoded = []
+        encode = ShipmentExport._encode_ndjson
+
+        def spy(rows):
+            encoded.append(len(rows))
+            return encode(rows)
+
+        with self.settings(COURIER_EXPORT_CHUNK_SIZE=2), \
+                patch.object(ShipmentExport, '_encode_ndjson', side_effect=spy):
+            response: Any = await AsyncClient().get(self.url, {'output': 'ndjson'})
+            # Not buffered by Django before it is sent
+            self.assertTrue(response.is_async)
+            chunks = aiter(response.streaming_content)
+            first = await anext(chunks)
+            self.assertEqual(encoded, [2])
+            rest = [chunk async for chunk in chunks]
+
+        self.assertEqual(first.count(b'\n'), 2)
+        self.assertEqual([chunk.count(b'\n') for chunk in rest], [2, 1])
+        self.assertEqual(encoded, [2, 2, 1])
+
+    def test_command_writes_the_export(self):
+        handle, path = tempfile.mkstemp(suffix='.ndjson')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        call_command('export_shipments', '--format', 'ndjson', '--output', path,
+                     '--status', 'in_transit', stderr=io.StringIO())
+
+        with open(path, 'rb') as export:
+            self.assertEqual([json.loads(line)['id'] for line in export], [self.tracked.id])
+
+        stdout = io.StringIO()
+        call_command('export_shipments', '--courier', 'aramex', stdout=stdout)
+        self.assertEqual(len(stdout.getvalue().splitlines()), 2)
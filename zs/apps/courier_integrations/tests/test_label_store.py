@@ -0,0 +1,118 @@
+import responses
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from unittest.mock import patch, MagicMock
+
+from zs.apps.courier_integrations.adapters.aramex import ARAMEXCourierAdapter
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
+from .factories import CourierFactory, ShipmentFactory
+
+
+LABEL_PDF = b'%PDF-1.4 ' + bytes(range(256)) * 4
+IN_MEMORY_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class TestLabelEndpoint(TestCase):
+    """Test labels are fetched once and streamed from storage"""
+
+    client: APIClient
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.shipment = ShipmentFactory(courier=CourierFactory(code='smsa'))
+        self.url = reverse('api:shipment-label', args=[self.shipment.id])
+        self.factory_patcher = patch('zs.apps.courier_integrations.factories.courier_factory.CourierFactory.get_courier')
+        self.mock_adapter = MagicMock()
+        self.mock_adapter.fetch_label_pdf.return_value = LABEL_PDF
+        self.factory_patcher.start().return_value = self.mock_adapter
+
+    def tearDown(self):
+        self.factory_patcher.stop()
+        cache.clear()
+
+    def test_label_fetched_once(self):
+        first = self.client.get(self.url)
+        cache.clear()
+        second = self.client.get(self.url)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.getvalue(), LABEL_PDF)
+        self.assertEqual(second.getvalue(), LABEL_PDF)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertIn('immutable', first['Cache-Control'])
+        self.mock_adapter.fetch_label_pdf.assert_called_once_with(self.shipment.waybill_id)
+
+    def test_conditional_request(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_request(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=9-18')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 9-18/{len(LABEL_PDF)}')
+        self.assertEqual(response.getvalue(), LABEL_PDF[9:19])
+
+    def test_suffix_and_unsatisfiable_ranges(self):
+        suffix = self.client.get(self.url, HTTP_RANGE='bytes=-4')
+        self.assertEqual(suffix.getvalue(), LABEL_PDF[-4:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(LABEL_PDF)}-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_label_without_waybill(self):
+        shipment = ShipmentFactory(courier=self.shipment.courier, waybill_id='')
+
+        response = self.client.get(reverse('api:shipment-label', args=[shipment.id]))
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['error']['detail']['error_string'], 'Waybill not yet created')
+        self.mock_adapter.fetch_label_pdf.assert_not_called()
+
+    def test_stale_if_range_serves_full_label(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"other"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response['Content-Length']), len(LABEL_PDF))
+
+
+class TestFetchLabelPdf(TestCase):
+    """Test label URLs are resolved to the PDF document"""
+
+    def setUp(self):
+        cache.clear()
+        self.settings_patcher = patch('django.conf.settings.COURIER_CONFIG', {
+            'ARAMEX': {'api_url': 'https://api.example.com', 'tracking_url': 'https://tracking.example.com'},
+        })
+        self.settings_patcher.start()
+        self.adapter = ARAMEXCourierAdapter()
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+
+    @responses.activate
+    def test_downloads_label_url(self):
+        responses.add(responses.GET, 'https://labels.example.com/AWB1.pdf', body=LABEL_PDF)
+
+        with patch.object(self.adapter, 'print_waybill_label',
+                          return_value={'label_url': 'https://labels.example.com/AWB1.pdf'}):
+            self.assertEqual(self.adapter.fetch_label_pdf('AWB1'), LABEL_PDF)
+
+    @responses.activate
+    def test_rejects_non_pdf(self):
+        responses.add(responses.GET, 'https://labels.example.com/AWB1.pdf', body=b'<html>login</html>')
+
+        with patch.object(self.adapter, 'print_waybill_label',
+                          return_value={'label_url': 'https://labels.example.com/AWB1.pdf'}):
+            with self.assertRaises(CourierAPIError):
+                self.adapter.fetch_label_pdf('AWB1')
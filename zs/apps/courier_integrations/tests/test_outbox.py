@@ -0,0 +1,140 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from unittest.mock import patch, MagicMock
+
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
+from zs.apps.courier_integrations.models.outbox import ShipmentOutbox
+from zs.apps.courier_integrations.models.shipment import Shipment
+from zs.apps.courier_integrations.services.shipment_service import ShipmentService
+from .factories import CourierFactory, ShipmentFactory
+
+
+SHIPMENT_DATA = {
+    'courier_code': 'aramex',
+    'reference_number': 'REF-ASYNC-1',
+    'customer_name': 'Test Customer',
+    'shipping_date': '2025-04-06',
+    'destination_country': 'UAE',
+    'destination_city': 'Dubai',
+    'address_line1': '123 Test Street',
+    'phone_number': '+9715012345678',
+    'weight': 2.5,
+}
+
+
+class TestAsyncShipmentCreation(TestCase):
+    """Test waybill creation through the outbox"""
+
+    client: APIClient
+
+    def setUp(self):
+        self.client = APIClient()
+        self.courier = CourierFactory(code='aramex')
+        self.factory_patcher = patch('zs.apps.courier_integrations.factories.courier_factory.CourierFactory.get_courier')
+        self.mock_adapter = MagicMock()
+        self.mock_adapter.create_waybill.return_value = {'waybill_id': 'AWB-ASYNC-1'}
+        self.factory_patcher.start().return_value = self.mock_adapter
+
+    def tearDown(self):
+        self.factory_patcher.stop()
+
+    # The view module may first be imported while test_api patches the service
+    @patch('zs.apps.courier_integrations.api.v1.views.ShipmentService', ShipmentService)
+    @patch('zs.apps.courier_integrations.tasks.shipment_tasks.process_shipment_outbox.delay')
+    def test_prefer_respond_async_returns_202(self, delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('api:shipment-list'), SHIPMENT_DATA, format='json', HTTP_PREFER='respond-async'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        shipment = Shipment.objects.get(reference_number='REF-ASYNC-1')
+        self.assertEqual(shipment.waybill_id, '')
+        self.assertTrue(response['Location'].endswith(f'/shipments/{shipment.id}/waybill-status/'))
+        entry = shipment.outbox_entries.get()
+        delay.assert_called_once_with(entry.id)
+        self.mock_adapter.create_waybill.assert_not_called()
+
+    def test_shipment_without_waybill_is_not_tracked(self):
+        shipment = ShipmentFactory(courier=self.courier, waybill_id='')
+
+        response = self.client.post(reverse('api:shipment-track', args=[shipment.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.json()['error']['detail']['error_string'], 'Waybill not yet created')
+        self.mock_adapter.track_shipment.assert_not_called()
+
+    def test_process_entry_creates_waybill(self):
+        shipment = ShipmentFactory(courier=self.courier, waybill_id='')
+        entry = ShipmentOutbox.objects.create(shipment=shipment, operation=ShipmentOutbox.Operation.CREATE_WAYBILL)
+
+        ShipmentService.process_outbox_entry(entry.id)
+
+        shipment.refresh_from_db()
+        entry.refresh_from_db()
+        self.assertEqual(shipment.waybill_id, 'AWB-ASYNC-1')
+        self.assertEqual(entry.status, ShipmentOutbox.Status.DONE)
+        self.assertIsNone(ShipmentService.process_outbox_entry(entry.id))
+
+        response = self.client.get(reverse('api:shipment-waybill-status', args=[shipment.id]))
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(response.data['waybill_id'], 'AWB-ASYNC-1')
+
+    def test_courier_error_backs_off_then_fails(self):
+        self.mock_adapter.create_waybill.side_effect = CourierAPIError('HTTP error: 502')
+        shipment = ShipmentFactory(courier=self.courier, waybill_id='')
+        entry = ShipmentOutbox.objects.create(shipment=shipment, operation=ShipmentOutbox.Operation.CREATE_WAYBILL)
+
+        ShipmentService.process_outbox_entry(entry.id)
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, ShipmentOutbox.Status.PENDING)
+        self.assertEqual(entry.attempts, 1)
+        self.assertGreater(entry.available_at, timezone.now())
+        self.assertNotIn(entry.id, ShipmentService.due_outbox_entry_ids())
+
+        with self.settings(COURIER_OUTBOX_MAX_ATTEMPTS=2):
+            ShipmentOutbox.objects.filter(id=entry.id).update(available_at=timezone.now())
+            ShipmentService.process_outbox_entry(entry.id)
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, ShipmentOutbox.Status.FAILED)
+        self.assertEqual(entry.last_error, 'HTTP error: 502')
+
+    def test_unexpected_errors_and_missing_waybills_are_retried(self):
+        shipment = ShipmentFactory(courier=self.courier, waybill_id='')
+        entry = ShipmentOutbox.objects.create(shipment=shipment, operation=ShipmentOutbox.Operation.CREATE_WAYBILL)
+
+        for outcome, error in ((KeyError('sawb'), "'sawb'"), ({'waybill_id': None}, 'Courier returned no waybill')):
+            if isinstance(outcome, Exception):
+                self.mock_adapter.create_waybill.side_effect = outcome
+            else:
+                self.mock_adapter.create_waybill.side_effect = None
+                self.mock_adapter.create_waybill.return_value = outcome
+            ShipmentOutbox.objects.filter(id=entry.id).update(available_at=timezone.now())
+
+            with self.assertLogs('zs.apps.courier_integrations.services.shipment_service', 'WARNING'):
+                ShipmentService.process_outbox_entry(entry.id)
+
+            entry.refresh_from_db()
+            self.assertEqual(entry.status, ShipmentOutbox.Status.PENDING)
+            self.assertEqual(entry.last_error, error)
+            self.assertGreater(entry.available_at, timezone.now())
+
+        shipment.refresh_from_db()
+        self.assertEqual((entry.attempts, shipment.waybill_id), (2, ''))
+
+    def test_stale_processing_entry_is_requeued(self):
+        shipment = ShipmentFactory(courier=self.courier, waybill_id='')
+        entry = ShipmentOutbox.objects.create(
+            shipment=shipment,
+            operation=ShipmentOutbox.Operation.CREATE_WAYBILL,
+            status=ShipmentOutbox.Status.PROCESSING,
+        )
+        ShipmentOutbox.objects.filter(id=entry.id).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(ShipmentService.due_outbox_entry_ids(), [entry.id])
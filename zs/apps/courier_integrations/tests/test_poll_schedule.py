@@ -0,0 +1,74 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from unittest.mock import patch, MagicMock
+
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.services.poll_schedule import PollSchedule
+from zs.apps.courier_integrations.services.shipment_service import ShipmentService
+from .factories import CourierFactory, ShipmentFactory
+
+
+@override_settings(COURIER_POLL_SCHEDULE={'max_interval': 8 * 60 * 60, 'jitter': 0.2})
+class TestPollSchedule(TestCase):
+    """Test adaptive tracking poll intervals"""
+
+    def test_terminal_statuses_are_not_polled(self):
+        for status in (ShipmentStatus.DELIVERED, ShipmentStatus.RETURNED, ShipmentStatus.CANCELLED):
+            self.assertIsNone(PollSchedule.next_poll_at(status.value))
+
+    def test_interval_backs_off_while_unchanged(self):
+        out_for_delivery = ShipmentStatus.OUT_FOR_DELIVERY.value
+        self.assertEqual(PollSchedule.interval(out_for_delivery), 30 * 60)
+        self.assertEqual(PollSchedule.interval(out_for_delivery, 2), 2 * 60 * 60)
+        self.assertEqual(PollSchedule.interval(out_for_delivery, 10), 8 * 60 * 60)
+        self.assertEqual(PollSchedule.interval(out_for_delivery, 10000), 8 * 60 * 60)
+        self.assertEqual(PollSchedule.interval(ShipmentStatus.UNKNOWN.value), 6 * 60 * 60)
+
+    def test_jitter_spreads_polls(self):
+        now = timezone.now()
+        polls = {PollSchedule.next_poll_at(ShipmentStatus.OUT_FOR_DELIVERY.value, now=now) for _ in range(20)}
+
+        self.assertGreater(len(polls), 1)
+        self.assertTrue(all(
+            poll and now + timedelta(minutes=24) <= poll <= now + timedelta(minutes=36) for poll in polls
+        ))
+
+
+class TestTrackingPollScheduling(TestCase):
+    """Test that tracking updates schedule the next poll"""
+
+    def setUp(self):
+        cache.clear()
+        self.shipment = ShipmentFactory(courier=CourierFactory(code='aramex'), unchanged_polls=3)
+        self.factory_patcher = patch('zs.apps.courier_integrations.factories.courier_factory.CourierFactory.get_courier')
+        self.mock_adapter = MagicMock()
+        self.factory_patcher.start().return_value = self.mock_adapter
+
+    def tearDown(self):
+        self.factory_patcher.stop()
+        cache.clear()
+
+    def track(self, status):
+        self.mock_adapter.track_shipment.return_value = {'current_status': status, 'history': []}
+        ShipmentService.update_tracking_status(self.shipment)
+        cache.clear()
+        self.shipment.refresh_from_db()
+
+    @patch('zs.apps.courier_integrations.services.poll_schedule.random.uniform', return_value=1.0)
+    def test_status_change_resets_backoff(self, uniform):
+        self.track(ShipmentStatus.OUT_FOR_DELIVERY.value)
+
+        self.assertEqual(self.shipment.unchanged_polls, 0)
+        self.assertEqual(self.shipment.next_poll_at - self.shipment.last_tracking_update, timedelta(minutes=30))
+
+        self.track(ShipmentStatus.OUT_FOR_DELIVERY.value)
+
+        self.assertEqual(self.shipment.unchanged_polls, 1)
+        self.assertEqual(self.shipment.next_poll_at - self.shipment.last_tracking_update, timedelta(hours=1))
+
+    def test_terminal_status_stops_polling(self):
+        self.track(ShipmentStatus.DELIVERED.value)
+
+        self.assertIsNone(self.shipment.next_poll_at)
@@ -0,0 +1,82 @@
+from datetime import timedelta
+from unittest import skipUnless
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.models.shipment import Shipment
+from zs.apps.courier_integrations.models.tracking import ShipmentTracking
+from zs.apps.courier_integrations.services.shipment_service import ShipmentService
+from .factories import CourierFactory
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Query plans are checked on PostgreSQL')
+class TestQueryPlans(TestCase):
+    """EXPLAIN regression tests for the shipment indexes on a seeded dataset"""
+
+    shipment: Shipment
+
+    @classmethod
+    def setUpTestData(cls):
+        courier = CourierFactory()
+        now = timezone.now()
+        # Most shipments are delivered; one in ten is still polled
+        Shipment.objects.bulk_create([
+            Shipment(
+                reference_number=f'PLAN{n:06d}',
+                courier=courier,
+                waybill_id=f'WB{n:08d}',
+                status=ShipmentStatus.IN_TRANSIT.value if n % 10 == 0 else ShipmentStatus.DELIVERED.value,
+                next_poll_at=now + timedelta(minutes=n % 600 - 300) if n % 10 == 0 else None,
+            )
+            for n in range(20000)
+        ], batch_size=5000)
+        cls.shipment = Shipment.objects.get(reference_number='PLAN000010')
+        ShipmentTracking.objects.bulk_create([
+            ShipmentTracking(
+                shipment_id=shipment_id,
+                courier_status=f'Event {n}',
+                status=ShipmentStatus.IN_TRANSIT.value,
+                timestamp=now - timedelta(hours=n),
+            )
+            for shipment_id in Shipment.objects.values_list('id', flat=True)[:2000]
+            for n in range(10)
+        ], batch_size=5000)
+        # A long-lived shipment with a long history
+        ShipmentTracking.objects.bulk_create([
+            ShipmentTracking(
+                shipment=cls.shipment,
+                courier_status=f'Scan {n}',
+                status=ShipmentStatus.IN_TRANSIT.value,
+                timestamp=now - timedelta(minutes=n),
+            )
+            for n in range(5000)
+        ], batch_size=5000)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE courier_integrations_shipment')
+            cursor.execute('ANALYZE courier_integrations_shipmenttracking')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+        self.assertNotIn('Seq Scan', plan)
+        return plan
+
+    def test_tracking_dispatch_page(self):
+        now = timezone.now()
+        self.assertUsesIndex(ShipmentService.due_for_tracking(now)[:1000], 'shipment_poll_due_idx')
+        self.assertUsesIndex(
+            ShipmentService.due_for_tracking(now, (now - timedelta(hours=1), 12345))[:1000],
+            'shipment_poll_due_idx',
+        )
+
+    def test_waybill_lookup(self):
+        self.assertUsesIndex(Shipment.objects.filter(waybill_id='WB00001234'), 'shipment_waybill_idx')
+
+    def test_tracking_history(self):
+        """History is read in timestamp order from the unique key, without sorting"""
+        plan = self.assertUsesIndex(
+            self.shipment.tracking_history.order_by('-timestamp')[:50], 'shipment_tracking_event_uniq'
+        )
+        self.assertNotIn('Sort', plan)
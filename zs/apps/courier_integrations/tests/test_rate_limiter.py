@@ -0,0 +1,161 @@
+import threading
+import responses
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase
+from redis.exceptions import ConnectionError as RedisConnectionError
+from unittest.mock import MagicMock, patch
+
+from zs.apps.courier_integrations.adapters.rate_limiter import RateLimiter, RedisTokenBucket, parse_retry_after
+from zs.apps.courier_integrations.adapters.smsa import SMSACourierAdapter
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError, CourierRateLimitError
+
+
+class TestRateLimiter(TestCase):
+    """Test the token-bucket rate limiter"""
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_burst_then_wait(self):
+        limiter = RateLimiter('test_courier', {'track': {'rate': 1, 'burst': 2}})
+
+        self.assertEqual(limiter.reserve('track'), 0)
+        self.assertEqual(limiter.reserve('track'), 0)
+        self.assertAlmostEqual(limiter.reserve('track'), 1.0, places=1)
+
+    def test_operations_have_separate_buckets(self):
+        limiter = RateLimiter('test_courier', {'track': {'rate': 1, 'burst': 1}, 'create': {'rate': 1, 'burst': 1}})
+
+        self.assertEqual(limiter.reserve('track'), 0)
+        self.assertEqual(limiter.reserve('create'), 0)
+
+    def test_unlimited_operation(self):
+        limiter = RateLimiter('test_courier', {'track': {'rate': 1, 'burst': 1}})
+
+        for _ in range(5):
+            self.assertEqual(limiter.reserve('label'), 0)
+
+    def test_acquire_waits_for_token(self):
+        limiter = RateLimiter('test_courier', {'default': {'rate': 20, 'burst': 1}})
+        limiter.acquire()
+
+        with patch('zs.apps.courier_integrations.adapters.rate_limiter.time.sleep') as sleep:
+            sleep.side_effect = lambda seconds: cache.clear()
+            limiter.acquire()
+
+        sleep.assert_called_once()
+        self.assertAlmostEqual(sleep.call_args[0][0], 0.05, places=2)
+
+    def test_acquire_raises_past_deadline(self):
+        limiter = RateLimiter('test_courier', {'default': {'rate': 1, 'burst': 1}, 'max_wait': 0.5})
+        limiter.acquire()
+
+        with self.assertRaises(CourierRateLimitError) as ctx:
+            limiter.acquire()
+        self.assertGreater(ctx.exception.retry_after, 0.5)
+
+    def test_drain_blocks_bucket(self):
+        limiter = RateLimiter('test_courier', {'track': {'rate': 100, 'burst': 100}})
+
+        limiter.drain('track', retry_after=30)
+
+        self.assertGreater(limiter.reserve('track'), 29)
+
+    def test_drain_blocks_unlimited_operations(self):
+        limiter = RateLimiter('test_courier', {'track': {'rate': 100, 'burst': 100}})
+
+        limiter.drain('label', retry_after=30)
+
+        # Operations without a limit share the default bucket
+        self.assertGreater(limiter.reserve('cancel'), 29)
+        self.assertEqual(limiter.reserve('track'), 0)
+
+    def test_redis_outage_fails_open(self):
+        client = MagicMock()
+        client.register_script.return_value = MagicMock(side_effect=RedisConnectionError('down'))
+        limiter = RateLimiter('test_courier', {'track': {'rate': 1, 'burst': 1}}, backend=RedisTokenBucket(client))
+
+        with self.assertLogs('zs.apps.courier_integrations.adapters.rate_limiter', 'WARNING'):
+            limiter.acquire('track')
+            limiter.drain('track', retry_after=30)
+
+        self.assertEqual(limiter.reserve('track'), 0)
+
+    async def test_aacquire_takes_tokens_off_the_loop(self):
+        loop_thread = threading.get_ident()
+        threads = []
+        backend = MagicMock()
+
+        def take(*args):
+            threads.append(threading.get_ident())
+            return 0.0
+
+        backend.take.side_effect = take
+        limiter = RateLimiter('test_courier', {'track': {'rate': 1, 'burst': 1}}, backend=backend)
+
+        await limiter.aacquire('track')
+
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('120'), 120.0)
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertIsNone(parse_retry_after(None))
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+
+
+class TestAdapterRateLimit(TestCase):
+    """Test adapters honour courier 429 responses"""
+
+    def setUp(self):
+        cache.clear()
+        self.settings_patcher = patch('django.conf.settings.COURIER_CONFIG', {
+            'SMSA': {
+                'api_url': 'https://smsa.example.com',
+                'tracking_url': 'https://tracking.example.com',
+                'pass_key': 'test_api_key',
+                'transport': {'retries': 0},
+                'rate_limits': {'track': {'rate': 100, 'burst': 100}, 'max_wait': 1},
+            },
+        })
+        self.settings_patcher.start()
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+        cache.clear()
+
+    @responses.activate
+    def test_retry_after_drains_bucket(self):
+        responses.add(
+            responses.GET, 'https://smsa.example.com/getTracking',
+            status=429, headers={'Retry-After': '30'},
+        )
+        adapter = SMSACourierAdapter('smsa')
+
+        with self.assertRaises(CourierAPIError):
+            adapter.track_shipment('SMSA123')
+        with self.assertRaises(CourierRateLimitError):
+            SMSACourierAdapter('smsa').track_shipment('SMSA123')
+
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_retry_after_is_honoured_without_rate_limits(self):
+        responses.add(
+            responses.GET, 'https://smsa.example.com/getTracking',
+            status=429, headers={'Retry-After': '30'},
+        )
+        config = {key: value for key, value in settings.COURIER_CONFIG['SMSA'].items() if key != 'rate_limits'}
+
+        with patch.dict(settings.COURIER_CONFIG, {'SMSA': config}):
+            with self.assertRaises(CourierAPIError):
+                SMSACourierAdapter('smsa').track_shipment('SMSA123')
+            with self.assertRaises(CourierRateLimitError):
+                SMSACourierAdapter('smsa').track_shipment('SMSA123')
+
+        self.assertEqual(len(responses.calls), 1)
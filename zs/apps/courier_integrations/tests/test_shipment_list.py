@@ -0,0 +1,80 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.models.shipment import Shipment
+from .factories import CourierFactory, ShipmentFactory
+
+
+class TestShipmentList(TestCase):
+    """Test cursor pagination and filters of the shipment list"""
+
+    client: APIClient
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('api:shipment-list')
+        self.aramex = CourierFactory(code='aramex')
+        self.other = CourierFactory(code='other')
+        self.now = timezone.now()
+        self.shipments = [
+            ShipmentFactory(courier=self.aramex if n % 2 else self.other, status=ShipmentStatus.IN_TRANSIT.value)
+            for n in range(7)
+        ]
+        # Rows sharing a created_at must still page by id
+        for n, shipment in enumerate(self.shipments):
+            Shipment.objects.filter(id=shipment.id).update(created_at=self.now - timedelta(hours=n // 3))
+
+    def tearDown(self):
+        cache.clear()
+
+    def list_ids(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']], response.data['next']
+
+    def test_pages_follow_the_cursor_newest_first(self):
+        ids, next_url = self.list_ids(self.url, page_size=3)
+        pages = [ids]
+        while next_url:
+            ids, next_url = self.list_ids(next_url)
+            pages.append(ids)
+
+        expected = [shipment.id for shipment in sorted(
+            Shipment.objects.all(), key=lambda shipment: (shipment.created_at, shipment.id), reverse=True
+        )]
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.list_ids(self.url, page_size=7)
+
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 1)
+        self.assertNotIn('"data"', selects[0])
+
+    def test_filters(self):
+        delivered = self.shipments[0]
+        Shipment.objects.filter(id=delivered.id).update(status=ShipmentStatus.DELIVERED.value)
+
+        ids, _ = self.list_ids(self.url, status='delivered,returned')
+        self.assertEqual(ids, [delivered.id])
+        ids, _ = self.list_ids(self.url, courier='aramex')
+        self.assertEqual(sorted(ids), [s.id for s in self.shipments if s.courier_id == self.aramex.id])
+        ids, _ = self.list_ids(self.url, created_after=(self.now - timedelta(minutes=30)).isoformat())
+        self.assertEqual(sorted(ids), [s.id for s in self.shipments[:3]])
+        ids, _ = self.list_ids(self.url, created_before=(self.now - timedelta(hours=1)).isoformat())
+        self.assertEqual(sorted(ids), [s.id for s in self.shipments[6:]])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'status': 'lost'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'created_after': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'cursor': 'garbage'}).status_code, 404)
@@ -1,4 +1,7 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from unittest.mock import patch, MagicMock
 
 from zs.apps.courier_integrations.models.shipment import Shipment
@@ -73,18 +76,18 @@ class TestShipmentService(TestCase):
         # Set up mock adapter response
         self.mock_adapter.track_shipment.return_value = {
             'waybill_id': shipment.waybill_id,
-            'current_status': 'IN_TRANSIT',
+            'current_status': ShipmentStatus.IN_TRANSIT.value,
             'current_location': 'Transit Hub',
             'timestamp': '2025-04-06T10:30:00Z',
             'history': [
                 {
-                    'status': 'PENDING',
+                    'status': ShipmentStatus.PENDING.value,
                     'description': 'Shipment created',
                     'location': 'Origin',
                     'timestamp': '2025-04-05T14:20:00Z'
                 },
                 {
-                    'status': 'IN_TRANSIT',
+                    'status': ShipmentStatus.IN_TRANSIT.value,
                     'description': 'In transit',
                     'location': 'Transit Hub',
                     'timestamp': '2025-04-06T10:30:00Z'
@@ -98,7 +101,8 @@ class TestShipmentService(TestCase):
         
         # Verify shipment was updated
         shipment.refresh_from_db()
-        self.assertEqual(shipment.status, 'IN_TRANSIT')
+        self.assertEqual(shipment.status, ShipmentStatus.IN_TRANSIT.value)
+        self.assertEqual(shipment.version, 1)
         self.assertIsNotNone(shipment.last_tracking_update)
         
         # Verify tracking history was created
@@ -107,6 +111,59 @@ class TestShipmentService(TestCase):
         
         # Verify adapter was called correctly
         self.mock_adapter.track_shipment.assert_called_once_with(shipment.waybill_id)
+
+    def test_repeated_polls_insert_only_new_events(self):
+        """Polls return the full history; stored events are not inserted again"""
+        shipment = ShipmentFactory(courier=self.courier)
+        history = [
+            {'status': 'pending', 'description': 'Shipment created', 'location': 'Origin',
+             'timestamp': '2025-04-05T14:20:00Z'},
+            {'status': 'in_transit', 'description': 'In transit', 'location': 'Transit Hub',
+             'timestamp': '2025-04-06T10:30:00Z'},
+        ]
+        self.mock_adapter.track_shipment.return_value = {'current_status': 'in_transit', 'history': history}
+
+        query_counts = []
+        for _ in range(3):
+            # Skip the tracking cache so every poll reaches the courier
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                ShipmentService.update_tracking_status(shipment)
+            query_counts.append(len(queries))
+
+        self.assertEqual(ShipmentTracking.objects.filter(shipment=shipment).count(), 2)
+        self.assertEqual(len(set(query_counts)), 1)
+
+        history.append({'status': 'out_for_delivery', 'description': 'Out for delivery', 'location': 'Dubai',
+                        'timestamp': '2025-04-07T08:00:00Z'})
+        cache.clear()
+        with self.assertNumQueries(query_counts[0]):
+            ShipmentService.update_tracking_status(shipment)
+        self.assertEqual(ShipmentTracking.objects.filter(shipment=shipment).count(), 3)
+
+    def test_repeated_polls_store_undated_events_once(self):
+        """Events without a timestamp are stored at the first poll only"""
+        shipment = ShipmentFactory(courier=self.courier)
+        history = [
+            {'status': 'pending', 'description': 'Shipment created', 'location': 'Origin',
+             'timestamp': '2025-04-05T14:20:00Z'},
+            {'status': 'in_transit', 'description': 'Arrived at hub', 'location': 'Transit Hub'},
+        ]
+        self.mock_adapter.track_shipment.return_value = {'current_status': 'in_transit', 'history': history}
+
+        for _ in range(2):
+            cache.clear()
+            ShipmentService.update_tracking_status(shipment)
+
+        self.assertEqual(
+            sorted(ShipmentTracking.objects.filter(shipment=shipment).values_list('courier_status', flat=True)),
+            ['Arrived at hub', 'Shipment created'],
+        )
+        # The same status at another location is a new event
+        history.append({'status': 'in_transit', 'description': 'Arrived at hub', 'location': 'Dubai'})
+        cache.clear()
+        ShipmentService.update_tracking_status(shipment)
+        self.assertEqual(ShipmentTracking.objects.filter(shipment=shipment).count(), 3)
     
     def test_cancel_shipment(self):
         """Test cancelling a shipment"""
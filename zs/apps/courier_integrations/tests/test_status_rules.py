@@ -0,0 +1,103 @@
+from typing import Any
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from unittest.mock import patch
+
+from zs.apps.courier_integrations.adapters.smsa import SMSACourierAdapter
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.factories.courier_factory import CourierFactory as AdapterFactory
+from zs.apps.courier_integrations.models.status_rule import StatusRule, UnmappedStatus
+from zs.apps.courier_integrations.services.status_rules import StatusRules
+from .factories import CourierFactory
+
+
+class TestStatusRules(TestCase):
+    """Test compiled status rules"""
+
+    def setUp(self):
+        cache.clear()
+        self.smsa = CourierFactory(code='smsa')
+        self.settings_patcher: Any = patch('django.conf.settings.COURIER_CONFIG', {'SMSA': {}})
+        self.settings_patcher.start()
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+        StatusRules.flush_unmapped()
+        cache.clear()
+
+    def rule(self, match_type, pattern, status, courier=None, **kwargs):
+        return StatusRule.objects.create(
+            courier=courier, match_type=match_type, pattern=pattern, status=status, **kwargs
+        )
+
+    def test_builtin_mappings_are_validated(self):
+        adapter = SMSACourierAdapter('smsa')
+
+        self.assertEqual(adapter.map_status('Out  for Delivery '), ShipmentStatus.OUT_FOR_DELIVERY.value)
+        self.assertEqual(adapter.map_status('delivered'), ShipmentStatus.DELIVERED.value)
+
+        rules = StatusRules.compile('smsa', {'held': 'HELD_AT_CUSTOMS', 'picked': 'PICKED_UP'})
+        self.assertNotIn('held', rules.exact)
+        self.assertEqual(rules.exact['picked'], ShipmentStatus.PICKED_UP.value)
+
+    def test_exact_prefix_and_regex_rules(self):
+        self.rule('exact', 'Handed to Agent', ShipmentStatus.IN_TRANSIT.value, self.smsa)
+        self.rule('prefix', 'arrived at', ShipmentStatus.IN_TRANSIT.value)
+        self.rule('prefix', 'arrived at customer', ShipmentStatus.ATTEMPTED_DELIVERY.value, self.smsa)
+        self.rule('regex', r'^delivery attempt \d+', ShipmentStatus.ATTEMPTED_DELIVERY.value, priority=10)
+        self.rule('regex', r'attempt', ShipmentStatus.FAILED.value, priority=20)
+        # Overrides the built-in mapping
+        self.rule('exact', 'delivery failed', ShipmentStatus.ATTEMPTED_DELIVERY.value, self.smsa)
+        self.rule('exact', 'lost', ShipmentStatus.FAILED.value, is_active=False)
+
+        rules = SMSACourierAdapter('smsa').status_rules
+
+        self.assertEqual(rules.map('handed to agent'), ShipmentStatus.IN_TRANSIT.value)
+        self.assertEqual(rules.map('Arrived at Riyadh hub'), ShipmentStatus.IN_TRANSIT.value)
+        self.assertEqual(rules.map('Arrived at customer address'), ShipmentStatus.ATTEMPTED_DELIVERY.value)
+        self.assertEqual(rules.map('Delivery Attempt 2 - no answer'), ShipmentStatus.ATTEMPTED_DELIVERY.value)
+        self.assertEqual(rules.map('final attempt'), ShipmentStatus.FAILED.value)
+        self.assertEqual(rules.map('delivery failed'), ShipmentStatus.ATTEMPTED_DELIVERY.value)
+        self.assertEqual(rules.map('lost'), ShipmentStatus.UNKNOWN.value)
+
+    def test_known_texts_do_not_query(self):
+        self.rule('prefix', 'arrived at', ShipmentStatus.IN_TRANSIT.value)
+        rules = SMSACourierAdapter('smsa').status_rules
+        rules.map('arrived at hub')
+
+        with self.assertNumQueries(0):
+            for _ in range(1000):
+                rules.map('delivered')
+                rules.map('arrived at hub')
+        self.assertEqual(rules._memo, {'arrived at hub': ShipmentStatus.IN_TRANSIT.value})
+
+    def test_unmapped_statuses_are_counted(self):
+        adapter = SMSACourierAdapter('smsa')
+        for _ in range(3):
+            adapter.map_status('Held at customs')
+        adapter.map_status('')
+
+        StatusRules.flush_unmapped()
+        StatusRules.flush_unmapped()
+
+        unmapped = UnmappedStatus.objects.get()
+        self.assertEqual((unmapped.courier_code, unmapped.courier_status, unmapped.count),
+                         ('smsa', 'held at customs', 3))
+
+    def test_rule_changes_rebuild_the_adapter(self):
+        with patch('django.conf.settings.COURIER_MAPPING',
+                   {'smsa': 'zs.apps.courier_integrations.adapters.smsa.SMSACourierAdapter'}), \
+                patch.dict(AdapterFactory._instances, clear=True):
+            self.assertEqual(AdapterFactory.get_courier('smsa').map_status('held'), ShipmentStatus.UNKNOWN.value)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.rule('exact', 'held', ShipmentStatus.IN_TRANSIT.value, self.smsa)
+
+            self.assertEqual(AdapterFactory.get_courier('smsa').map_status('held'), ShipmentStatus.IN_TRANSIT.value)
+
+    def test_invalid_regex_is_rejected(self):
+        rule = StatusRule(match_type='regex', pattern='(unclosed', status=ShipmentStatus.FAILED.value)
+
+        with self.assertRaises(ValidationError):
+            rule.full_clean()
@@ -0,0 +1,131 @@
+import random
+import threading
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.models.shipment import Shipment
+from zs.apps.courier_integrations.services.status_transitions import ShipmentTransitions, can_transition
+from .factories import CourierFactory, ShipmentFactory
+
+
+class TestStatusTransitions(TestCase):
+    """Test conditional status updates"""
+
+    def setUp(self):
+        self.courier = CourierFactory(code='aramex')
+        self.shipment = ShipmentFactory(courier=self.courier)
+
+    def stale_copy(self):
+        return Shipment.objects.get(id=self.shipment.id)
+
+    def test_transition_table(self):
+        self.assertTrue(can_transition(ShipmentStatus.PENDING.value, ShipmentStatus.IN_TRANSIT.value))
+        self.assertTrue(can_transition(ShipmentStatus.DELIVERED.value, ShipmentStatus.RETURNED.value))
+        self.assertTrue(can_transition(ShipmentStatus.DELIVERED.value, ShipmentStatus.DELIVERED.value))
+        self.assertFalse(can_transition(ShipmentStatus.DELIVERED.value, ShipmentStatus.IN_TRANSIT.value))
+        self.assertFalse(can_transition(ShipmentStatus.IN_TRANSIT.value, ShipmentStatus.PENDING.value))
+        self.assertFalse(can_transition(ShipmentStatus.CANCELLED.value, ShipmentStatus.DELIVERED.value))
+
+    def test_transition_is_one_conditional_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            moved = ShipmentTransitions.transition(self.shipment, ShipmentStatus.IN_TRANSIT.value)
+
+        self.assertTrue(moved)
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]['sql'].startswith('UPDATE'))
+        self.assertIn('"version" = 0', queries[0]['sql'])
+        self.shipment.refresh_from_db()
+        self.assertEqual((self.shipment.status, self.shipment.version), (ShipmentStatus.IN_TRANSIT.value, 1))
+
+    def test_stale_update_does_not_undo_delivery(self):
+        stale = self.stale_copy()
+        ShipmentTransitions.transition(self.shipment, ShipmentStatus.DELIVERED.value)
+
+        with CaptureQueriesContext(connection) as queries:
+            moved = ShipmentTransitions.transition(
+                stale, ShipmentStatus.IN_TRANSIT.value,
+                lambda current, status: {'unchanged_polls': current.unchanged_polls + 1},
+            )
+
+        self.assertFalse(moved)
+        self.assertFalse(any('FOR UPDATE' in query['sql'] for query in queries))
+        self.shipment.refresh_from_db()
+        self.assertEqual(self.shipment.status, ShipmentStatus.DELIVERED.value)
+        # Bookkeeping fields are still written on the fresh version
+        self.assertEqual((self.shipment.version, self.shipment.unchanged_polls), (2, 1))
+
+    def test_lost_update_is_retried_on_fresh_state(self):
+        stale = self.stale_copy()
+        ShipmentTransitions.transition(self.shipment, ShipmentStatus.PICKED_UP.value)
+
+        self.assertTrue(ShipmentTransitions.transition(stale, ShipmentStatus.IN_TRANSIT.value))
+        self.assertEqual(stale.version, 2)
+        self.shipment.refresh_from_db()
+        self.assertEqual(self.shipment.status, ShipmentStatus.IN_TRANSIT.value)
+
+    def test_transition_many_groups_by_status(self):
+        others = ShipmentFactory.create_batch(3, courier=self.courier)
+        shipments = list(Shipment.objects.only('id', 'status', 'version').order_by('id'))
+        # Delivered by another worker after the batch was read
+        Shipment.objects.filter(id=others[0].id).update(
+            status=ShipmentStatus.DELIVERED.value, version=F('version') + 1
+        )
+        now = timezone.now()
+        changes = [(shipment, ShipmentStatus.IN_TRANSIT.value) for shipment in shipments[:3]]
+        changes.append((shipments[3], ShipmentStatus.DELIVERED.value))
+
+        with self.assertNumQueries(2 + 1 + 2):
+            # Two UPDATEs, one re-read of the group that lost a row and the
+            # loser's refresh and retry
+            moved = ShipmentTransitions.transition_many(
+                changes, lambda status: {'last_tracking_update': now}, now
+            )
+
+        self.assertEqual(moved, 3)
+        statuses = dict(Shipment.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[self.shipment.id], ShipmentStatus.IN_TRANSIT.value)
+        self.assertEqual(statuses[others[0].id], ShipmentStatus.DELIVERED.value)
+        self.assertEqual(statuses[others[2].id], ShipmentStatus.DELIVERED.value)
+        self.assertEqual(Shipment.objects.filter(last_tracking_update=now).count(), 4)
+
+
+class TestConcurrentTransitions(TransactionTestCase):
+    """Test transitions from several connections at once"""
+
+    def test_concurrent_trackers_never_move_back(self):
+        shipment = ShipmentFactory(courier=CourierFactory(code='aramex'))
+        statuses = [
+            ShipmentStatus.PICKED_UP.value,
+            ShipmentStatus.IN_TRANSIT.value,
+            ShipmentStatus.OUT_FOR_DELIVERY.value,
+            ShipmentStatus.DELIVERED.value,
+        ]
+        applied = []
+
+        def track(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(20):
+                    stale = Shipment.objects.get(id=shipment.id)
+                    status = rng.choice(statuses)
+                    if ShipmentTransitions.transition(stale, status):
+                        applied.append(status)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=track, args=(seed,)) for seed in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        shipment.refresh_from_db()
+        # Once delivered, no stale tracker moved the shipment back
+        if ShipmentStatus.DELIVERED.value in applied:
+            self.assertEqual(shipment.status, ShipmentStatus.DELIVERED.value)
+        # Every write bumped the version, rejected statuses included
+        self.assertGreaterEqual(shipment.version, len(applied))
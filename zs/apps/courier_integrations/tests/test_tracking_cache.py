@@ -0,0 +1,137 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from unittest.mock import patch, MagicMock
+
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError, CourierCircuitOpenError
+from zs.apps.courier_integrations.models.tracking import ShipmentTracking
+from zs.apps.courier_integrations.services import tracking_cache
+from zs.apps.courier_integrations.services.shipment_service import ShipmentService
+from zs.apps.courier_integrations.services.tracking_cache import TrackingCache
+from .factories import CourierFactory, ShipmentFactory
+
+
+def tracking_result(status):
+    return {
+        'waybill_id': 'AWB1',
+        'current_status': status,
+        'current_location': 'Dubai',
+        'timestamp': '2025-04-06T10:30:00Z',
+        'history': [{'status': status, 'description': status, 'location': 'Dubai',
+                     'timestamp': '2025-04-06T10:30:00Z'}],
+    }
+
+
+class TestTrackingCache(TestCase):
+    """Test the tracking result cache"""
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_status_aware_ttls(self):
+        self.assertEqual(TrackingCache.ttl_for(ShipmentStatus.DELIVERED.value), 24 * 60 * 60)
+        self.assertEqual(TrackingCache.ttl_for('OUT_FOR_DELIVERY'), 2 * 60)
+        self.assertEqual(TrackingCache.ttl_for('something new'), 5 * 60)
+
+    def test_second_call_is_served_from_cache(self):
+        fetch = MagicMock(return_value=tracking_result(ShipmentStatus.IN_TRANSIT.value))
+
+        first, fetched = TrackingCache.get_or_fetch('aramex', 'AWB1', fetch)
+        second, cached_fetched = TrackingCache.get_or_fetch('aramex', 'AWB1', fetch)
+
+        self.assertTrue(fetched)
+        self.assertFalse(cached_fetched)
+        self.assertEqual(first, second)
+        fetch.assert_called_once()
+
+    def test_expired_entry_is_refreshed(self):
+        TrackingCache.store('aramex', 'AWB1', tracking_result(ShipmentStatus.OUT_FOR_DELIVERY.value))
+        fetch = MagicMock(return_value=tracking_result(ShipmentStatus.DELIVERED.value))
+
+        with patch.object(tracking_cache.time, 'time', return_value=tracking_cache.time.time() + 121):
+            data, fetched = TrackingCache.get_or_fetch('aramex', 'AWB1', fetch)
+
+        self.assertTrue(fetched)
+        self.assertEqual(data['current_status'], ShipmentStatus.DELIVERED.value)
+
+    def test_early_refresh_near_expiry(self):
+        """A slow fetch close to expiry is refreshed early"""
+        TrackingCache.store('aramex', 'AWB1', tracking_result(ShipmentStatus.OUT_FOR_DELIVERY.value), delta=5.0)
+        fetch = MagicMock(return_value=tracking_result(ShipmentStatus.OUT_FOR_DELIVERY.value))
+
+        with patch.object(tracking_cache.time, 'time', return_value=tracking_cache.time.time() + 118), \
+                patch.object(tracking_cache.random, 'random', return_value=0.9):
+            _, fetched = TrackingCache.get_or_fetch('aramex', 'AWB1', fetch)
+
+        self.assertTrue(fetched)
+
+    def test_stale_result_served_when_courier_fails(self):
+        TrackingCache.store('aramex', 'AWB1', tracking_result(ShipmentStatus.IN_TRANSIT.value))
+        fetch = MagicMock(side_effect=CourierCircuitOpenError('open'))
+
+        with patch.object(tracking_cache.time, 'time', return_value=tracking_cache.time.time() + 3600):
+            data, fetched = TrackingCache.get_or_fetch('aramex', 'AWB1', fetch)
+
+        self.assertFalse(fetched)
+        self.assertEqual(data['current_status'], ShipmentStatus.IN_TRANSIT.value)
+
+    def test_error_without_cached_result_is_raised(self):
+        with self.assertRaises(CourierAPIError):
+            TrackingCache.get_or_fetch('aramex', 'AWB1', MagicMock(side_effect=CourierAPIError('down')))
+
+
+class TestCachedTrackingUpdate(TestCase):
+    """Test ShipmentService skips duplicate courier calls"""
+
+    def setUp(self):
+        cache.clear()
+        self.courier = CourierFactory(code='aramex')
+        self.factory_patcher = patch('zs.apps.courier_integrations.factories.courier_factory.CourierFactory.get_courier')
+        self.mock_adapter = MagicMock()
+        self.factory_patcher.start().return_value = self.mock_adapter
+
+    def tearDown(self):
+        self.factory_patcher.stop()
+        cache.clear()
+
+    def test_cached_result_skips_courier_and_history(self):
+        shipment = ShipmentFactory(courier=self.courier)
+        self.mock_adapter.track_shipment.return_value = tracking_result(ShipmentStatus.IN_TRANSIT.value)
+
+        ShipmentService.update_tracking_status(shipment)
+        ShipmentService.update_tracking_status(shipment)
+
+        self.mock_adapter.track_shipment.assert_called_once_with(shipment.waybill_id)
+        self.assertEqual(ShipmentTracking.objects.filter(shipment=shipment).count(), 1)
+
+    def test_cached_scheduled_poll_backs_off(self):
+        shipment = ShipmentFactory(courier=self.courier, status=ShipmentStatus.IN_TRANSIT.value,
+                                   next_poll_at=timezone.now())
+        TrackingCache.store('aramex', shipment.waybill_id, tracking_result(ShipmentStatus.IN_TRANSIT.value))
+
+        ShipmentService.update_tracking_status(shipment, scheduled=True)
+
+        shipment.refresh_from_db()
+        self.mock_adapter.track_shipment.assert_not_called()
+        self.assertEqual(shipment.unchanged_polls, 1)
+        # Twice the in transit interval, less the jitter
+        self.assertGreater(shipment.next_poll_at, timezone.now() + timedelta(hours=4))
+        self.assertFalse(ShipmentService.due_for_tracking(timezone.now()).filter(id=shipment.id).exists())
+
+    def test_stale_scheduled_poll_backs_off_while_circuit_is_open(self):
+        shipment = ShipmentFactory(courier=self.courier, status=ShipmentStatus.IN_TRANSIT.value,
+                                   next_poll_at=timezone.now(), unchanged_polls=2)
+        TrackingCache.store('aramex', shipment.waybill_id, tracking_result(ShipmentStatus.IN_TRANSIT.value))
+        self.mock_adapter.track_shipment.side_effect = CourierCircuitOpenError('open')
+
+        with patch.object(tracking_cache.time, 'time', return_value=tracking_cache.time.time() + 3600):
+            ShipmentService.update_tracking_status(shipment, scheduled=True)
+
+        shipment.refresh_from_db()
+        self.assertEqual(shipment.unchanged_polls, 3)
+        self.assertGreater(shipment.next_poll_at, timezone.now() + timedelta(hours=12))
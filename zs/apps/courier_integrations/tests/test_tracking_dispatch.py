@@ -0,0 +1,72 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from unittest.mock import patch
+
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierRateLimitError
+from zs.apps.courier_integrations.models.shipment import Shipment
+from zs.apps.courier_integrations.tasks.shipment_tasks import update_all_active_shipments, update_shipment_status
+from .factories import CourierFactory, ShipmentFactory
+
+
+TASKS = 'zs.apps.courier_integrations.tasks.shipment_tasks'
+
+
+@override_settings(COURIER_TRACKING_DISPATCH={'page_size': 3, 'chunk_size': 2, 'rate': 100})
+class TestTrackingDispatch(TestCase):
+    """Test the paged dispatch of periodic tracking updates"""
+
+    def setUp(self):
+        due = timezone.now() - timedelta(minutes=1)
+        aramex, smsa = CourierFactory(), CourierFactory()
+        self.aramex_ids = [ShipmentFactory(courier=aramex, next_poll_at=due).id for _ in range(3)]
+        # Never tracked before
+        self.smsa_ids = [ShipmentFactory(courier=smsa, next_poll_at=due, last_tracking_update=None).id]
+        # Not due: terminal, scheduled later, or without a waybill yet
+        ShipmentFactory(courier=aramex, next_poll_at=None, status=ShipmentStatus.DELIVERED.value)
+        ShipmentFactory(courier=aramex, next_poll_at=timezone.now() + timedelta(hours=1))
+        ShipmentFactory(courier=aramex, next_poll_at=due, waybill_id='')
+
+    @patch(f'{TASKS}.update_all_active_shipments.apply_async')
+    @patch(f'{TASKS}.update_shipment_status.chunks')
+    def test_pages_are_chunked_by_courier(self, chunks, next_page):
+        update_all_active_shipments()
+
+        # First page holds the first three due shipments, all ARAMEX
+        chunks.assert_called_once_with([(shipment_id,) for shipment_id in self.aramex_ids], 2)
+        chunks.return_value.apply_async.assert_called_once_with()
+        kwargs = next_page.call_args.kwargs
+        self.assertEqual(kwargs['kwargs']['after'][1], self.aramex_ids[-1])
+        self.assertAlmostEqual(kwargs['countdown'], 0.03)
+
+        chunks.reset_mock()
+        next_page.reset_mock()
+        update_all_active_shipments(**kwargs['kwargs'])
+
+        chunks.assert_called_once_with([(self.smsa_ids[0],)], 2)
+        next_page.assert_not_called()
+
+    @patch(f'{TASKS}.update_all_active_shipments.apply_async')
+    @patch(f'{TASKS}.update_shipment_status.chunks')
+    def test_overlapping_runs_queue_each_shipment_once(self, chunks, next_page):
+        update_all_active_shipments()
+        # A new run starts before the first one has sent its next page
+        update_all_active_shipments()
+        update_all_active_shipments(**next_page.call_args_list[0].kwargs['kwargs'])
+
+        queued = [args for call in chunks.call_args_list for args in call.args[0]]
+        self.assertEqual(sorted(queued), sorted((shipment_id,) for shipment_id in self.aramex_ids + self.smsa_ids))
+        # Held back until their polls schedule them
+        leased = Shipment.objects.filter(id__in=self.aramex_ids + self.smsa_ids).values_list('next_poll_at', flat=True)
+        self.assertTrue(all(next_poll_at and next_poll_at > timezone.now() + timedelta(minutes=14) for next_poll_at in leased))
+
+    @patch(f'{TASKS}.update_shipment_status.apply_async')
+    @patch(f'{TASKS}.ShipmentService.update_tracking_status')
+    def test_rate_limited_update_inside_chunk_is_requeued(self, update_tracking_status, apply_async):
+        """A direct call, as made by a chunk task, re-queues instead of raising Retry"""
+        update_tracking_status.side_effect = CourierRateLimitError('Rate limited', retry_after=2.5)
+
+        update_shipment_status(self.aramex_ids[0])
+
+        apply_async.assert_called_once_with((self.aramex_ids[0],), countdown=2.5)
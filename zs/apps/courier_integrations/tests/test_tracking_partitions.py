@@ -0,0 +1,125 @@
+from datetime import date, datetime, timezone as dt_timezone
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from zs.apps.courier_integrations.models.tracking import ShipmentTracking
+from zs.apps.courier_integrations.services.tracking_partitions import (
+    DEFAULT_PARTITION, LEGACY_TABLE, TrackingPartitions, partition_name,
+)
+from .factories import CourierFactory, ShipmentFactory, ShipmentTrackingFactory
+
+
+TODAY = date(2025, 4, 15)
+
+
+def at(year, month, day=10):
+    return datetime(year, month, day, 12, tzinfo=dt_timezone.utc)
+
+
+class TestTrackingPartitions(TestCase):
+    """Test monthly partitioning of tracking history; DDL is rolled back with each test"""
+
+    def setUp(self):
+        self.shipment = ShipmentFactory(courier=CourierFactory(code='aramex'))
+        self.old_events = [
+            ShipmentTrackingFactory(shipment=self.shipment, courier_status=f'Event {month}', timestamp=at(2025, month))
+            for month in (2, 3, 4)
+        ]
+        # Outside tests the table is altered in a transaction of its own; here
+        # deferred foreign key checks of the rows above would block the DDL
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+    def table_of(self, event):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT tableoid::regclass::text FROM {ShipmentTracking._meta.db_table} WHERE id = %s', [event.id]
+            )
+            return cursor.fetchone()[0]
+
+    def event(self, timestamp, **kwargs):
+        return ShipmentTrackingFactory(shipment=self.shipment, courier_status=f'At {timestamp}',
+                                       timestamp=timestamp, **kwargs)
+
+    def test_convert_keeps_events_and_ids(self):
+        TrackingPartitions.convert(concurrently=False, today=TODAY)
+
+        self.assertTrue(TrackingPartitions.is_partitioned())
+        self.assertEqual(self.shipment.tracking_history.count(), 3)
+        self.assertEqual(self.table_of(self.old_events[0]), LEGACY_TABLE)
+        # New events continue the id sequence and fall in the default
+        # partition until their month has one
+        event = self.event(at(2025, 7))
+        self.assertGreater(event.id, max(old.id for old in self.old_events))
+        self.assertEqual(self.table_of(event), DEFAULT_PARTITION)
+        # Events already stored are still skipped
+        ShipmentTracking.objects.bulk_create([
+            ShipmentTracking(shipment=self.shipment, courier_status='Event 3', status='pending', timestamp=at(2025, 3))
+        ], ignore_conflicts=True)
+        self.assertEqual(self.shipment.tracking_history.count(), 4)
+
+        with self.assertRaises(ValueError):
+            TrackingPartitions.convert(concurrently=False, today=TODAY)
+
+    def test_create_partitions_moves_default_rows(self):
+        TrackingPartitions.convert(concurrently=False, today=TODAY)
+        early = self.event(at(2025, 8))
+
+        created = TrackingPartitions.create_partitions(3, today=date(2025, 6, 1))
+
+        self.assertEqual(created, [partition_name(at(2025, month, 1)) for month in (6, 7, 8, 9)])
+        self.assertEqual(self.table_of(early), partition_name(at(2025, 8, 1)))
+        self.assertEqual(TrackingPartitions.create_partitions(3, today=date(2025, 6, 1)), [])
+        self.assertEqual(self.table_of(self.event(at(2025, 6))), partition_name(at(2025, 6, 1)))
+
+    def test_timestamp_filters_prune_partitions(self):
+        TrackingPartitions.convert(concurrently=False, today=TODAY)
+        TrackingPartitions.create_partitions(2, today=date(2025, 6, 1))
+        self.event(at(2025, 7))
+
+        plan = self.shipment.tracking_history.filter(
+            timestamp__gte=at(2025, 7, 1), timestamp__lt=at(2025, 8, 1)
+        ).explain()
+
+        self.assertIn(partition_name(at(2025, 7, 1)), plan)
+        self.assertNotIn(LEGACY_TABLE, plan)
+        self.assertNotIn(DEFAULT_PARTITION, plan)
+        self.assertNotIn(partition_name(at(2025, 6, 1)), plan)
+
+    def test_history_endpoint(self):
+        TrackingPartitions.convert(concurrently=False, today=TODAY)
+        TrackingPartitions.create_partitions(1, today=date(2025, 6, 1))
+        self.event(at(2025, 6))
+        url = reverse('api:shipment-history', args=[self.shipment.id])
+        client = APIClient()
+
+        self.assertEqual(len(client.get(url).data), 4)
+        response = client.get(url, {'since': '2025-04-01T00:00:00Z', 'until': '2025-07-01T00:00:00Z'})
+        self.assertEqual([row['courier_status'] for row in response.data], [f'At {at(2025, 6)}', 'Event 4'])
+        self.assertEqual(client.get(url, {'since': 'yesterday'}).status_code, 400)
+
+    def test_expired_partitions_are_detached(self):
+        TrackingPartitions.convert(concurrently=False, today=TODAY)
+        TrackingPartitions.create_partitions(2, today=date(2025, 6, 1))
+        self.event(at(2025, 6))
+
+        expired = TrackingPartitions.expire_partitions(1, archive_schema='tracking_archive', today=date(2025, 7, 20))
+
+        self.assertEqual(expired, [LEGACY_TABLE])
+        self.assertEqual(self.shipment.tracking_history.count(), 1)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM tracking_archive.%s' % connection.ops.quote_name(LEGACY_TABLE))
+            self.assertEqual(cursor.fetchone()[0], 3)
+
+        dropped = TrackingPartitions.expire_partitions(0, drop=True, today=date(2025, 7, 20))
+        self.assertEqual(dropped, [partition_name(at(2025, 6, 1))])
+        self.assertFalse(self.shipment.tracking_history.exists())
+
+    def test_maintain_needs_a_partitioned_table(self):
+        self.assertEqual(TrackingPartitions.maintain(), {'created': [], 'expired': []})
+        with self.assertRaises(CommandError):
+            call_command('tracking_partitions')
@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from unittest.mock import MagicMock, patch
+
+from zs.apps.courier_integrations.api.v1.serializers import ShipmentSerializer
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.models.shipment import Shipment
+from zs.apps.courier_integrations.models.tracking import ShipmentTracking
+from zs.apps.courier_integrations.services.shipment_service import ShipmentService
+from zs.apps.courier_integrations.services.tracking_snapshot import TrackingSnapshot
+from .factories import CourierFactory, ShipmentFactory
+
+
+class TestTrackingSnapshot(TestCase):
+    """Test the latest event snapshot kept on Shipment"""
+
+    def setUp(self):
+        cache.clear()
+        self.courier = CourierFactory(code='aramex')
+        self.factory_patcher = patch(
+            'zs.apps.courier_integrations.factories.courier_factory.CourierFactory.get_courier'
+        )
+        self.mock_adapter = MagicMock()
+        self.factory_patcher.start().return_value = self.mock_adapter
+
+    def tearDown(self):
+        self.factory_patcher.stop()
+        cache.clear()
+
+    def test_polls_keep_the_snapshot(self):
+        shipment = ShipmentFactory(courier=self.courier)
+        history = [
+            {'status': 'in_transit', 'description': 'In transit', 'location': 'Transit Hub',
+             'timestamp': '2025-04-06T10:30:00Z'},
+            {'status': 'pending', 'description': 'Shipment created', 'location': 'Origin',
+             'timestamp': '2025-04-05T14:20:00Z'},
+        ]
+        self.mock_adapter.track_shipment.return_value = {'current_status': 'in_transit', 'history': history}
+
+        for _ in range(2):
+            # Skip the tracking cache so both polls store the history
+            cache.clear()
+            ShipmentService.update_tracking_status(shipment)
+
+        shipment.refresh_from_db()
+        self.assertEqual(shipment.event_count, 2)
+        self.assertEqual(shipment.last_event_at, parse_datetime('2025-04-06T10:30:00Z'))
+        self.assertEqual((shipment.last_location, shipment.last_courier_status), ('Transit Hub', 'In transit'))
+
+    def test_refresh_without_events(self):
+        shipment = ShipmentFactory(courier=self.courier, last_location='Stale', event_count=3)
+
+        self.assertEqual(TrackingSnapshot.refresh([shipment.id]), 1)
+        self.assertEqual(TrackingSnapshot.refresh([]), 0)
+
+        shipment.refresh_from_db()
+        self.assertEqual((shipment.event_count, shipment.last_location, shipment.last_event_at), (0, '', None))
+
+    def test_listing_takes_one_query(self):
+        now = timezone.now()
+        shipments = Shipment.objects.bulk_create([
+            Shipment(reference_number=f'SNAP{n:05d}', courier=self.courier, waybill_id=f'SNAPAWB{n:05d}')
+            for n in range(1000)
+        ])
+        ShipmentTracking.objects.bulk_create([
+            ShipmentTracking(shipment=shipment, courier_status='Arrived', status=ShipmentStatus.IN_TRANSIT.value,
+                             location=f'Hub {shipment.id}', timestamp=now)
+            for shipment in shipments
+        ])
+        TrackingSnapshot.refresh(shipment.id for shipment in shipments)
+
+        with self.assertNumQueries(1):
+            rows = ShipmentSerializer(
+                Shipment.objects.select_related('courier').defer('data').order_by('-created_at', '-id'),
+                many=True,
+            ).data
+
+        self.assertEqual(len(rows), 1000)
+        self.assertEqual({row['last_location'] for row in rows}, {f'Hub {shipment.id}' for shipment in shipments})
+        self.assertEqual({row['event_count'] for row in rows}, {1})
@@ -0,0 +1,77 @@
+import responses
+from typing import cast
+from requests.adapters import HTTPAdapter
+from django.test import TestCase
+from unittest.mock import patch
+
+from zs.apps.courier_integrations.adapters.smsa import SMSACourierAdapter
+from zs.apps.courier_integrations.adapters.transport import TransportProfile
+from zs.apps.courier_integrations.exceptions.courier_exceptions import CourierAPIError
+from .factories import CourierFactory
+
+
+class TestTransportProfile(TestCase):
+    """Test HTTP transport profiles"""
+
+    def test_per_operation_timeouts(self):
+        profile = TransportProfile({
+            'connect_timeout': 2,
+            'read_timeout': 20,
+            'timeouts': {'label': {'read': 60}},
+        })
+
+        self.assertEqual(profile.timeout(), (2.0, 20.0))
+        self.assertEqual(profile.timeout('track'), (2.0, 20.0))
+        self.assertEqual(profile.timeout('label'), (2.0, 60.0))
+
+    def test_session_pool_and_retry(self):
+        session = TransportProfile({'pool_maxsize': 32, 'retries': 1, 'keep_alive': False}).build_session()
+        adapter = cast(HTTPAdapter, session.get_adapter('https://api.example.com'))
+
+        self.assertEqual(adapter.poolmanager.connection_pool_kw['maxsize'], 32)
+        self.assertEqual(adapter.max_retries.total, 1)
+        self.assertEqual(session.headers['Connection'], 'close')
+
+
+class TestAdapterTransport(TestCase):
+    """Test adapters send every request through the transport profile"""
+
+    def setUp(self):
+        self.settings_patcher = patch('django.conf.settings.COURIER_CONFIG', {
+            'SMSA': {
+                'api_url': 'https://smsa.example.com',
+                'tracking_url': 'https://tracking.example.com',
+                'pass_key': 'test_api_key',
+                'transport': {'read_timeout': 15, 'timeouts': {'track': {'read': 5}}},
+            },
+        })
+        self.settings_patcher.start()
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+
+    def test_courier_config_overrides_settings(self):
+        CourierFactory(code='smsa', config={'transport': {'pool_maxsize': 50, 'read_timeout': 8}})
+
+        adapter = SMSACourierAdapter('smsa')
+
+        self.assertEqual(adapter.transport.pool_maxsize, 50)
+        self.assertEqual(adapter.transport.timeout(), (5.0, 8.0))
+        self.assertEqual(adapter.transport.timeout('track'), (5.0, 5.0))
+
+    @responses.activate
+    def test_smsa_request_uses_operation_timeout(self):
+        responses.add(responses.GET, 'https://smsa.example.com/getTracking', json={'status': 'delivered'})
+        adapter = SMSACourierAdapter()
+
+        with patch.object(adapter.session, 'request', wraps=adapter.session.request) as request:
+            adapter.track_shipment('SMSA123')
+
+        self.assertEqual(request.call_args.kwargs['timeout'], (5.0, 5.0))
+
+    @responses.activate
+    def test_smsa_http_error_raises_courier_api_error(self):
+        responses.add(responses.POST, 'https://smsa.example.com/cancelShipment', status=400, body='Bad request')
+
+        with self.assertRaises(CourierAPIError):
+            SMSACourierAdapter().cancel_shipment('SMSA123')
@@ -0,0 +1,175 @@
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from unittest.mock import patch
+
+from zs.apps.courier_integrations.enums.shipment_status import ShipmentStatus
+from zs.apps.courier_integrations.factories.courier_factory import CourierFactory as AdapterFactory
+from zs.apps.courier_integrations.models.webhook import TrackingWebhookEvent
+from zs.apps.courier_integrations.services.tracking_cache import TrackingCache
+from zs.apps.courier_integrations.services.tracking_webhooks import TrackingWebhooks
+from .factories import CourierFactory, ShipmentFactory
+
+
+COURIER_CONFIG = {
+    'ARAMEX': {
+        'api_url': 'https://api.example.com',
+        'tracking_url': 'https://tracking.example.com',
+        'webhook_secret': 'secret',
+    },
+}
+
+
+def sign(body):
+    return 'sha256=' + hmac.new(b'secret', body, hashlib.sha256).hexdigest()
+
+
+class TestCourierWebhooks(TestCase):
+    """Test webhook buffering and batch apply"""
+
+    def setUp(self):
+        cache.clear()
+        self.settings_patcher = patch('django.conf.settings.COURIER_CONFIG', COURIER_CONFIG)
+        self.settings_patcher.start()
+        # Adapters are singletons; build ours with the webhook secret
+        self.instances_patcher = patch.dict(AdapterFactory._instances, clear=True)
+        self.instances_patcher.start()
+        self.client = APIClient()
+        self.courier = CourierFactory(code='aramex')
+        self.url = reverse('api:courier-webhook', args=['aramex'])
+
+    def tearDown(self):
+        self.instances_patcher.stop()
+        self.settings_patcher.stop()
+        cache.clear()
+
+    def post(self, payload, signature=None):
+        body = json.dumps(payload).encode()
+        return self.client.post(
+            self.url, body, content_type='application/json',
+            HTTP_X_WEBHOOK_SIGNATURE=signature or sign(body),
+        )
+
+    def test_signed_payload_is_buffered(self):
+        response = self.post({'events': []})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(TrackingWebhookEvent.objects.get().payload, {'events': []})
+
+    def test_rejected_requests(self):
+        self.assertEqual(self.post({'events': []}, signature='sha256=bad').status_code, 403)
+        unknown = self.client.post(reverse('api:courier-webhook', args=['unknown']), {}, format='json')
+        self.assertEqual(unknown.status_code, 404)
+        self.assertFalse(TrackingWebhookEvent.objects.exists())
+
+    def test_apply_pending_updates_shipments_in_bulk(self):
+        shipment = ShipmentFactory(courier=self.courier, waybill_id='AWB1', next_poll_at=timezone.now())
+        other = ShipmentFactory(courier=self.courier, waybill_id='AWB2')
+        TrackingWebhookEvent.objects.create(courier=self.courier, payload={'events': [
+            {'waybill_id': 'AWB1', 'status': 'In Transit', 'location': 'Amman', 'timestamp': '2025-04-05T09:00:00Z'},
+            {'waybill_id': 'UNKNOWN', 'status': 'Delivered'},
+        ]})
+        TrackingWebhookEvent.objects.create(courier=self.courier, payload={'events': [
+            {'waybill_id': 'AWB1', 'status': 'Out for Delivery', 'location': 'Dubai', 'timestamp': '2025-04-06T08:00:00Z'},
+            {'waybill_id': 'AWB2', 'status': 'Delivered', 'location': 'Riyadh', 'timestamp': '2025-04-06T10:00:00Z'},
+        ]})
+        invalid = TrackingWebhookEvent.objects.create(courier=self.courier, payload={'unexpected': True})
+
+        self.assertEqual(TrackingWebhooks.apply_pending(batch_size=10), 3)
+
+        shipment.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(shipment.status, ShipmentStatus.OUT_FOR_DELIVERY.value)
+        self.assertGreater(shipment.next_poll_at, timezone.now() + timedelta(hours=23))
+        self.assertEqual(
+            list(shipment.tracking_history.values_list('location', flat=True)), ['Dubai', 'Amman']
+        )
+        self.assertEqual((shipment.last_location, shipment.event_count), ('Dubai', 2))
+        self.assertEqual(other.status, ShipmentStatus.DELIVERED.value)
+        self.assertIsNone(other.next_poll_at)
+
+        invalid.refresh_from_db()
+        self.assertIsNotNone(invalid.processed_at)
+        self.assertIn('Invalid webhook payload', invalid.error)
+        self.assertEqual(list(TrackingWebhookEvent.objects.values_list('id', flat=True)), [invalid.id])
+        self.assertEqual(TrackingWebhooks.apply_pending(), 0)
+
+    def test_malformed_event_does_not_block_the_batch(self):
+        shipment = ShipmentFactory(courier=self.courier, waybill_id='AWB1')
+        other = ShipmentFactory(courier=self.courier, waybill_id='AWB2')
+        TrackingWebhookEvent.objects.create(courier=self.courier, payload={'events': [
+            {'waybill_id': 'AWB1', 'status': 'In Transit', 'location': 'Amman', 'timestamp': '2025-04-05T09:00:00Z'},
+        ]})
+        # Fails in Python while the rows are built
+        wrong_type = TrackingWebhookEvent.objects.create(courier=self.courier, payload={'events': [
+            {'waybill_id': 'AWB1', 'status': 'Delivered', 'location': 12, 'timestamp': '2025-04-06T09:00:00Z'},
+        ]})
+        # Fails in the database, aborting the transaction it runs in
+        broken = ShipmentFactory(courier=self.courier, waybill_id='AWB3')
+        rejected = TrackingWebhookEvent.objects.create(courier=self.courier, payload={'events': [
+            {'waybill_id': 'AWB3', 'status': 'Delivered', 'timestamp': '2025-04-06T10:00:00Z'},
+        ]})
+        TrackingWebhookEvent.objects.create(courier=self.courier, payload={'events': [
+            {'waybill_id': 'AWB2', 'status': 'In Transit', 'location': 'Riyadh', 'timestamp': '2025-04-06T11:00:00Z'},
+        ]})
+
+        def invalidate_many(courier_code, waybill_ids):
+            if 'AWB3' in waybill_ids:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1 / 0')
+
+        with patch.object(TrackingCache, 'invalidate_many', side_effect=invalidate_many), \
+                self.assertLogs('zs.apps.courier_integrations.services.tracking_webhooks', 'WARNING'):
+            self.assertEqual(TrackingWebhooks.apply_pending(batch_size=10), 4)
+
+        shipment.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(shipment.status, ShipmentStatus.IN_TRANSIT.value)
+        self.assertEqual(list(shipment.tracking_history.values_list('location', flat=True)), ['Amman'])
+        self.assertEqual(other.status, ShipmentStatus.IN_TRANSIT.value)
+        self.assertEqual(list(other.tracking_history.values_list('location', flat=True)), ['Riyadh'])
+        self.assertEqual(
+            set(TrackingWebhookEvent.objects.values_list('id', flat=True)), {wrong_type.id, rejected.id}
+        )
+        wrong_type.refresh_from_db()
+        rejected.refresh_from_db()
+        self.assertIsNotNone(wrong_type.processed_at)
+        self.assertIn('subscriptable', wrong_type.error)
+        self.assertIsNotNone(rejected.processed_at)
+        self.assertIn('division by zero', rejected.error)
+        broken.refresh_from_db()
+        self.assertEqual((broken.status, broken.event_count), (ShipmentStatus.PENDING.value, 0))
+        self.assertEqual(TrackingWebhooks.apply_pending(), 0)
+
+    def test_events_are_ordered_by_time_and_undated_events_stored_once(self):
+        shipment = ShipmentFactory(courier=self.courier, waybill_id='AWB1')
+        events = [
+            # Earlier than the event below, though its string sorts later
+            {'waybill_id': 'AWB1', 'status': 'Out for Delivery', 'location': 'Dubai',
+             'timestamp': '2025-04-06T08:00:00+04:00'},
+            {'waybill_id': 'AWB1', 'status': 'In Transit', 'location': 'Amman', 'timestamp': '2025-04-06T05:00:00Z'},
+        ]
+        TrackingWebhookEvent.objects.create(courier=self.courier, payload={'events': events})
+
+        TrackingWebhooks.apply_pending()
+
+        shipment.refresh_from_db()
+        self.assertEqual(shipment.status, ShipmentStatus.IN_TRANSIT.value)
+
+        # Couriers push undated events again with the next update
+        undated = {'waybill_id': 'AWB1', 'status': 'Delivered', 'location': 'Amman'}
+        for _ in range(2):
+            TrackingWebhookEvent.objects.create(courier=self.courier, payload={'events': [undated]})
+            TrackingWebhooks.apply_pending()
+
+        shipment.refresh_from_db()
+        self.assertEqual(shipment.status, ShipmentStatus.DELIVERED.value)
+        self.assertEqual(shipment.tracking_history.filter(courier_status='Delivered').count(), 1)
+        self.assertEqual(shipment.event_count, 3)